@@ -0,0 +1,114 @@
+"""Compression ratio and throughput of zlib and lzma for typical upload
+payloads (a pickled model, a token list and an image), and the resulting time
+to upload each payload over a given uplink.
+
+Upload time is compression time plus the compressed size over the uplink
+bandwidth. Requires numpy.
+
+    python benchmarks/bench_compression.py --size-mb 16 --uplink-mbps 20
+"""
+import argparse
+import time
+
+from tabulate import tabulate
+
+from pipeline.util import dump_object
+from pipeline.util.codecs import encode_object
+from pipeline.util.compression import compress, decompress
+
+SETTINGS = [
+    ("none", None),
+    ("zlib", 1),
+    ("zlib", 6),
+    ("lzma", 0),
+    ("lzma", 6),
+]
+
+
+def _payloads(size: int):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+
+    # Trained weights: normally distributed float32 with a share of zeros
+    weights = rng.normal(0, 0.02, size // 4).astype(np.float32)
+    weights[rng.random(weights.size) < 0.1] = 0
+    model = {
+        "layer_%u" % index: part for index, part in enumerate(weights.reshape(16, -1))
+    }
+
+    # Token ids follow a Zipf distribution over a 50k vocabulary
+    tokens = (rng.zipf(1.2, size // 32) % 50_000).tolist()
+
+    # An image: smooth gradients with sensor noise
+    side = int((size // 3) ** 0.5)
+    gradient = np.linspace(0, 255, side)
+    image = np.stack(
+        [np.add.outer(gradient, gradient) / 2, np.outer(gradient, gradient) / 255]
+        + [np.add.outer(gradient, -gradient) / 2 + 128],
+        axis=-1,
+    )
+    image = np.clip(image + rng.normal(0, 4, image.shape), 0, 255).astype(np.uint8)
+
+    return {
+        "pickled model": dump_object(model),
+        "token list": dump_object(tokens),
+        "image": bytes(encode_object(image)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=16)
+    parser.add_argument("--uplink-mbps", type=float, default=20.0)
+    args = parser.parse_args()
+
+    megabyte = 1024 * 1024
+    uplink = args.uplink_mbps * 1_000_000 / 8
+    rows = []
+    for name, data in _payloads(args.size_mb * megabyte).items():
+        for algorithm, level in SETTINGS:
+            started_at = time.perf_counter()
+            compressed = compress(data, algorithm, threshold=0, level=level)
+            compress_time = time.perf_counter() - started_at
+
+            compress_speed = decompress_speed = None
+            if compressed is not data:
+                started_at = time.perf_counter()
+                decompressed = decompress(compressed)
+                decompress_time = time.perf_counter() - started_at
+                assert decompressed == data
+                compress_speed = len(data) / megabyte / compress_time
+                decompress_speed = len(data) / megabyte / decompress_time
+
+            rows.append(
+                [
+                    name,
+                    algorithm if level is None else "%s %u" % (algorithm, level),
+                    len(data) / megabyte,
+                    len(data) / len(compressed),
+                    compress_speed,
+                    decompress_speed,
+                    compress_time + len(compressed) / uplink,
+                ]
+            )
+
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "payload",
+                "compression",
+                "MB",
+                "ratio",
+                "compress MB/s",
+                "decompress MB/s",
+                "upload s (%g Mbps)" % args.uplink_mbps,
+            ],
+            floatfmt=".2f",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
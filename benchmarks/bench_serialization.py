@@ -0,0 +1,271 @@
+"""Encode/decode time, size and peak memory of the serialisation backends on
+representative pipeline objects.
+
+Backends are the current cloudpickle dumps with dill loads
+(`pipeline.util.dump_object`/`load_object`), dill for both, stdlib pickle
+protocol 5 and protocol 5 with out-of-band buffers (`pipeline.util.buffers`).
+Payloads are a `Function` with a closure, `pipeline_model` instances with
+numpy (and torch, when installed) weights, a large list, a large dict and a
+run result. Payloads whose dependencies aren't installed, and backends that
+can't serialise a payload (stdlib pickle can't pickle closures or local
+classes), are skipped.
+
+Times are the best of `--repeat` runs. Peak memory is measured in a separate
+pass with tracemalloc, as the largest allocation on top of the payload itself.
+
+Results can be saved as a baseline and later runs checked against it; any
+metric growing by more than the tolerance is reported as a regression and the
+script exits with status 1. Requires numpy.
+
+    python benchmarks/bench_serialization.py --save-baseline baseline.json
+    python benchmarks/bench_serialization.py --baseline baseline.json
+"""
+import argparse
+import json
+import pickle
+import sys
+import time
+import tracemalloc
+import warnings
+from functools import partial
+
+import dill
+from tabulate import tabulate
+
+from pipeline import Pipeline, Variable, pipeline_function, pipeline_model
+from pipeline.objects import Function, Model
+from pipeline.util import dump_object, load_object
+from pipeline.util.buffers import dumps_buffers, loads_buffers
+
+BACKENDS = {
+    "cloudpickle+dill": (dump_object, load_object),
+    "dill": (dill.dumps, dill.loads),
+}
+if pickle.HIGHEST_PROTOCOL >= 5:
+    BACKENDS["pickle5"] = (partial(pickle.dumps, protocol=5), pickle.loads)
+    BACKENDS["pickle5 out-of-band"] = (dumps_buffers, loads_buffers)
+
+# Metrics checked against a baseline, and absolute slack below which
+# differences are noise
+METRICS = {
+    "size": 1024,
+    "dump_s": 0.001,
+    "load_s": 0.001,
+    "dump_peak": 64 * 1024,
+    "load_peak": 64 * 1024,
+}
+
+
+def _function_payload():
+    vocabulary = {"token_%u" % index: index for index in range(10_000)}
+
+    def tokenize(text: str) -> list:
+        return [vocabulary.get(word, 0) for word in text.split()]
+
+    return Function(tokenize)
+
+
+def _numpy_model_payload(size: int):
+    import numpy as np
+
+    @pipeline_model
+    class Classifier:
+        def __init__(self):
+            rng = np.random.default_rng(0)
+            self.weights = rng.normal(0, 0.02, size // 8)
+            self.labels = ["label_%u" % index for index in range(1000)]
+
+        @pipeline_function
+        def predict(self, features: list) -> str:
+            return self.labels[int(self.weights[: len(features)] @ features)]
+
+    with Pipeline("bench_serialization") as builder:
+        features = Variable(list, is_input=True)
+        builder.add_variable(features)
+        builder.output(Classifier().predict(features))
+
+    return Pipeline.get_pipeline("bench_serialization").models[0]
+
+
+def _torch_model_payload(size: int):
+    import torch
+
+    class Network(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            side = int((size // 4) ** 0.5)
+            self.linear = torch.nn.Linear(side, side)
+
+    return Model(Network())
+
+
+def _large_list(size: int):
+    return [float(index) for index in range(size // 24)]
+
+
+def _large_dict(size: int):
+    return {"key_%u" % index: [index, "value"] for index in range(size // 200)}
+
+
+def _run_result(size: int):
+    return [
+        {"label": "label_%u" % (index % 10), "score": index / size}
+        for index in range(size // 400)
+    ]
+
+
+# Each backend gets a freshly built payload: loading a pickled local class
+# updates the original class in place, which would skew later backends
+PAYLOADS = {
+    "function with closure": lambda size: _function_payload(),
+    "numpy model": _numpy_model_payload,
+    "torch model": _torch_model_payload,
+    "large list": _large_list,
+    "large dict": _large_dict,
+    "run result": _run_result,
+}
+
+
+def _timed(function, repeat: int):
+    best = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def _peak(function) -> int:
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        function()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def _measure(payload, dumps, loads, repeat: int) -> dict:
+    serialised, dump_s = _timed(partial(dumps, payload), repeat)
+    _, load_s = _timed(partial(loads, serialised), repeat)
+    return dict(
+        size=len(serialised),
+        dump_s=dump_s,
+        load_s=load_s,
+        dump_peak=_peak(partial(dumps, payload)),
+        load_peak=_peak(partial(loads, serialised)),
+    )
+
+
+def _regressions(
+    results: dict, baseline: dict, tolerance: float, time_tolerance: float
+):
+    for key, metrics in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        for metric, slack in METRICS.items():
+            allowed = time_tolerance if metric.endswith("_s") else tolerance
+            limit = expected[metric] * (1 + allowed) + slack
+            if metrics[metric] > limit:
+                yield "%s %s: %.4g > %.4g (baseline %.4g)" % (
+                    key,
+                    metric,
+                    metrics[metric],
+                    limit,
+                    expected[metric],
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backend", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--baseline", help="check the results against a baseline")
+    parser.add_argument("--save-baseline", help="save the results as a baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="allowed relative growth of size and peak memory",
+    )
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative growth of dump and load times",
+    )
+    args = parser.parse_args()
+
+    # dill warns before failing on local classes, which are skipped anyway
+    warnings.simplefilter("ignore", dill.PicklingWarning)
+
+    megabyte = 1024 * 1024
+    results = {}
+    rows = []
+    for payload_name, build_payload in PAYLOADS.items():
+        for backend in args.backend:
+            try:
+                payload = build_payload(args.size_mb * megabyte)
+            except ImportError:
+                break
+            dumps, loads = BACKENDS[backend]
+            key = "%s/%s" % (payload_name, backend)
+            try:
+                metrics = _measure(payload, dumps, loads, args.repeat)
+            except (pickle.PicklingError, AttributeError, TypeError, ImportError):
+                continue
+            results[key] = metrics
+            rows.append(
+                [
+                    payload_name,
+                    backend,
+                    metrics["size"] / megabyte,
+                    metrics["dump_s"],
+                    metrics["load_s"],
+                    metrics["dump_peak"] / megabyte,
+                    metrics["load_peak"] / megabyte,
+                ]
+            )
+
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "payload",
+                "backend",
+                "size MB",
+                "dump s",
+                "load s",
+                "dump peak MB",
+                "load peak MB",
+            ],
+            floatfmt=".3f",
+        )
+    )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(dict(size_mb=args.size_mb, results=results), file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline["size_mb"] != args.size_mb:
+            sys.exit("Baseline was recorded with --size-mb %u" % baseline["size_mb"])
+        regressions = list(
+            _regressions(
+                results, baseline["results"], args.tolerance, args.time_tolerance
+            )
+        )
+        if regressions:
+            print("\nRegressions against %s:" % args.baseline)
+            print("\n".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions against %s" % args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Time and peak memory of serialising a large array payload inline (cloudpickle)
+and with pickle protocol 5 out-of-band buffers.
+
+Peak memory is the largest amount allocated on top of the payload itself while
+dumping or loading, traced with tracemalloc (which includes numpy buffers), so
+each full copy of the payload adds about its size. Memory-mapped pages aren't
+allocations and don't count. Requires numpy.
+
+    python benchmarks/bench_serialization_buffers.py --size-mb 1024
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+from tabulate import tabulate
+
+from pipeline.util import dump_object, load_object
+from pipeline.util.buffers import dump_buffers, load_buffers
+
+
+def _measure(function):
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started_at = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started_at
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return result, elapsed, peak
+
+
+def _modes(directory: str):
+    path = os.path.join(directory, "payload.bin")
+
+    def dump_file(obj):
+        with open(path, "wb") as file:
+            dump_buffers(obj, file)
+        return path
+
+    return {
+        "cloudpickle bytes": (dump_object, load_object),
+        "out-of-band bytes": (
+            lambda obj: dump_object(obj, out_of_band=True),
+            load_object,
+        ),
+        "out-of-band file": (dump_file, load_buffers),
+        "out-of-band file (mmap)": (
+            dump_file,
+            lambda path: load_buffers(path, mmap_buffers=True),
+        ),
+    }
+
+
+def main():
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    args = parser.parse_args()
+
+    megabyte = 1024 * 1024
+    payload = {"weights": np.ones(args.size_mb * megabyte // 8, dtype=np.float64)}
+
+    tracemalloc.start()
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (dump, load) in _modes(directory).items():
+            serialised, dump_time, dump_peak = _measure(partial(dump, payload))
+            loaded, load_time, load_peak = _measure(partial(load, serialised))
+            assert loaded["weights"].shape == payload["weights"].shape
+            # Free both copies before measuring the next mode
+            serialised = loaded = None
+            rows.append(
+                [
+                    name,
+                    dump_time,
+                    dump_peak / megabyte,
+                    load_time,
+                    load_peak / megabyte,
+                ]
+            )
+    tracemalloc.stop()
+
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "mode (%u MB)" % args.size_mb,
+                "dump s",
+                "dump peak MB",
+                "load s",
+                "load peak MB",
+            ],
+            floatfmt=".2f",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Throughput of concurrent graph runs with and without a thread budget.
+
+Each configuration runs in a fresh interpreter since native thread pools can't
+be resized back once created. Requires numpy, torch is used when installed.
+
+    python benchmarks/bench_thread_budget.py --concurrency 1 2 4 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from tabulate import tabulate
+
+
+def _worker(concurrency: int, thread_budget: int, duration: float, size: int):
+    import numpy as np
+
+    from pipeline import Pipeline, Variable, pipeline_function
+
+    try:
+        import torch
+    except ImportError:
+        torch = None
+
+    @pipeline_function
+    def matmul(seed: int) -> float:
+        if torch is not None:
+            matrix = torch.rand(
+                size, size, generator=torch.Generator().manual_seed(seed)
+            )
+            return float((matrix @ matrix).sum())
+        matrix = np.random.default_rng(seed).random((size, size))
+        return float((matrix @ matrix).sum())
+
+    with Pipeline("bench", thread_budget=thread_budget) as builder:
+        seed = Variable(int, is_input=True)
+        builder.add_variable(seed)
+        builder.output(matmul(seed))
+
+    graph = Pipeline.get_pipeline("bench")
+    counts = [0] * concurrency
+    stop_at = time.monotonic() + duration
+
+    def run(index: int):
+        while time.monotonic() < stop_at:
+            graph.run(index)
+            counts[index] += 1
+
+    runners = [threading.Thread(target=run, args=(i,)) for i in range(concurrency)]
+    for runner in runners:
+        runner.start()
+    for runner in runners:
+        runner.join()
+    print(json.dumps({"runs_per_second": sum(counts) / duration}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=os.cpu_count())
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument("--worker", nargs=2, type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker[0], args.worker[1] or None, args.duration, args.size)
+        return
+
+    rows = []
+    for concurrency in args.concurrency:
+        row = [concurrency]
+        for thread_budget in (0, args.threads):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    str(concurrency),
+                    str(thread_budget),
+                    "--duration",
+                    str(args.duration),
+                    "--size",
+                    str(args.size),
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            row.append(json.loads(output.splitlines()[-1])["runs_per_second"])
+        rows.append(row)
+
+    print(
+        tabulate(
+            rows,
+            headers=[
+                "concurrent runs",
+                "runs/s (no budget)",
+                "runs/s (budget=%u)" % args.threads,
+            ],
+            floatfmt=".1f",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import io
 import json
+import os
 import urllib.parse
 from http import HTTPStatus
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Type, Union
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Set, Type, Union
 
 import httpx
 
@@ -12,18 +14,19 @@ from pipeline.exceptions.InvalidSchema import InvalidSchema
 from pipeline.schemas.base import BaseModel
 from pipeline.schemas.compute_requirements import ComputeRequirements
 from pipeline.schemas.data import DataGet
-from pipeline.schemas.file import FileCreate, FileGet
+from pipeline.schemas.file import FileCreate, FileFormat, FileGet
 from pipeline.schemas.function import FunctionGet
 from pipeline.schemas.model import ModelGet
 from pipeline.schemas.pipeline import PipelineFileVariableGet, PipelineGet
 from pipeline.schemas.pipeline_file import MultipartUploadMetadata, PipelineFileGet
 from pipeline.schemas.run import RunCreate, RunGet
-from pipeline.util import generate_id, python_object_to_hex
+from pipeline.util import generate_id
 
 if TYPE_CHECKING:
     from pipeline.objects import Function, Graph, Model
 
 from pipeline.api import PipelineCloud as _SyncPipelineCloud
+from pipeline.api.cloud import BINARY_MIME_TYPE
 
 FILE_CHUNK_SIZE = 200 * 1024 * 1024  # 200 MiB
 
@@ -89,9 +92,20 @@ class PipelineCloud(_SyncPipelineCloud):
     def download_pipeline(self, id: str) -> Graph:
         self._raise_not_implemeneted()
 
-    async def _post_file(self, endpoint: str, file: io.BytesIO) -> FileGet:
-        if not hasattr(file, "name"):
-            file.name = generate_id(20)
+    async def _post_file(
+        self,
+        endpoint: str,
+        file: BinaryIO,
+        form_name: str = "file",
+        json_data: dict = None,
+    ) -> dict:
+        """Upload `file` as multipart form data, streamed from the file object
+        in chunks rather than read into memory first."""
+        name = getattr(file, "name", None)
+        name = os.path.basename(name) if isinstance(name, str) else generate_id(20)
+        data = None
+        if json_data is not None:
+            data = dict(json=json.dumps(json_data))
 
         headers = {
             "Authorization": "Bearer %s" % self.token,
@@ -101,32 +115,39 @@ class PipelineCloud(_SyncPipelineCloud):
             response = await client.post(
                 url,
                 headers=headers,
-                files={"file": (file.name, file, "application/octet-stream")},
-                timeout=self.timeout,
+                data=data,
+                files={form_name: (name, file, BINARY_MIME_TYPE)},
+                timeout=self._timeout,
             )
         if response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY:
             schema = FileCreate.__name__
             raise InvalidSchema(schema=schema)
         else:
             response.raise_for_status()
-        return FileGet.parse_obj(response.json())
+        return response.json()
 
-    async def upload_file(self, file_or_path) -> FileGet:
+    async def upload_file(self, file_or_path: Union[str, Path, BinaryIO]) -> FileGet:
+        """Upload a file, given as a path or a binary file object, in the
+        binary file format."""
+        if isinstance(file_or_path, (str, Path)):
+            with open(file_or_path, "rb") as file:
+                return await self.upload_file(file)
 
-        if isinstance(file_or_path, str):
-            # TODO: Change this to wrap the file object reader to convert to hex
-            # everytime anything is read instead of reading it all at once.
+        json_data = FileCreate(file_format=FileFormat.binary).dict(exclude_none=True)
+        response = await self._post_file(
+            "/v2/files/", file_or_path, json_data=json_data
+        )
+        return FileGet.parse_obj(response)
 
+    async def upload_data(self, file_or_path: Union[str, Path, BinaryIO]) -> DataGet:
+        """Upload run data from a file, given as a path or a binary file object
+        holding the pickled data (or data encoded by
+        `pipeline.util.codecs.encode_object`, when the workers support it)."""
+        if isinstance(file_or_path, (str, Path)):
             with open(file_or_path, "rb") as file:
-                buffer = file.read()
-            hex_buffer = buffer.hex()
-            return await self._post_file("/v2/files/", io.BytesIO(hex_buffer.encode()))
-        else:
-            return await self._post_file("/v2/files/", file_or_path)
+                return await self.upload_data(file)
 
-    async def upload_data(self, file_or_path) -> DataGet:
-        uploaded_file = await self.upload_file(file_or_path)
-        uploaded_data = await self._post("/v2/data", uploaded_file.dict())
+        uploaded_data = await self._post_file("/v2/data", file_or_path, "data")
         return DataGet.parse_obj(uploaded_data)
 
     async def _post(self, endpoint, json_data):
@@ -138,7 +159,7 @@ class PipelineCloud(_SyncPipelineCloud):
         url = urllib.parse.urljoin(self.url, endpoint)
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                url, headers=headers, json=json_data, timeout=self.timeout
+                url, headers=headers, json=json_data, timeout=self._timeout
             )
 
         if response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY:
@@ -178,10 +199,13 @@ class PipelineCloud(_SyncPipelineCloud):
             Returns:
                     run (Any): Run object containing metadata and outputs.
         """
-        # TODO: Add support for generic object inference. Only strs at the moment.
         if not isinstance(raw_data_or_schema, DataGet):
-            temp_file = io.BytesIO(python_object_to_hex(raw_data_or_schema).encode())
-            uploaded_data = await self.upload_data(temp_file)
+            type_class = None
+            if self._codecs_enabled():
+                type_class = self._run_data_type(pipeline_id_or_schema)
+            encode = self._data_encoder(type_class)
+            data_file = io.BytesIO(encode(raw_data_or_schema))
+            uploaded_data = await self.upload_data(data_file)
             _data_id = uploaded_data.id
         elif isinstance(raw_data_or_schema, DataGet):
             _data_id = raw_data_or_schema.id
@@ -6,11 +6,13 @@ import json
 import os
 import sys
 import uuid
+from functools import partial
 from http import HTTPStatus
 from typing import (
     TYPE_CHECKING,
     Any,
     BinaryIO,
+    Callable,
     Dict,
     List,
     Optional,
@@ -30,6 +32,7 @@ from pipeline import configuration
 from pipeline.api.environments import PipelineCloudEnvironment, resolve_environment_id
 from pipeline.exceptions.InvalidSchema import InvalidSchema
 from pipeline.exceptions.MissingActiveToken import MissingActiveToken
+from pipeline.objects.external_arrays import externalised_arrays
 from pipeline.objects.variable import PipelineFile
 from pipeline.schemas.base import BaseModel
 from pipeline.schemas.compute_requirements import ComputeRequirements
@@ -60,6 +63,8 @@ from pipeline.util import (
     package_version,
     python_object_to_name,
 )
+from pipeline.util.codecs import encode_object, inputs_type
+from pipeline.util.compression import DEFAULT_COMPRESSION_THRESHOLD, compress
 from pipeline.util.logging import PIPELINE_FILE_STR, PIPELINE_STR
 
 if TYPE_CHECKING:
@@ -70,7 +75,13 @@ BINARY_MIME_TYPE = "application/octet-stream"
 EnvironmentObjectOrID = Union[PipelineCloudEnvironment, str]
 
 
-def _as_upload_file(object, name: Optional[str] = None) -> Tuple[str, BinaryIO, str]:
+def _as_upload_file(
+    object,
+    name: Optional[str] = None,
+    encode: Callable[[Any], bytes] = dump_object,
+    compression: Optional[str] = None,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+) -> Tuple[str, BinaryIO, str]:
     """Represent `object` as an HTTP file upload.
 
     Returns a structure suitable for passing to the `files` parameter of
@@ -78,12 +89,22 @@ def _as_upload_file(object, name: Optional[str] = None) -> Tuple[str, BinaryIO,
     """
     if name is None:
         name = str(uuid.uuid4())
-    return (name, _as_binary_file(object), BINARY_MIME_TYPE)
+    return (
+        name,
+        _as_binary_file(object, encode, compression, compression_threshold),
+        BINARY_MIME_TYPE,
+    )
 
 
-def _as_binary_file(obj) -> BinaryIO:
-    """Return `obj` as a pickle-encoded file opened in binary-read mode."""
-    return io.BytesIO(dump_object(obj))
+def _as_binary_file(
+    obj,
+    encode: Callable[[Any], bytes] = dump_object,
+    compression: Optional[str] = None,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+) -> BinaryIO:
+    """Return `obj` as a file opened in binary-read mode, pickle-encoded
+    unless another `encode` is given and compressed with `compression`."""
+    return io.BytesIO(compress(encode(obj), compression, compression_threshold))
 
 
 class PipelineCloud:
@@ -97,6 +118,9 @@ class PipelineCloud:
         token: str = None,
         timeout: float = 60.0,
         verbose: bool = True,
+        compression: Optional[str] = None,
+        compression_threshold: Optional[int] = None,
+        codecs: Optional[bool] = None,
     ):
         if url is None:
             url = os.environ.get(
@@ -111,6 +135,9 @@ class PipelineCloud:
         self._initialise_client(url, token, timeout)
 
         self.verbose = verbose
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+        self.codecs = codecs
         self.__valid_token__ = False
         if self.token is not None:
             self.authenticate()
@@ -199,9 +226,90 @@ class PipelineCloud:
             else:
                 response.raise_for_status()
 
-    def upload_data(self, obj: Any) -> DataGet:
-        """Upload the object as a pickle-encoded file to the API."""
-        files = dict(data=_as_upload_file(obj))
+    def _upload_file(
+        self,
+        obj: Any,
+        compression: Optional[str] = None,
+        **kwargs,
+    ) -> Tuple[str, BinaryIO, str]:
+        """`_as_upload_file` compressed with `compression`, falling back to the
+        client's and then the global (`configuration.COMPRESSION`) setting.
+        Pass "none" to disable compression for a single call."""
+        if compression is None:
+            compression = self.compression or configuration.COMPRESSION
+        compression_threshold = (
+            self.compression_threshold
+            if self.compression_threshold is not None
+            else configuration.COMPRESSION_THRESHOLD
+        )
+        return _as_upload_file(
+            obj,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            **kwargs,
+        )
+
+    def _codecs_enabled(self, codecs: Optional[bool] = None) -> bool:
+        """Whether run data is encoded with `encode_object`, falling back to the
+        client's and then the global (`configuration.CODECS`) setting."""
+        if codecs is None:
+            codecs = self.codecs if self.codecs is not None else configuration.CODECS
+        return codecs
+
+    def _data_encoder(
+        self, type_class: Any = None, codecs: Optional[bool] = None
+    ) -> Callable[[Any], bytes]:
+        """Encoder of run data: `encode_object` when codecs are enabled and
+        pickle otherwise."""
+        if not self._codecs_enabled(codecs):
+            return dump_object
+        return partial(encode_object, type_class=type_class)
+
+    @staticmethod
+    def _run_data_type(pipeline_id_or_schema: Union[str, PipelineGet]) -> Any:
+        """Declared type of the inputs of a run of the pipeline, when its schema
+        holds the input variable types."""
+        if not isinstance(pipeline_id_or_schema, PipelineGet):
+            return None
+        type_classes = []
+        for variable in pipeline_id_or_schema.variables:
+            if not variable.is_input:
+                continue
+            if variable.type_file is None or variable.type_file.data is None:
+                return None
+            try:
+                type_classes.append(load_object(variable.type_file.data))
+            except Exception:
+                # The type isn't importable here
+                return None
+        return inputs_type(type_classes)
+
+    def upload_data(
+        self,
+        obj: Any,
+        compression: Optional[str] = None,
+        type_class: Any = None,
+        codecs: Optional[bool] = None,
+    ) -> DataGet:
+        """
+        Upload the object as a file to the API, pickled by default.
+
+            Parameters:
+                    obj (Any): the data to upload
+                    compression (Optional[str]): "zlib" or "lzma" to compress the
+                        data, defaults to the client's compression
+                    type_class (Any): declared type of `obj` (e.g. the
+                        `type_class` of a Variable), used to pick the encoding
+                        when codecs are enabled
+                    codecs (Optional[bool]): encode the data as JSON or a raw
+                        array when possible (see `encode_object`), which the
+                        workers must support. Defaults to the client's setting.
+
+            Returns:
+                    data (DataGet): the uploaded data.
+        """
+        encode = self._data_encoder(type_class, codecs)
+        files = dict(data=self._upload_file(obj, compression, encode=encode))
         uploaded_data = self._post("/v2/data", files=files)
         return DataGet.parse_obj(uploaded_data)
 
@@ -396,7 +504,9 @@ class PipelineCloud:
         if response.status_code != HTTPStatus.NO_CONTENT:
             self._get_raise_for_status(response)
 
-    def upload_function(self, function: Function) -> FunctionGet:
+    def upload_function(
+        self, function: Function, compression: Optional[str] = None
+    ) -> FunctionGet:
         try:
             inputs = [
                 dict(name=name, type_name=python_object_to_name(type))
@@ -419,12 +529,12 @@ class PipelineCloud:
 
         response = self._post(
             "/v2/functions",
-            files=dict(pickle=_as_upload_file(function)),
+            files=dict(pickle=self._upload_file(function, compression)),
             json_data=function_create_schema.dict(),
         )
         return FunctionGet.parse_obj(response)
 
-    def upload_model(self, model: Model) -> ModelGet:
+    def upload_model(self, model: Model, compression: Optional[str] = None) -> ModelGet:
         try:
             model_create_schema = ModelCreate(
                 local_id=model.local_id,
@@ -437,7 +547,7 @@ class PipelineCloud:
 
         response = self._post(
             "/v2/models",
-            files=dict(pickle=_as_upload_file(model)),
+            files=dict(pickle=self._upload_file(model, compression)),
             json_data=model_create_schema.dict(),
         )
         return ModelGet.parse_obj(response)
@@ -449,6 +559,8 @@ class PipelineCloud:
         description: str = "",
         tags: Set[str] = None,
         environment: Optional[EnvironmentObjectOrID] = None,
+        compression: Optional[str] = None,
+        externalise_threshold: Optional[int] = None,
     ) -> PipelineGet:
         """
         Upload a Pipeline to the Cloud.
@@ -464,6 +576,13 @@ class PipelineCloud:
                         Identifier of the execution environment the pipeline
                         should run within. If None (the default) a Mystic-
                         provided default environment will be chosen.
+                    compression (Optional[str]): "zlib" or "lzma" to compress
+                        the function and model pickles, "none" to upload them
+                        uncompressed. Defaults to the client's compression.
+                    externalise_threshold (Optional[int]): Upload model array
+                        attributes of at least this many bytes as separate
+                        PipelineFiles, reattached when the pipeline starts.
+                        Defaults to None, keeping them in the model pickles.
 
             Returns:
                     pipeline (PipelineGet): Object representing uploaded pipeline.
@@ -480,18 +599,35 @@ class PipelineCloud:
                 "on adding support for 3.10 and 3.8!"
             )
 
+        with externalised_arrays(new_pipeline_graph, externalise_threshold):
+            return self._upload_graph(
+                new_pipeline_graph, public, description, tags, environment, compression
+            )
+
+    def _upload_graph(
+        self,
+        new_pipeline_graph: Graph,
+        public: bool,
+        description: str,
+        tags: Optional[Set[str]],
+        environment: Optional[EnvironmentObjectOrID],
+        compression: Optional[str],
+    ) -> PipelineGet:
         new_name = new_pipeline_graph.name
         if new_pipeline_graph.functions and self.verbose:
             print("Uploading functions")
         new_functions = [
-            self.upload_function(_function)
+            self.upload_function(_function, compression)
             for _function in new_pipeline_graph.functions
         ]
         for i, uploaded_function_schema in enumerate(new_functions):
             new_pipeline_graph.functions[i].local_id = uploaded_function_schema.id
         if new_pipeline_graph.models and self.verbose:
             print("Uploading models")
-        new_models = [self.upload_model(_model) for _model in new_pipeline_graph.models]
+        new_models = [
+            self.upload_model(_model, compression)
+            for _model in new_pipeline_graph.models
+        ]
 
         new_variables: List[PipelineVariableCreate] = []
         variable_type_uploads = []
@@ -522,8 +658,9 @@ class PipelineCloud:
             )
 
             variable_type_uploads.append(
-                _as_upload_file(
+                self._upload_file(
                     _var.type_class,
+                    compression,
                     name=_var.local_id,
                 )
             )
@@ -551,7 +688,7 @@ class PipelineCloud:
                 public=public,
                 description=description,
                 tags=tags or set(),
-                compute_type=new_pipeline_graph.compute_type,
+                compute_type=new_pipeline_graph.required_compute_type(),
                 compute_requirements=compute_requirements,
                 environment_id=resolve_environment_id(environment),
             )
@@ -598,7 +735,10 @@ class PipelineCloud:
                     run (Any): Run object containing metadata and outputs.
         """
         if not isinstance(raw_data_or_schema, DataGet):
-            uploaded_data = self.upload_data(raw_data_or_schema)
+            type_class = None
+            if self._codecs_enabled():
+                type_class = self._run_data_type(pipeline_id_or_schema)
+            uploaded_data = self.upload_data(raw_data_or_schema, type_class=type_class)
             _data_id = uploaded_data.id
         elif isinstance(raw_data_or_schema, DataGet):
             _data_id = raw_data_or_schema.id
@@ -4,7 +4,7 @@ import os
 import sys
 from pathlib import Path
 from platform import python_version
-from typing import TypedDict
+from typing import Optional, TypedDict
 
 from packaging import version
 
@@ -25,6 +25,15 @@ PIPELINE_CACHE_AUTH = PIPELINE_CACHE / "auth.json"
 
 DEFAULT_REMOTE: str = None
 
+# Compression of uploaded pickles and data ("zlib", "lzma" or None), applied to
+# payloads of at least COMPRESSION_THRESHOLD bytes
+COMPRESSION: Optional[str] = os.getenv("PIPELINE_COMPRESSION") or None
+COMPRESSION_THRESHOLD: int = int(os.getenv("PIPELINE_COMPRESSION_THRESHOLD", 64 * 1024))
+
+# Encode uploaded run data as JSON or raw arrays when possible rather than always
+# pickling it (see pipeline.util.codecs), which the receiving workers must support
+CODECS: bool = os.getenv("PIPELINE_CODECS", "").lower() in ("1", "true", "yes")
+
 if version.parse(python_version()) < version.parse("3.9.13"):
     _print(
         f"You are using python version '{python_version()}' "
@@ -3,6 +3,7 @@ import sys
 from typing import List, Optional
 
 from pipeline.console.environments import environments as environments_command
+from pipeline.console.inspect import inspect as inspect_command
 from pipeline.console.remote import remote as remote_command
 from pipeline.console.runs import runs as runs_command
 from pipeline.console.tags import tags as tags_command
@@ -232,6 +233,37 @@ def main(args: Optional[List[str]] = None) -> int:
         "pipeline_tag", help="The pipeline tag or tag_id to get"
     )
 
+    ##########
+    # pipeline inspect
+    ##########
+
+    inspect_parser = command_parser.add_parser(
+        "inspect",
+        description="Report the serialised size of each part of a saved graph",
+        help="Report the serialised size of each part of a saved graph",
+    )
+    inspect_parser.add_argument(
+        "graph_file",
+        help="The graph file, saved with Graph.save",
+    )
+    inspect_parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of captured variables to list per function",
+    )
+    inspect_parser.add_argument(
+        "--min-duplicate-size",
+        type=int,
+        default=1024,
+        help="Smallest object, in bytes, reported when pickled more than once",
+    )
+    inspect_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON",
+    )
+
     ##########
     # pipeline environments
     ##########
@@ -418,6 +450,8 @@ def main(args: Optional[List[str]] = None) -> int:
         if (code := tags_command(args)) is None:
             tags_parser.print_help()
             return 1
+    elif command == "inspect":
+        code = inspect_command(args)
     elif command == "environments":
         if (code := environments_command(args)) is None:
             if getattr(args, "sub-command") == "update":
@@ -0,0 +1,80 @@
+import argparse
+import json
+from typing import Optional
+
+from tabulate import tabulate
+
+from pipeline.objects import Graph
+
+
+def _format_size(size: Optional[int]) -> str:
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return "%.0f %s" % (size, unit) if unit == "B" else "%.1f %s" % (size, unit)
+        size /= 1024
+    return "%.1f GiB" % size
+
+
+def inspect(args: argparse.Namespace) -> int:
+    graph = Graph.load(args.graph_file)
+    report = graph.size_report(min_duplicate_size=args.min_duplicate_size)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    parts = (
+        [("function", part) for part in report["functions"]]
+        + [("model", part) for part in report["models"]]
+        + [("variable type", part) for part in report["variables"]]
+        + [("file", part) for part in report["files"]]
+    )
+    parts.sort(key=lambda kind_part: -(kind_part[1]["size"] or 0))
+    print("Graph '%s', %s in total" % (report["name"], _format_size(report["total"])))
+    print(
+        tabulate(
+            [
+                [kind, part["name"] or part.get("type"), part["local_id"]]
+                + [_format_size(part["size"])]
+                for kind, part in parts
+            ],
+            headers=["Kind", "Name", "ID", "Size"],
+            tablefmt="outline",
+        )
+    )
+
+    captured = [
+        [function["name"], variable["name"], variable["kind"]]
+        + [_format_size(variable["size"])]
+        for function in report["functions"]
+        for variable in function["captured"][: args.top]
+    ]
+    if captured:
+        print("\nCaptured variables")
+        print(
+            tabulate(
+                captured,
+                headers=["Function", "Variable", "Kind", "Size"],
+                tablefmt="outline",
+            )
+        )
+
+    if report["duplicates"]:
+        print("\nObjects pickled more than once")
+        print(
+            tabulate(
+                [
+                    [
+                        duplicate["object"],
+                        _format_size(duplicate["size"]),
+                        ", ".join(duplicate["parts"]),
+                    ]
+                    for duplicate in report["duplicates"]
+                ],
+                headers=["Object", "Size", "Pickled in"],
+                tablefmt="outline",
+            )
+        )
+    return 0
@@ -7,7 +7,7 @@ from pipeline.api import PipelineCloud
 from pipeline.schemas.file import FileGet
 from pipeline.schemas.pagination import Paginated
 from pipeline.schemas.run import RunGet, RunState
-from pipeline.util import hex_to_python_object
+from pipeline.util import load_object
 
 
 def runs(args: argparse.Namespace) -> int:
@@ -63,7 +63,7 @@ def runs(args: argparse.Namespace) -> int:
                 )
 
                 file_schema = FileGet.parse_obj(file_schema_raw)
-                raw_result = hex_to_python_object(file_schema.data)
+                raw_result = load_object(file_schema.data)
                 print(json.dumps(raw_result))
 
             return 0
@@ -0,0 +1,8 @@
+class NodeTimeout(Exception):
+    def __init__(self, node=None, message="Node timed out") -> None:
+        self.node = node
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.node} -> {self.message}"
@@ -0,0 +1,8 @@
+class ResultCacheTimeout(Exception):
+    def __init__(self, key=None, message="Timed out waiting for a result") -> None:
+        self.key = key
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.key} -> {self.message}"
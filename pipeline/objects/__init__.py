@@ -3,6 +3,7 @@ from pipeline.objects.function import Function
 from pipeline.objects.graph import Graph
 from pipeline.objects.model import Model
 from pipeline.objects.pipeline import Pipeline
+from pipeline.objects.result_cache import ResultCache
 from pipeline.objects.variable import PipelineFile, Variable
 from pipeline.objects.wrappers import onnx_to_pipeline
 
@@ -16,4 +17,5 @@ __all__ = [
     "pipeline_model",
     "PipelineFile",
     "onnx_to_pipeline",
+    "ResultCache",
 ]
@@ -0,0 +1,127 @@
+import multiprocessing
+import threading
+import traceback
+from typing import Any, List, Tuple
+
+from pipeline.util import dump_object, load_object
+from pipeline.util.shared_memory import DEFAULT_THRESHOLD, SharedMemoryTransport
+
+
+def _serve(connection, model_payload: bytes, shared_memory_threshold: int) -> None:
+    """Actor process loop: run the requested model methods until told to stop."""
+    model = load_object(model_payload)
+    transport = SharedMemoryTransport(threshold=shared_memory_threshold)
+    while True:
+        try:
+            request = transport.loads(connection.recv_bytes())
+        except EOFError:
+            transport.close()
+            return
+        # A new request means the previous response has been loaded
+        transport.cleanup()
+        transport.collect()
+        if request is None:
+            transport.close()
+            return
+
+        method_name, args = request
+        try:
+            response = (True, getattr(model, method_name)(*args))
+        except Exception as exception:
+            response = (False, exception)
+
+        try:
+            payload = transport.dumps(response)
+        except Exception:
+            # The result or exception could not be pickled
+            payload = transport.dumps((False, Exception(traceback.format_exc())))
+        connection.send_bytes(payload)
+
+
+class ModelActor:
+    """Hosts a `pipeline_model` instance in a dedicated long-lived process.
+
+    Method calls are sent over a pipe and run in the actor process, so model
+    work doesn't contend on the GIL with the orchestrating process. Arguments
+    and results go through a SharedMemoryTransport, so large arrays are not
+    copied through the pipe. Startup calls are recorded and replayed when the
+    process is restarted after a crash.
+    """
+
+    def __init__(self, model: Any, shared_memory_threshold: int = DEFAULT_THRESHOLD):
+        # Snapshot taken before any startup function runs
+        self._model_payload = dump_object(model)
+        self._transport = SharedMemoryTransport(threshold=shared_memory_threshold)
+        self._startup_calls: List[Tuple[str, tuple]] = []
+        self._process = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @property
+    def transport_stats(self) -> dict:
+        return dict(self._transport.stats)
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            args=(
+                child_connection,
+                self._model_payload,
+                self._transport.threshold,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+
+        for method_name, args in self._startup_calls:
+            self._request(method_name, args)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self.is_alive:
+                try:
+                    self._connection.send_bytes(self._transport.dumps(None))
+                except OSError:
+                    pass
+                self._process.join(timeout=5)
+                if self._process.is_alive():
+                    self._process.kill()
+            self._process = None
+            self._transport.close()
+
+    def call(self, method_name: str, args: tuple, *, startup: bool = False) -> Any:
+        with self._lock:
+            if not self.is_alive:
+                self.start()
+            if startup:
+                self._startup_calls.append((method_name, args))
+
+            try:
+                return self._request(method_name, args)
+            except (EOFError, OSError):
+                self._process.join(timeout=1)
+                exit_code = self._process.exitcode
+                self.start()
+                raise Exception(
+                    "Model actor process exited (code:%s) during '%s', "
+                    "it has been restarted" % (exit_code, method_name)
+                )
+
+    def _request(self, method_name: str, args: tuple) -> Any:
+        try:
+            self._connection.send_bytes(self._transport.dumps((method_name, args)))
+            success, response = self._transport.loads(self._connection.recv_bytes())
+        finally:
+            # The actor has loaded the request once it responds (or died)
+            self._transport.cleanup()
+            self._transport.collect()
+        if not success:
+            raise response
+        return response
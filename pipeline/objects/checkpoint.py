@@ -0,0 +1,62 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pipeline import configuration
+from pipeline.util import dump_object, load_object
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # A pre-empted write must never leave a truncated checkpoint behind
+    temporary_path = path.with_name(path.name + ".tmp")
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+class RunCheckpoint:
+    """Node outputs of a run persisted under `PIPELINE_CACHE/runs/<run_id>`, so
+    that an interrupted run can be resumed without recomputing finished nodes.
+
+    Outputs are stored per node under `node_keys` (node id -> file name), which
+    must stay the same when the graph is rebuilt. The directory records the
+    fingerprint of the run's inputs and graph, a run id can only be resumed
+    with the same ones.
+    """
+
+    def __init__(self, run_id: str, run_fingerprint: str, node_keys: Dict[str, str]):
+        if not run_id or Path(run_id).name != run_id:
+            raise Exception("Invalid run id '%s'" % run_id)
+        self.run_id = run_id
+        self.node_keys = node_keys
+        self.directory = configuration.PIPELINE_CACHE / "runs" / run_id
+
+        fingerprint_path = self.directory / "fingerprint"
+        if fingerprint_path.exists():
+            if fingerprint_path.read_text() != run_fingerprint:
+                raise Exception(
+                    "Checkpoint of run '%s' was created with different inputs "
+                    "or graph" % run_id
+                )
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _write_atomic(fingerprint_path, run_fingerprint.encode())
+
+    def _path(self, node_id: str) -> Path:
+        return self.directory / ("%s.pkl" % self.node_keys[node_id])
+
+    def load(self, node_id: str) -> Optional[List[Any]]:
+        """Outputs saved for a node, or None if it hadn't finished."""
+        path = self._path(node_id)
+        if not path.exists():
+            return None
+        return load_object(path.read_bytes())
+
+    def save(self, node_id: str, outputs: List[Any]) -> None:
+        _write_atomic(self._path(node_id), dump_object(outputs))
+
+    def remove(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,138 @@
+import csv
+import sys
+import typing
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Union
+
+ColumnSource = Union[Mapping[str, Sequence], str, Path]
+
+# Variable types that CSV values (always read as strings) are converted to
+_CSV_TYPES = (bool, int, float)
+
+
+def iter_column_chunks(
+    source: ColumnSource,
+    names: List[str],
+    chunk_size: int,
+    type_classes: Dict[str, Any] = None,
+) -> Iterator[Dict[str, Sequence]]:
+    """Yield the `names` columns of `source` in chunks of up to `chunk_size` rows.
+
+    Parameters:
+            source: a mapping of column name to a list or numpy array, or
+                the path of a CSV or Parquet (requires pyarrow) file
+            names (List[str]): columns to read
+            chunk_size (int): maximum rows per chunk
+            type_classes (Dict[str, Any]): types to convert CSV values to,
+                by column name
+
+    Returns:
+            chunks (Iterator[Dict[str, Sequence]]): column slices by name.
+    """
+    if chunk_size < 1:
+        raise Exception("chunk_size must be at least 1")
+
+    if isinstance(source, Mapping):
+        return _mapping_chunks(source, names, chunk_size)
+
+    path = Path(source)
+    if path.suffix.lower() == ".csv":
+        return _csv_chunks(path, names, chunk_size, type_classes or {})
+    if path.suffix.lower() in (".parquet", ".pq"):
+        return _parquet_chunks(path, names, chunk_size)
+    raise Exception("Unsupported column file type '%s'" % path.suffix)
+
+
+def _check_names(available: Sequence[str], names: List[str]) -> None:
+    missing = [name for name in names if name not in available]
+    if missing:
+        raise Exception("Missing input columns: %s" % ", ".join(missing))
+
+
+def _mapping_chunks(
+    columns: Mapping[str, Sequence], names: List[str], chunk_size: int
+) -> Iterator[Dict[str, Sequence]]:
+    _check_names(list(columns), names)
+    lengths = {len(columns[name]) for name in names}
+    if len(lengths) > 1:
+        raise Exception("Input columns have different lengths")
+
+    rows = lengths.pop() if lengths else 0
+    for start in range(0, rows, chunk_size):
+        yield {name: columns[name][start : start + chunk_size] for name in names}
+
+
+def _parse_csv_value(value: str, type_class: Any) -> Any:
+    if type_class is bool:
+        return value.strip().lower() in ("1", "true", "yes")
+    return type_class(value)
+
+
+def _csv_chunks(
+    path: Path, names: List[str], chunk_size: int, type_classes: Dict[str, Any]
+) -> Iterator[Dict[str, Sequence]]:
+    converters = {
+        name: type_classes[name]
+        for name in names
+        if type_classes.get(name) in _CSV_TYPES
+    }
+    with open(path, newline="") as file:
+        reader = csv.DictReader(file)
+        _check_names(reader.fieldnames or [], names)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            chunk = {}
+            for name in names:
+                values = [row[name] for row in rows]
+                if name in converters:
+                    values = [
+                        _parse_csv_value(value, converters[name]) for value in values
+                    ]
+                chunk[name] = values
+            yield chunk
+
+
+def _parquet_chunks(
+    path: Path, names: List[str], chunk_size: int
+) -> Iterator[Dict[str, Sequence]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise Exception(
+            "Reading Parquet files requires pyarrow, install it with "
+            "`pip install pyarrow`"
+        )
+
+    parquet_file = pq.ParquetFile(path)
+    _check_names(parquet_file.schema_arrow.names, names)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=names):
+        chunk = {}
+        for name in names:
+            column = batch.column(name)
+            try:
+                chunk[name] = column.to_numpy(zero_copy_only=False)
+            except NotImplementedError:
+                # Nested types, e.g. list columns
+                chunk[name] = column.to_pylist()
+            if getattr(chunk[name], "dtype", None) == object:
+                chunk[name] = column.to_pylist()
+        yield chunk
+
+
+def column_values(column: Sequence, type_class: Any) -> Sequence:
+    """Values of a column as accepted by a Variable of `type_class`: rows of numpy
+    columns become Python values for scalar and list Variable types."""
+    numpy = sys.modules.get("numpy")
+    if (
+        numpy is not None
+        and isinstance(column, numpy.ndarray)
+        and (
+            type_class in (bool, int, float, complex, str, list)
+            or typing.get_origin(type_class) is list
+        )
+    ):
+        return column.tolist()
+    return column
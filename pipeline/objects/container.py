@@ -0,0 +1,261 @@
+"""Container format for saved graphs.
+
+A container starts with a magic header and holds separate sections for the
+variable types, the functions, each model and the graph itself, followed by a
+JSON manifest describing the graph and a footer locating the manifest:
+
+    header | types | functions | graph | model 0 | ... | manifest | footer
+
+Sections are written with `pipeline.util.buffers`, so large arrays are stored
+out-of-band and memory-mapped on load. References between sections (e.g. from
+a node function to its model) are pickled as persistent ids, which lets models
+be loaded only when a node first needs them and the manifest be read without
+loading anything.
+"""
+import importlib.metadata
+import json
+import mmap
+import struct
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Tuple, Union
+
+from pipeline.util.buffers import dump_buffers, loads_buffers
+from pipeline.util.shared_memory import BufferPickler
+
+CONTAINER_MAGIC = b"PLGRAPH\n"
+CONTAINER_VERSION = 1
+
+_ALIGNMENT = 64
+# Magic, container version
+_HEADER = struct.Struct("<8sI")
+# Manifest offset, manifest length, magic
+_FOOTER = struct.Struct("<QQ8s")
+
+
+class _ContainerPickler(BufferPickler):
+    """Pickles objects stored in other sections as references to them."""
+
+    def __init__(self, *args, references: Dict[int, tuple], own: tuple, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._references = references
+        self._own = own
+
+    def persistent_id(self, obj):
+        reference = self._references.get(id(obj))
+        if reference is None or reference[0] in self._own or reference in self._own:
+            return None
+        return reference
+
+
+class LazyModel:
+    """Placeholder for a model of a loaded container, loaded on first use.
+
+    Graphs replace it with the loaded model when one of its nodes runs.
+    Attribute access and pickling also load the model.
+    """
+
+    def __init__(self, container: "GraphContainer", index: int):
+        self._container = container
+        self._index = index
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                self._model = self._container.load_model(self._index)
+        return self._model
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ("_container", "_index", "_model", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __reduce__(self):
+        return _loaded, (self.load(),)
+
+
+def _loaded(model: Any) -> Any:
+    return model
+
+
+def _pipeline_version() -> str:
+    try:
+        return importlib.metadata.version("pipeline-ai")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _type_name(type_class: Any) -> str:
+    if isinstance(type_class, type):
+        return "%s.%s" % (type_class.__module__, type_class.__qualname__)
+    return repr(type_class)
+
+
+def _manifest(graph: Any, sections: Dict[str, Any]) -> dict:
+    return dict(
+        format="pipeline-graph",
+        version=CONTAINER_VERSION,
+        pipeline_version=_pipeline_version(),
+        name=graph.name,
+        local_id=graph.local_id,
+        compute_type=graph.compute_type,
+        variables=[
+            dict(
+                local_id=var.local_id,
+                name=var.name,
+                type=_type_name(var.type_class),
+                is_input=var.is_input,
+                is_output=var.is_output,
+            )
+            for var in graph.variables
+        ],
+        outputs=[var.local_id for var in graph.outputs],
+        functions=[
+            dict(local_id=function.local_id, name=function.name, hash=function.hash)
+            for function in graph.functions
+        ],
+        models=[
+            dict(
+                local_id=model.local_id,
+                name=model.name,
+                type=_type_name(type(model.model)),
+                size=sections["models"][index][1],
+            )
+            for index, model in enumerate(graph.models)
+        ],
+        nodes=[
+            dict(
+                local_id=node.local_id,
+                function=node.function.local_id,
+                inputs=[var.local_id for var in node.inputs],
+                outputs=[var.local_id for var in node.outputs],
+            )
+            for node in graph.nodes
+        ],
+        sections=sections,
+    )
+
+
+def save_container(graph: Any, file: BinaryIO) -> int:
+    """Write `graph` to a binary file object as a container, returning the
+    number of bytes written. Lazy models must have been loaded."""
+    types = [var.type_class for var in graph.variables]
+    references: Dict[int, tuple] = {}
+    for index, type_class in enumerate(types):
+        references.setdefault(id(type_class), ("type", index))
+    for index, function in enumerate(graph.functions):
+        references[id(function)] = ("function", index)
+        references[id(function.function)] = ("callable", index)
+    for index, model in enumerate(graph.models):
+        references[id(model.model)] = ("model", index)
+
+    start = file.tell()
+    file.write(_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION))
+
+    def write_section(obj: Any, own: tuple) -> Tuple[int, int]:
+        file.write(bytes(-(file.tell() - start) % _ALIGNMENT))
+        offset = file.tell() - start
+        pickler_class = partial(_ContainerPickler, references=references, own=own)
+        return offset, dump_buffers(obj, file, pickler_class=pickler_class)
+
+    sections = dict(
+        types=write_section(types, ("type",)),
+        functions=write_section(graph.functions, ("function", "callable")),
+        graph=write_section(graph, ()),
+        models=[
+            write_section(model.model, (("model", index),))
+            for index, model in enumerate(graph.models)
+        ],
+    )
+
+    manifest = json.dumps(_manifest(graph, sections)).encode()
+    manifest_offset = file.tell() - start
+    file.write(manifest)
+    file.write(_FOOTER.pack(manifest_offset, len(manifest), CONTAINER_MAGIC))
+    return file.tell() - start
+
+
+def is_container(path: Union[str, Path]) -> bool:
+    with open(path, "rb") as file:
+        return file.read(len(CONTAINER_MAGIC)) == CONTAINER_MAGIC
+
+
+def read_manifest(file: BinaryIO) -> dict:
+    file.seek(0)
+    magic, version = _HEADER.unpack(file.read(_HEADER.size))
+    if magic != CONTAINER_MAGIC:
+        raise Exception("Not a graph container")
+    if version > CONTAINER_VERSION:
+        raise Exception(
+            "Graph container version %u is not supported (latest %u), "
+            "upgrade pipeline-ai to load it" % (version, CONTAINER_VERSION)
+        )
+
+    file.seek(-_FOOTER.size, 2)
+    manifest_offset, manifest_length, magic = _FOOTER.unpack(file.read(_FOOTER.size))
+    if magic != CONTAINER_MAGIC:
+        raise Exception("Truncated graph container")
+    file.seek(manifest_offset)
+    return json.loads(file.read(manifest_length))
+
+
+class GraphContainer:
+    """Reader for a graph container file.
+
+    With `mmap_buffers` the file is memory-mapped copy-on-write, and arrays
+    stored out-of-band share the mapping instead of being read into memory.
+    """
+
+    def __init__(self, path: Union[str, Path], mmap_buffers: bool = True):
+        self.path = Path(path)
+        self.mmap_buffers = mmap_buffers
+        with open(self.path, "rb") as file:
+            self.manifest = read_manifest(file)
+            self._mapped = None
+            if mmap_buffers:
+                self._mapped = memoryview(
+                    mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+                )
+        self._objects: Dict[str, List[Any]] = dict(
+            type=[], function=[], callable=[], model=[]
+        )
+
+    def _persistent_load(self, reference: tuple) -> Any:
+        kind, index = reference
+        return self._objects[kind][index]
+
+    def _load_section(self, section: List[int]) -> Any:
+        offset, length = section
+        if self._mapped is not None:
+            payload = self._mapped[offset : offset + length]
+        else:
+            with open(self.path, "rb") as file:
+                file.seek(offset)
+                payload = bytearray(length)
+                file.readinto(payload)
+        return loads_buffers(payload, persistent_load=self._persistent_load)
+
+    def load_model(self, index: int) -> Any:
+        return self._load_section(self.manifest["sections"]["models"][index])
+
+    def load_graph(self, lazy_models: bool = True) -> Any:
+        sections = self.manifest["sections"]
+        self._objects["model"] = [
+            LazyModel(self, index) for index in range(len(sections["models"]))
+        ]
+        self._objects["type"] = self._load_section(sections["types"])
+        functions = self._load_section(sections["functions"])
+        self._objects["function"] = functions
+        self._objects["callable"] = [function.function for function in functions]
+
+        graph = self._load_section(sections["graph"])
+        if not lazy_models:
+            graph._load_lazy_models()
+        return graph
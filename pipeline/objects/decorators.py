@@ -8,7 +8,17 @@ from pipeline.objects.pipeline import Pipeline
 from pipeline.objects.variable import Variable
 
 
-def pipeline_function(function=None, *, run_once=False, on_startup=False):
+def pipeline_function(
+    function=None,
+    *,
+    run_once=False,
+    on_startup=False,
+    batched=False,
+    timeout=None,
+    resources=None,
+    stage=None,
+    vectorize=False,
+):
     """_summary_
 
     Args:
@@ -23,9 +33,41 @@ def pipeline_function(function=None, *, run_once=False, on_startup=False):
             will cause the wrapped function to be executed at the start of a pipeline
             run, regardless of when it's placed when defining the pipeline.
 
+        batched (bool, optional): Defaults to False. Setting to True marks the
+            function as batch-aware: when used with `Pipeline.map` it is called
+            with a list of elements and must return a list of results of the
+            same length, instead of being called once per element.
+
+        timeout (float, optional): Defaults to None. Maximum number of seconds a
+            call may take during a run before `NodeTimeout` is raised. Timed out
+            calls are abandoned rather than interrupted.
+
+        resources (str, optional): Defaults to None. Resource class the function
+            needs, e.g. "cpu" or "gpu". Graphs with `pools` configured run each
+            node on the executor pool of its class (unannotated nodes use "cpu"),
+            and the annotations set the compute type requested on upload.
+
+        stage (int, optional): Defaults to None. Stage of a pipeline-parallel
+            execution (see `pipeline.objects.parallel`) that the function runs in.
+            Unannotated functions run in the same stage as the preceding node.
+
+        vectorize (bool, optional): Defaults to False. Setting to True marks the
+            function as written in terms of numpy operations: `Graph.run_batch`
+            stacks each input over the batch into an array with a leading batch
+            axis, calls the function once and splits the results along that axis.
+
     """
     if function is None:
-        return partial(pipeline_function, run_once=run_once, on_startup=on_startup)
+        return partial(
+            pipeline_function,
+            run_once=run_once,
+            on_startup=on_startup,
+            batched=batched,
+            timeout=timeout,
+            resources=resources,
+            stage=stage,
+            vectorize=vectorize,
+        )
 
     @wraps(function)
     def execute_func(*args, **kwargs):
@@ -97,20 +139,49 @@ def pipeline_function(function=None, *, run_once=False, on_startup=False):
     function.__has_run__ = False
 
     function.__on_startup__ = on_startup
+    function.__batched__ = batched
+    function.__timeout__ = timeout
+    function.__resources__ = resources
+    function.__stage__ = stage
+    function.__vectorize__ = vectorize
     function.__pipeline_function__ = Function(function)
 
     return execute_func
 
 
 class pipeline_model(object):
+    """Decorator marking a class as a model whose methods can be used as
+    pipeline functions.
+
+    Args:
+        model_class (type, optional): The decorated class, this is automatically
+            handled when used as `@pipeline_model`.
+
+        replicas (int, optional): Defaults to 1. Number of instances a graph keeps
+            for each created model. Concurrent runs check out a free instance per
+            call so models that aren't thread-safe can serve requests in parallel.
+            Each replica runs its own on_startup functions.
+
+        actor (bool, optional): Defaults to False. Setting to True hosts each
+            created model in a dedicated long-lived process (an actor). All of its
+            pipeline functions, including startup, run in that process, which is
+            restarted if it crashes. Call `Graph.shutdown()` to stop it.
+
+    """
+
     def __init__(
         self,
         model_class=None,
+        *,
+        replicas: int = 1,
+        actor: bool = False,
     ):
         if model_class is not None:
             model_class.__pipeline_model__ = True
 
         self.model_class = model_class
+        self.replicas = replicas
+        self.actor = actor
 
     def __call__(self, *args, **kwargs):
 
@@ -126,6 +197,10 @@ class pipeline_model(object):
             return self.model_class(*args, **kwargs)
         else:
             created_model = self.model_class(*args, **kwargs)
+            if self.replicas > 1:
+                created_model.__pipeline_replicas__ = self.replicas
+            if self.actor:
+                created_model.__pipeline_actor__ = True
 
             model_schema = Model(model=created_model)
             Pipeline._current_pipeline.models.append(model_schema)
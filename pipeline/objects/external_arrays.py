@@ -0,0 +1,130 @@
+"""Large model arrays uploaded as PipelineFiles instead of inside the model
+pickles.
+
+`externalised_arrays` replaces the numpy array and CPU torch tensor attributes
+of the graph's models that are at least `threshold` bytes large with
+`ExternalArray` placeholders. Each array is written to its own file, which is
+added to the graph as a PipelineFile, so it is uploaded through the chunked
+multipart path and versioned separately from the model code. Graphs reattach
+the arrays from their PipelineFiles on startup.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+import dill
+
+from pipeline.objects.variable import PipelineFile
+from pipeline.util.buffers import BUFFERS_MAGIC, dump_buffers, load_buffers
+
+DEFAULT_EXTERNALISE_THRESHOLD = 16 * 1024 * 1024  # 16 MiB
+
+
+class ExternalArray:
+    """Placeholder for a model attribute stored in the PipelineFile `local_id`."""
+
+    def __init__(self, local_id: str, nbytes: int):
+        self.local_id = local_id
+        self.nbytes = nbytes
+
+    def __repr__(self) -> str:
+        return "ExternalArray(local_id=%r, nbytes=%u)" % (self.local_id, self.nbytes)
+
+
+def _array_nbytes(value: Any) -> Optional[int]:
+    numpy = sys.modules.get("numpy")
+    if (
+        numpy is not None
+        and isinstance(value, numpy.ndarray)
+        and not value.dtype.hasobject
+    ):
+        return value.nbytes
+    torch = sys.modules.get("torch")
+    if (
+        torch is not None
+        and isinstance(value, torch.Tensor)
+        and value.device.type == "cpu"
+    ):
+        return value.element_size() * value.nelement()
+    return None
+
+
+@contextmanager
+def externalised_arrays(
+    graph: Any, threshold: Optional[int] = DEFAULT_EXTERNALISE_THRESHOLD
+) -> Iterator[List[PipelineFile]]:
+    """Move the large array attributes of the graph's models into
+    PipelineFiles for the duration of the context, yielding the added files.
+    The models and the graph's variables are restored on exit, and the files
+    removed. Nothing is moved when `threshold` is None."""
+    if threshold is None:
+        yield []
+        return
+
+    graph._load_lazy_models()
+    replaced = []
+    files: List[PipelineFile] = []
+    with tempfile.TemporaryDirectory(prefix="pipeline-external-") as directory:
+        try:
+            for model in graph.models:
+                instance = model.model
+                for name, value in list(getattr(instance, "__dict__", {}).items()):
+                    nbytes = _array_nbytes(value)
+                    if nbytes is None or nbytes < threshold:
+                        continue
+
+                    path = os.path.join(directory, "%s-%s" % (model.local_id, name))
+                    with open(path, "wb") as file:
+                        dump_buffers(value, file)
+                    pipeline_file = PipelineFile(
+                        path=path, name="%s.%s" % (type(instance).__name__, name)
+                    )
+                    graph.variables.append(pipeline_file)
+                    files.append(pipeline_file)
+                    setattr(
+                        instance, name, ExternalArray(pipeline_file.local_id, nbytes)
+                    )
+                    replaced.append((instance, name, value))
+            yield files
+        finally:
+            for instance, name, value in replaced:
+                setattr(instance, name, value)
+            graph.variables[:] = [
+                var
+                for var in graph.variables
+                if not any(var is pipeline_file for pipeline_file in files)
+            ]
+
+
+def _load_file(path: str) -> Any:
+    with open(path, "rb") as file:
+        magic = file.read(len(BUFFERS_MAGIC))
+        file.seek(0)
+        if magic == BUFFERS_MAGIC:
+            return load_buffers(file, mmap_buffers=True)
+        # Written by PipelineCloud.download_remotes
+        return dill.load(file)
+
+
+def reattach_arrays(graph: Any, instance: Any) -> None:
+    """Replace the ExternalArray attributes of a model instance with the arrays
+    loaded from their PipelineFiles."""
+    for name, value in list(getattr(instance, "__dict__", {}).items()):
+        if not isinstance(value, ExternalArray):
+            continue
+        pipeline_file = next(
+            (var for var in graph.variables if var.local_id == value.local_id), None
+        )
+        if pipeline_file is None:
+            raise Exception(
+                "PipelineFile '%s' holding the attribute '%s' of %s is missing "
+                "from the graph" % (value.local_id, name, type(instance).__name__)
+            )
+        if not pipeline_file.path:
+            raise Exception(
+                "Must call PipelineCloud().download_remotes(...) on remote "
+                "PipelineFiles"
+            )
+        setattr(instance, name, _load_file(pipeline_file.path))
@@ -5,6 +5,7 @@ from typing import Any, Callable, Dict, Optional
 
 from pipeline.schemas.function import FunctionGet
 from pipeline.util import generate_id, load_object
+from pipeline.util.fingerprint import function_fingerprint
 
 
 class Function:
@@ -51,6 +52,16 @@ class Function:
 
         self.local_id = generate_id(10)
 
+    def fingerprint(self) -> str:
+        """
+        Deterministic content fingerprint of the function: a Merkle tree over
+        its source, bytecode, referenced globals, closure variables and
+        defaults. Unlike `hash` it changes when anything the function uses
+        changes, not only its source, and is the same for functions without
+        source. It is computed on every call.
+        """
+        return function_fingerprint(self.function)
+
     @classmethod
     def from_schema(cls, schema: FunctionGet):
         unpickled_data = load_object(schema.hex_file.data)
@@ -1,14 +1,54 @@
-from typing import List
+import copy
+import os
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    FIRST_EXCEPTION,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from cloudpickle import dumps
-from dill import loads
+import dill
 
+from pipeline.exceptions.NodeTimeout import NodeTimeout
+from pipeline.exceptions.ResultCacheTimeout import ResultCacheTimeout
+from pipeline.objects.actor import ModelActor
+from pipeline.objects.checkpoint import RunCheckpoint
+from pipeline.objects.columns import ColumnSource, column_values, iter_column_chunks
+from pipeline.objects.container import (
+    GraphContainer,
+    LazyModel,
+    is_container,
+    read_manifest,
+    save_container,
+)
+from pipeline.objects.external_arrays import reattach_arrays
 from pipeline.objects.function import Function
 from pipeline.objects.graph_node import GraphNode
 from pipeline.objects.model import Model
+from pipeline.objects.replicas import ReplicaPool
+from pipeline.objects.result_cache import ResultCache
+from pipeline.objects.size_report import DEFAULT_DUPLICATE_SIZE, size_report
+from pipeline.objects.spill import DEFAULT_SPILL_THRESHOLD, SpillingVariables
+from pipeline.objects.validation import Validator, compile_validator
 from pipeline.objects.variable import PipelineFile, Variable
 from pipeline.schemas.pipeline import PipelineGet
 from pipeline.util import generate_id
+from pipeline.util.fingerprint import (
+    combine_fingerprints,
+    file_fingerprint,
+    fingerprint,
+    value_fingerprint,
+)
+from pipeline.util.shared_memory import BufferPickler
+from pipeline.util.threads import get_thread_budget
+
+# Buffer size used when streaming graphs to and from files
+FILE_BUFFER_SIZE = 1024 * 1024  # 1 MiB
 
 
 class Graph:
@@ -31,6 +71,12 @@ class Graph:
     compute_type: str
     min_gpu_vram_mb: int
 
+    max_workers: int
+    pools: Dict[str, int]
+    thread_budget: int
+    result_cache: Optional[ResultCache]
+    validation: str
+
     def __init__(
         self,
         *,
@@ -42,6 +88,11 @@ class Graph:
         models: List[Model] = None,
         compute_type: str = "gpu",
         min_gpu_vram_mb: int = None,
+        max_workers: int = None,
+        pools: Dict[str, int] = None,
+        thread_budget: int = None,
+        result_cache: ResultCache = None,
+        validation: str = "shallow",
     ):
         self.name = name
         self.local_id = generate_id(10)
@@ -53,13 +104,159 @@ class Graph:
         self.models = models if models is not None else []
         # Flag set when all functions with the on_startup field have run
         self._has_run_startup = False
+        self._startup_lock = threading.Lock()
+        # Pools for models decorated with pipeline_model(replicas=N), by model id
+        self._replica_pools = {}
+        # Processes hosting models decorated with pipeline_model(actor=True)
+        self._actors = {}
         self.compute_type = compute_type
         self.min_gpu_vram_mb = min_gpu_vram_mb
+        # Executor used for concurrent node work (e.g. mapped nodes), created lazily
+        self.max_workers = max_workers
+        self._executor = None
+        # Worker counts per resource class (e.g. {"cpu": 4, "gpu": 1}), when set
+        # nodes are scheduled onto a separate pool per resource class
+        self.pools = pools
+        self._pool_executors = {}
+        # Number of CPU threads shared by native libraries across concurrent runs
+        self.thread_budget = thread_budget
+        # Whole run results by input fingerprint, when set
+        self.result_cache = result_cache
+        # Input validation strictness: "none", "shallow" or "deep"
+        self.validation = validation
+        # Compiled input validators by (variable id, strictness)
+        self._validators = {}
+        # Duration in seconds of each node's most recent execution, by node id
+        self.node_timings = {}
+        # Input fingerprints and variable values of the last incremental run
+        self._previous_run = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Executors hold threads and locks so can't be pickled, they are
+        # recreated on demand after loading
+        state["_executor"] = None
+        state["_pool_executors"] = {}
+        state["_startup_lock"] = None
+        state["_replica_pools"] = {}
+        state["_actors"] = {}
+        state["_previous_run"] = None
+        state["_validators"] = {}
+        return state
+
+    def __setstate__(self, state):
+        # Graphs pickled by earlier versions lack the attributes added since
+        state.setdefault("max_workers", None)
+        state.setdefault("_executor", None)
+        state.setdefault("pools", None)
+        state.setdefault("_pool_executors", {})
+        state.setdefault("_replica_pools", {})
+        state.setdefault("_actors", {})
+        state.setdefault("node_timings", {})
+        state.setdefault("_previous_run", None)
+        state.setdefault("thread_budget", None)
+        state.setdefault("result_cache", None)
+        state.setdefault("validation", "shallow")
+        # Validators are compiled on first use, never restored
+        state["_validators"] = {}
+        self.__dict__.update(state)
+        self._startup_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if getattr(self, "_executor", None) is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _pool_executor(self, resource_class: str) -> ThreadPoolExecutor:
+        if not hasattr(self, "_pool_executors"):
+            self._pool_executors = {}
+        if resource_class not in self._pool_executors:
+            self._pool_executors[resource_class] = ThreadPoolExecutor(
+                max_workers=(self.pools or {}).get(resource_class, 1),
+                thread_name_prefix="pipeline-%s" % resource_class,
+            )
+        return self._pool_executors[resource_class]
+
+    def resource_classes(self) -> Set[str]:
+        """Resource classes annotated with `pipeline_function(resources=...)`."""
+        return {
+            function.function.__resources__
+            for function in self.functions
+            if getattr(function.function, "__resources__", None) is not None
+        }
+
+    def required_compute_type(self) -> str:
+        """Compute type implied by the node resource annotations, where
+        unannotated nodes need the graph compute_type. Only downgrades to "cpu"
+        when no node needs a GPU."""
+        if self.min_gpu_vram_mb:
+            return self.compute_type
+        resource_classes = {
+            getattr(function.function, "__resources__", None) or self.compute_type
+            for function in self.functions
+        }
+        if not resource_classes:
+            return self.compute_type
+        return "gpu" if "gpu" in resource_classes else "cpu"
+
+    def _max_concurrency(self) -> int:
+        """Upper bound on the number of nodes this graph executes at once."""
+        concurrency = sum(self.pools.values()) if self.pools else 1
+        if any(node.mapped for node in self.nodes):
+            concurrency = max(concurrency, self.max_workers or os.cpu_count() or 1)
+        return concurrency
+
+    def _replica_pool(self, model: Any) -> Optional[ReplicaPool]:
+        replicas = getattr(model, "__pipeline_replicas__", 1)
+        if replicas <= 1:
+            return None
+        if not hasattr(self, "_replica_pools"):
+            self._replica_pools = {}
+        if id(model) not in self._replica_pools:
+            self._replica_pools[id(model)] = ReplicaPool(model, replicas)
+        return self._replica_pools[id(model)]
+
+    def _actor(self, model: Any) -> Optional[ModelActor]:
+        if not getattr(model, "__pipeline_actor__", False):
+            return None
+        if not hasattr(self, "_actors"):
+            self._actors = {}
+        if id(model) not in self._actors:
+            self._actors[id(model)] = ModelActor(model)
+        return self._actors[id(model)]
+
+    def shutdown(self) -> None:
+        """Stop model actor processes and executor threads owned by the graph.
+        They are started again on demand if the graph is run afterwards."""
+        for actor in getattr(self, "_actors", {}).values():
+            actor.stop()
+        self._actors = {}
+
+        executors = list(getattr(self, "_pool_executors", {}).values())
+        if getattr(self, "_executor", None) is not None:
+            executors.append(self._executor)
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._pool_executors = {}
 
     def _startup(self):
         if self._has_run_startup:
             return
 
+        with self._startup_lock:
+            if not self._has_run_startup:
+                self._run_startup()
+
+    def _run_startup(self):
+        # Replicas must be copied before any on_startup function changes them.
+        # Lazy models are left untouched until one of their nodes loads them.
+        for model in self.models:
+            if not isinstance(model.model, LazyModel):
+                reattach_arrays(self, model.model)
+                self._replica_pool(model.model)
+
         startup_variables = {}
 
         for var in self.variables:
@@ -96,8 +293,20 @@ class Graph:
                     "Node function is None (id:%s)" % node.function.local_id
                 )
 
-            if getattr(node_function, "class_instance", None) is not None:
-                node_function.function(node_function.class_instance, *function_inputs)
+            class_instance = getattr(node_function, "class_instance", None)
+            actor = self._actor(class_instance)
+            replica_pool = self._replica_pool(class_instance)
+            if actor is not None:
+                # Startup runs inside the actor process, and again on restarts
+                actor.call(
+                    node_function.function.__name__, function_inputs, startup=True
+                )
+            elif replica_pool is not None:
+                # Every replica runs its own startup (e.g. loading its weights)
+                for instance in replica_pool.instances:
+                    node_function.function(instance, *function_inputs)
+            elif class_instance is not None:
+                node_function.function(class_instance, *function_inputs)
             else:
                 node_function.function(*function_inputs)
 
@@ -106,7 +315,54 @@ class Graph:
 
         self._has_run_startup = True
 
-    def run(self, *inputs):
+    def run(
+        self,
+        *inputs,
+        deadline: float = None,
+        memory_budget: int = None,
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+        incremental: bool = False,
+        run_id: str = None,
+        validate: str = None,
+    ):
+        """
+        Execute the graph over the given inputs.
+
+            Parameters:
+                    *inputs: values for the input Variables, in order
+                    deadline (float): maximum number of seconds the run may take.
+                        Once expired no further nodes are scheduled, pending
+                        mapped elements are cancelled and NodeTimeout is raised.
+                    memory_budget (int): bytes of numpy intermediates to keep in
+                        memory. Arrays of at least spill_threshold bytes that
+                        would exceed it are spilled to memory-mapped files under
+                        PIPELINE_CACHE and passed on as memmaps. Intermediates
+                        are dropped once no remaining node uses them.
+                    spill_threshold (int): minimum size in bytes of a spilled
+                        array.
+                    incremental (bool): reuse the values of the previous
+                        incremental run, only re-executing the nodes that
+                        depend on inputs whose fingerprint changed. Node
+                        functions must be deterministic and must not modify
+                        their inputs.
+                    run_id (str): checkpoint the outputs of finished nodes
+                        under PIPELINE_CACHE/runs/<run_id>. Running again with
+                        the same run id and inputs, e.g. after the process was
+                        pre-empted, skips the nodes that had finished. The
+                        checkpoint is removed once the run succeeds.
+                    validate (str): input validation strictness for this run
+                        ("none", "shallow" or "deep"), defaults to the graph's
+                        validation setting.
+
+            Returns:
+                    outputs (list): values of the output Variables. When the
+                        graph has a result_cache they are looked up by the
+                        graph and the fingerprint of the inputs, identical
+                        concurrent runs share a single execution and every
+                        caller gets its own copy of the outputs. Runs with
+                        inputs that can't be fingerprinted aren't cached.
+        """
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
         input_variables: List[Variable] = [
             var for var in self.variables if var.is_input
         ]
@@ -116,9 +372,426 @@ class Graph:
                 "Mismatch of number of inputs, expecting %u got %s"
                 % (len(input_variables), len(inputs))
             )
+        if incremental and memory_budget is not None:
+            raise Exception(
+                "Incremental runs keep every intermediate value, they can't be "
+                "combined with a memory_budget"
+            )
+        self._validate_inputs([inputs], validate)
+
+        def run_graph() -> list:
+            return self._run(
+                inputs,
+                deadline_at=deadline_at,
+                memory_budget=memory_budget,
+                spill_threshold=spill_threshold,
+                incremental=incremental,
+                run_id=run_id,
+            )
+
+        if self.result_cache is None:
+            return run_graph()
+
+        try:
+            # Keyed by graph too, as a cache may be shared by several graphs
+            key = fingerprint([self.local_id, list(inputs)])
+        except Exception:
+            # Inputs that can't be pickled, e.g. locks or open files
+            return self.result_cache.compute_uncached(run_graph)
+
+        try:
+            outputs = self.result_cache.get_or_compute(key, run_graph, timeout=deadline)
+        except ResultCacheTimeout:
+            raise NodeTimeout(
+                node=self.name,
+                message="Run deadline expired while waiting for an identical run",
+            )
+        # Callers must not be able to modify the cached outputs
+        return copy.deepcopy(outputs)
+
+    def _run(
+        self,
+        inputs: tuple,
+        deadline_at: float = None,
+        memory_budget: int = None,
+        spill_threshold: int = DEFAULT_SPILL_THRESHOLD,
+        incremental: bool = False,
+        run_id: str = None,
+    ) -> list:
+        thread_budget = nullcontext()
+        if self.thread_budget is not None:
+            thread_budget = get_thread_budget().claim(
+                self._max_concurrency(), self.thread_budget
+            )
+
+        with thread_budget:
+            self._startup()
+            running_variables = self._running_variables(inputs)
+            nodes = self.nodes
+            if incremental:
+                input_fingerprints, nodes = self._incremental_nodes(running_variables)
+                # Forget the previous run until this one has completed
+                self._previous_run = None
+            if memory_budget is not None:
+                spilling_variables = SpillingVariables(
+                    self.nodes,
+                    self.outputs,
+                    memory_budget,
+                    threshold=spill_threshold,
+                )
+                spilling_variables.update(running_variables)
+                running_variables = spilling_variables
+            checkpoint = None
+            if run_id is not None:
+                checkpoint = self._run_checkpoint(run_id, running_variables)
+                remaining_nodes = self._resumed_nodes(
+                    checkpoint, running_variables, nodes
+                )
+                if isinstance(running_variables, SpillingVariables):
+                    # Nodes finished by the previous attempt won't use their inputs
+                    for node in nodes:
+                        if node not in remaining_nodes:
+                            running_variables.release_inputs(node)
+                nodes = remaining_nodes
+            try:
+                self._run_nodes(
+                    running_variables,
+                    deadline_at=deadline_at,
+                    nodes=nodes,
+                    checkpoint=checkpoint,
+                )
+            finally:
+                if isinstance(running_variables, SpillingVariables):
+                    running_variables.close()
+            if checkpoint is not None:
+                checkpoint.remove()
+            if incremental:
+                self._previous_run = (input_fingerprints, dict(running_variables))
+
+        return_variables = []
+
+        for output_variable in self.outputs:
+            return_variables.append(running_variables[output_variable.local_id])
+
+        return return_variables
+
+    def run_batch(self, batch: List[tuple], *, validate: str = None) -> List[list]:
+        """
+        Execute the graph over a batch of inputs, running each node over the
+        whole batch before moving on to the next one. Startup functions run and
+        inputs are validated once per batch.
+
+            Parameters:
+                    batch (List[tuple]): input values of each run, in the order
+                        of the input Variables
+                    validate (str): input validation strictness for this batch
+                        ("none", "shallow" or "deep"), defaults to the graph's
+                        validation setting.
+
+            Returns:
+                    outputs (List[list]): values of the output Variables of
+                        each run.
+        """
+        batch = [tuple(inputs) for inputs in batch]
+        input_count = len([var for var in self.variables if var.is_input])
+        for inputs in batch:
+            if len(inputs) != input_count:
+                raise Exception(
+                    "Mismatch of number of inputs, expecting %u got %s"
+                    % (input_count, len(inputs))
+                )
+        self._validate_inputs(batch, validate)
+        return self._run_batch(batch)
+
+    def run_columns(
+        self,
+        columns: ColumnSource,
+        *,
+        chunk_size: int = 1024,
+        validate: str = None,
+    ) -> Dict[str, list]:
+        """
+        Execute the graph over a table of inputs, mapping the input Variables to
+        columns by name. Rows are run with run_batch one chunk at a time, so only
+        a chunk of the table is held in memory, and vectorized functions are
+        passed numpy column slices directly.
+
+            Parameters:
+                    columns: a mapping of column name to a list or numpy array,
+                        or the path of a CSV or Parquet (requires pyarrow) file
+                    chunk_size (int): number of rows run at once
+                    validate (str): input validation strictness ("none",
+                        "shallow" or "deep"), defaults to the graph's
+                        validation setting.
+
+            Returns:
+                    outputs (Dict[str, list]): values of each output Variable,
+                        by Variable name ("output_<index>" when unnamed).
+        """
+        input_variables: List[Variable] = [
+            var for var in self.variables if var.is_input
+        ]
+        if any(var.name is None for var in input_variables):
+            raise Exception("Input Variables must be named to be mapped to columns")
+        output_names = [
+            var.name or "output_%u" % index for index, var in enumerate(self.outputs)
+        ]
+        outputs = {name: [] for name in output_names}
+
+        chunks = iter_column_chunks(
+            columns,
+            [var.name for var in input_variables],
+            chunk_size,
+            type_classes={var.name: var.type_class for var in input_variables},
+        )
+        for chunk in chunks:
+            batch = list(
+                zip(
+                    *(
+                        column_values(chunk[var.name], var.type_class)
+                        for var in input_variables
+                    )
+                )
+            )
+            self._validate_inputs(batch, validate)
+            batch_outputs = self._run_batch(
+                batch,
+                columns={var.local_id: chunk[var.name] for var in input_variables},
+            )
+            for index, name in enumerate(output_names):
+                outputs[name].extend(row[index] for row in batch_outputs)
+
+        return outputs
+
+    def _run_batch(self, batch: List[tuple], columns: dict = None) -> List[list]:
+        # Stacked values of the batch by variable id, reused by vectorized nodes
+        columns = dict(columns or {})
+        thread_budget = nullcontext()
+        if self.thread_budget is not None:
+            thread_budget = get_thread_budget().claim(
+                self._max_concurrency(), self.thread_budget
+            )
+
+        with thread_budget:
+            self._startup()
+            batch_variables = [self._running_variables(inputs) for inputs in batch]
+            for node in self.nodes:
+                self._run_batch_node(node, batch_variables, columns)
+
+        return [
+            [
+                running_variables[output_variable.local_id]
+                for output_variable in self.outputs
+            ]
+            for running_variables in batch_variables
+        ]
+
+    def _run_batch_node(
+        self, node: GraphNode, batch_variables: List[dict], columns: dict
+    ) -> None:
+        node_function = self._get_node_function(node)
+        if (
+            len(batch_variables) > 1
+            and getattr(node_function.function, "__vectorize__", False)
+            and not getattr(node_function.function, "__run_once__", False)
+            and not node.mapped
+            and self._run_vectorized(node, node_function, batch_variables, columns)
+        ):
+            return
+        for running_variables in batch_variables:
+            self._run_node(node, running_variables)
+
+    def _run_vectorized(
+        self,
+        node: GraphNode,
+        node_function: Function,
+        batch_variables: List[dict],
+        columns: dict,
+    ) -> bool:
+        """Run a vectorize=True node once over the whole batch, returning False
+        when its inputs can't be stacked into numeric arrays."""
+        try:
+            import numpy as np
+        except ImportError:
+            return False
+
+        function_inputs = []
+        for _input in node.inputs:
+            stacked = columns.get(_input.local_id)
+            if not isinstance(stacked, np.ndarray):
+                values = [
+                    running_variables[_input.local_id]
+                    for running_variables in batch_variables
+                ]
+                if any(isinstance(value, PipelineFile) for value in values):
+                    return False
+                try:
+                    stacked = np.asarray(values)
+                except ValueError:
+                    # Ragged lists
+                    return False
+            if stacked.dtype == object:
+                return False
+            function_inputs.append(stacked)
+
+        timeout = self._node_timeout(node, node_function, None)
+        started_at = time.perf_counter()
+        if timeout is not None:
+            future = self.executor.submit(
+                self._call_function, node_function, *function_inputs
+            )
+            output = self._wait_for(
+                [future], timeout, node=self._node_name(node, node_function)
+            )[0]
+        else:
+            output = self._call_function(node_function, *function_inputs)
+        self.node_timings[node.local_id] = time.perf_counter() - started_at
+
+        outputs = output if len(node.outputs) > 1 else (output,)
+        if len(outputs) != len(node.outputs):
+            raise Exception(
+                "Mismatch in number of outputs:" f"{len(node.outputs)}/{len(outputs)}"
+            )
+        for _output, values in zip(node.outputs, outputs):
+            values = np.asarray(values)
+            if values.ndim == 0 or len(values) != len(batch_variables):
+                raise Exception(
+                    "Vectorized function %s returned %s results for a batch of %u"
+                    % (
+                        node_function.name,
+                        len(values) if values.ndim else "scalar",
+                        len(batch_variables),
+                    )
+                )
+            columns[_output.local_id] = values
+            type_class = self._variable_type_class(_output.local_id)
+            for running_variables, value in zip(batch_variables, values):
+                running_variables[_output.local_id] = self._unstack(value, type_class)
+
+        if not getattr(node_function.function, "__has_run__", False):
+            node_function.function.__has_run__ = True
+        return True
+
+    def _variable_type_class(self, local_id: str) -> Any:
+        for variable in self.variables:
+            if variable.local_id == local_id:
+                return variable.type_class
+
+    @staticmethod
+    def _unstack(value: Any, type_class: Any) -> Any:
+        """Convert one row of a vectorized result to its Variable's type."""
+        if not hasattr(value, "dtype"):
+            # Not a numpy value
+            return value
+        if type_class in (bool, int, float, complex):
+            return type_class(value.item())
+        if type_class is list or getattr(type_class, "__origin__", None) is list:
+            return value.tolist()
+        return value
+
+    def _input_validators(self, strictness: str = None) -> List[Validator]:
+        strictness = strictness or self.validation
+        validators = []
+        for var in self.variables:
+            if not var.is_input:
+                continue
+            key = (var.local_id, strictness)
+            if key not in self._validators:
+                self._validators[key] = compile_validator(var.type_class, strictness)
+            validators.append(self._validators[key])
+        return validators
+
+    def _validate_inputs(self, batch: List[tuple], strictness: str = None) -> None:
+        input_variables: List[Variable] = [
+            var for var in self.variables if var.is_input
+        ]
+        for i, validator in enumerate(self._input_validators(strictness)):
+            for inputs in batch:
+                if not validator(inputs[i]):
+                    raise Exception(
+                        "Input type mismatch, expceted %s got %s"
+                        % (
+                            input_variables[i].type_class,
+                            inputs[i].__class__,
+                        )
+                    )
+
+    def _running_variables(self, inputs: tuple) -> dict:
+        """Initial values of a run: the PipelineFiles and the inputs."""
+        input_variables: List[Variable] = [
+            var for var in self.variables if var.is_input
+        ]
+        running_variables = self._pipeline_file_variables()
+
+        for i, input in enumerate(inputs):
+            running_variables[input_variables[i].local_id] = input
+
+        return running_variables
+
+    def _incremental_nodes(
+        self, running_variables: dict
+    ) -> Tuple[Dict[str, str], List[GraphNode]]:
+        """Fingerprint the inputs of an incremental run and fill in the values of
+        the previous run that are still valid. Returns the input fingerprints and
+        the nodes that must be re-executed."""
+        input_fingerprints = {
+            var.local_id: fingerprint(running_variables[var.local_id])
+            for var in self.variables
+            if var.is_input
+        }
+        previous_fingerprints, previous_variables = self._previous_run or ({}, {})
+        changed = {
+            local_id
+            for local_id, input_fingerprint in input_fingerprints.items()
+            if previous_fingerprints.get(local_id) != input_fingerprint
+        }
 
-        self._startup()
+        nodes = []
+        for node in self.nodes:
+            output_ids = [_output.local_id for _output in node.outputs]
+            if any(_input.local_id in changed for _input in node.inputs) or any(
+                output_id not in previous_variables for output_id in output_ids
+            ):
+                nodes.append(node)
+                changed.update(output_ids)
+            else:
+                for output_id in output_ids:
+                    running_variables[output_id] = previous_variables[output_id]
+        return input_fingerprints, nodes
+
+    def _run_checkpoint(self, run_id: str, running_variables: dict) -> RunCheckpoint:
+        # Node ids are regenerated whenever a pipeline is rebuilt, so nodes are
+        # keyed by position and function, which the fingerprint also covers
+        node_keys = {}
+        node_hashes = []
+        for index, node in enumerate(self.nodes):
+            node_function = self._get_node_function(node)
+            node_keys[node.local_id] = "%d-%s" % (index, node_function.name)
+            node_hashes.append(node_function.hash)
+        input_values = [
+            running_variables[var.local_id] for var in self.variables if var.is_input
+        ]
+        return RunCheckpoint(
+            run_id, fingerprint([input_values, node_hashes]), node_keys
+        )
 
+    @staticmethod
+    def _resumed_nodes(
+        checkpoint: RunCheckpoint, running_variables: dict, nodes: List[GraphNode]
+    ) -> List[GraphNode]:
+        """Fill in the outputs of the nodes finished by a previous attempt of a
+        checkpointed run, returning the nodes left to run."""
+        remaining_nodes = []
+        for node in nodes:
+            outputs = checkpoint.load(node.local_id)
+            if outputs is None:
+                remaining_nodes.append(node)
+                continue
+            for _output, value in zip(node.outputs, outputs):
+                running_variables[_output.local_id] = value
+        return remaining_nodes
+
+    def _pipeline_file_variables(self) -> dict:
         running_variables = {}
 
         # Add all PipelineFile's to the running variables
@@ -132,81 +805,322 @@ class Graph:
 
                 running_variables[var.local_id] = var
 
-        for i, input in enumerate(inputs):
-            if not isinstance(input, input_variables[i].type_class):
-                raise Exception(
-                    "Input type mismatch, expceted %s got %s"
-                    % (
-                        input_variables[i].type_class,
-                        input.__class__,
+        return running_variables
+
+    def _run_nodes(
+        self,
+        running_variables: dict,
+        deadline_at: float = None,
+        nodes: List[GraphNode] = None,
+        checkpoint: RunCheckpoint = None,
+    ) -> None:
+        nodes = self.nodes if nodes is None else nodes
+        if self.pools:
+            self._run_scheduled(
+                running_variables,
+                deadline_at=deadline_at,
+                nodes=nodes,
+                checkpoint=checkpoint,
+            )
+        else:
+            for node in nodes:
+                self._run_node(node, running_variables, deadline_at=deadline_at)
+                self._node_finished(node, running_variables, checkpoint)
+
+    @staticmethod
+    def _node_finished(
+        node: GraphNode, running_variables: dict, checkpoint: RunCheckpoint = None
+    ) -> None:
+        if checkpoint is not None and all(
+            _output.local_id in running_variables for _output in node.outputs
+        ):
+            checkpoint.save(
+                node.local_id,
+                [running_variables[_output.local_id] for _output in node.outputs],
+            )
+        if isinstance(running_variables, SpillingVariables):
+            running_variables.release_inputs(node)
+
+    def _get_node_function(self, node: GraphNode) -> Function:
+        for function in self.functions:
+            if function.local_id == node.function.local_id:
+                if isinstance(function.class_instance, LazyModel):
+                    self._load_lazy_model(function.class_instance)
+                return function
+
+    def _load_lazy_model(self, lazy_model: LazyModel) -> Any:
+        """Load a model of a graph loaded from a container and replace the
+        placeholder referencing it."""
+        model = lazy_model.load()
+        reattach_arrays(self, model)
+        for function in self.functions:
+            if function.class_instance is lazy_model:
+                function.class_instance = model
+        for _model in self.models:
+            if _model.model is lazy_model:
+                _model.model = model
+        return model
+
+    def _load_lazy_models(self) -> None:
+        for model in self.models:
+            if isinstance(model.model, LazyModel):
+                self._load_lazy_model(model.model)
+
+    def _node_dependencies(self) -> Dict[str, Set[str]]:
+        """Map each node to the nodes that must finish before it can start: the
+        producers of its inputs and the previous node bound to the same model
+        instance, so stateful model calls keep their definition order."""
+        producers = {}
+        last_model_node = {}
+        dependencies = {}
+        for node in self.nodes:
+            node_dependencies = set()
+            for _input in node.inputs:
+                if _input.local_id in producers:
+                    node_dependencies.add(producers[_input.local_id])
+
+            class_instance = getattr(
+                self._get_node_function(node), "class_instance", None
+            )
+            if class_instance is not None:
+                if id(class_instance) in last_model_node:
+                    node_dependencies.add(last_model_node[id(class_instance)])
+                last_model_node[id(class_instance)] = node.local_id
+
+            for _output in node.outputs:
+                producers[_output.local_id] = node.local_id
+            dependencies[node.local_id] = node_dependencies
+        return dependencies
+
+    def _node_resource_class(self, node: GraphNode) -> str:
+        node_function = self._get_node_function(node)
+        return getattr(node_function.function, "__resources__", None) or "cpu"
+
+    def _run_scheduled(
+        self,
+        running_variables: dict,
+        deadline_at: float = None,
+        nodes: List[GraphNode] = None,
+        checkpoint: RunCheckpoint = None,
+    ):
+        """Run nodes as soon as their dependencies finish, each on the executor
+        pool of its resource class, so heavy nodes never queue behind glue work.
+        """
+        dependencies = self._node_dependencies()
+        waiting = list(self.nodes if nodes is None else nodes)
+        running: Dict[Future, GraphNode] = {}
+        # Nodes that aren't run are treated as already finished
+        finished = {node.local_id for node in self.nodes} - {
+            node.local_id for node in waiting
+        }
+
+        while waiting or running:
+            for node in list(waiting):
+                if dependencies[node.local_id] <= finished:
+                    waiting.remove(node)
+                    pool = self._pool_executor(self._node_resource_class(node))
+                    future = pool.submit(
+                        self._run_node, node, running_variables, deadline_at
                     )
+                    running[future] = node
+
+            if not running:
+                raise Exception("Unable to schedule nodes, dependencies not met")
+
+            timeout = None
+            if deadline_at is not None:
+                timeout = max(deadline_at - time.monotonic(), 0)
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                for future in running:
+                    future.cancel()
+                raise NodeTimeout(
+                    node=", ".join(
+                        self._node_name(node, self._get_node_function(node))
+                        for node in running.values()
+                    ),
+                    message="Run deadline expired while the node was running",
                 )
-            running_variables[input_variables[i].local_id] = input
 
-        for node in self.nodes:
-            node_inputs: List[Variable] = []
-            node_outputs: List[Variable] = []
-            node_function: Function = None
+            for future in done:
+                node = running.pop(future)
+                if future.exception() is not None:
+                    for pending_future in running:
+                        pending_future.cancel()
+                    raise future.exception()
+                self._node_finished(node, running_variables, checkpoint)
+                finished.add(node.local_id)
 
-            for function in self.functions:
-                if function.local_id == node.function.local_id:
-                    node_function = function
+    def _run_node(
+        self, node: GraphNode, running_variables: dict, deadline_at: float = None
+    ) -> None:
+        node_inputs: List[Variable] = []
+        node_outputs: List[Variable] = []
+        node_function = self._get_node_function(node)
+
+        if getattr(node_function.function, "__run_once__", False) and getattr(
+            node_function.function, "__has_run__", False
+        ):
+            return
+
+        for _node_input in node.inputs:
+            for variable in self.variables:
+                if variable.local_id == _node_input.local_id:
+                    node_inputs.append(variable)
+                    break
+        for _node_output in node.outputs:
+            for variable in self.variables:
+                if variable.local_id == _node_output.local_id:
+                    node_outputs.append(variable)
                     break
 
-            if getattr(node_function.function, "__run_once__", False) and getattr(
-                node_function.function, "__has_run__", False
-            ):
-                continue
+        function_inputs = []
+        for _input in node_inputs:
+            function_inputs.append(running_variables[_input.local_id])
 
-            for _node_input in node.inputs:
-                for variable in self.variables:
-                    if variable.local_id == _node_input.local_id:
-                        node_inputs.append(variable)
-                        break
-            for _node_output in node.outputs:
-                for variable in self.variables:
-                    if variable.local_id == _node_output.local_id:
-                        node_outputs.append(variable)
-                        break
+        if node_function.function is None:
+            raise Exception("Node function is none (id:%s)" % node.function.local_id)
 
-            function_inputs = []
-            for _input in node_inputs:
-                function_inputs.append(running_variables[_input.local_id])
+        timeout = self._node_timeout(node, node_function, deadline_at)
+        started_at = time.perf_counter()
+        if node.mapped:
+            output = self._map_function(
+                node_function,
+                *function_inputs,
+                batch_size=node.batch_size,
+                timeout=timeout,
+                node_name=self._node_name(node, node_function),
+            )
+        elif timeout is not None:
+            # Run in the executor so the call can be abandoned on timeout
+            future = self.executor.submit(
+                self._call_function, node_function, *function_inputs
+            )
+            output = self._wait_for(
+                [future], timeout, node=self._node_name(node, node_function)
+            )[0]
+        else:
+            output = self._call_function(node_function, *function_inputs)
+        self.node_timings[node.local_id] = time.perf_counter() - started_at
 
-            if node_function.function is None:
+        if len(node.outputs) > 1:
+            if not len(node.outputs) == len(output) == len(node_outputs):
                 raise Exception(
-                    "Node function is none (id:%s)" % node.function.local_id
+                    "Mismatch in number of outputs:"
+                    f"{len(node.outputs)}/{len(output)}/{len(node_outputs)}"
                 )
+        else:
+            output = (output,)
+        vectorized = getattr(node_function.function, "__vectorize__", False)
+        for _output, value in zip(node_outputs, output):
+            if vectorized:
+                # Same types as run_batch, which unstacks vectorized results
+                value = self._unstack(value, _output.type_class)
+            running_variables[_output.local_id] = value
 
-            if getattr(node_function, "class_instance", None) is not None:
-                output = node_function.function(
-                    node_function.class_instance, *function_inputs
+        if not getattr(node_function.function, "__has_run__", False):
+            node_function.function.__has_run__ = True
+
+    @staticmethod
+    def _node_name(node: GraphNode, node_function: Function) -> str:
+        return "%s (node:%s)" % (node_function.name, node.local_id)
+
+    def _node_timeout(
+        self, node: GraphNode, node_function: Function, deadline_at: float = None
+    ) -> Optional[float]:
+        """Seconds the node may run for, from its own timeout and the run
+        deadline, or None when unbounded."""
+        timeout = getattr(node_function.function, "__timeout__", None)
+        if deadline_at is not None:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise NodeTimeout(
+                    node=self._node_name(node, node_function),
+                    message="Run deadline expired before the node was scheduled",
                 )
-            else:
-                output = node_function.function(*function_inputs)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
 
-            if len(node.outputs) > 1:
-                if len(node.outputs) == len(output) == len(node_outputs):
-                    number_of_outputs = len(output)
-                    for i in range(number_of_outputs):
-                        running_variables[node_outputs[i].local_id] = output[i]
-                else:
-                    raise Exception(
-                        "Mismatch in number of outputs:"
-                        f"{len(node.outputs)}/{len(output)}/{len(node_outputs)}"
-                    )
-            else:
-                running_variables[node_outputs[0].local_id] = output
+    @staticmethod
+    def _wait_for(
+        futures: List[Future], timeout: float = None, node: str = None
+    ) -> list:
+        """Gather results from `futures` in order, cancelling the pending ones
+        if any of them fails or `timeout` expires. Only an expired `timeout`
+        raises NodeTimeout, exceptions raised by the futures (including their
+        own TimeoutErrors) propagate unchanged."""
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        for future in pending:
+            future.cancel()
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        if pending:
+            raise NodeTimeout(
+                node=node, message="Node did not finish within %.3fs" % timeout
+            )
+        return [future.result() for future in futures]
 
-            if not getattr(node_function.function, "__has_run__", False):
-                node_function.function.__has_run__ = True
+    def _call_function(self, node_function: Function, *function_inputs) -> Any:
+        class_instance = getattr(node_function, "class_instance", None)
+        if class_instance is None:
+            return node_function.function(*function_inputs)
 
-        return_variables = []
+        actor = self._actor(class_instance)
+        if actor is not None:
+            return actor.call(node_function.function.__name__, function_inputs)
 
-        for output_variable in self.outputs:
-            return_variables.append(running_variables[output_variable.local_id])
+        replica_pool = self._replica_pool(class_instance)
+        if replica_pool is None:
+            return node_function.function(class_instance, *function_inputs)
 
-        return return_variables
+        with replica_pool.checkout() as instance:
+            return node_function.function(instance, *function_inputs)
+
+    def _map_function(
+        self,
+        node_function: Function,
+        items: list,
+        *args,
+        batch_size: int = None,
+        timeout: float = None,
+        node_name: str = None,
+    ) -> list:
+        """Apply `node_function` to each element of `items` using the graph
+        executor, returning the results in the same order as the elements.
+
+        Batched functions (`pipeline_function(batched=True)`) are instead called
+        once per chunk of `batch_size` elements (or once for the whole list).
+        """
+        items = list(items)
+        batched = getattr(node_function.function, "__batched__", False)
+        if batched:
+            batch_size = batch_size or max(len(items), 1)
+            chunks = [
+                items[i : i + batch_size] for i in range(0, len(items), batch_size)
+            ]
+        else:
+            chunks = items
+
+        futures = [
+            self.executor.submit(self._call_function, node_function, chunk, *args)
+            for chunk in chunks
+        ]
+        results = self._wait_for(futures, timeout, node=node_name)
+
+        if not batched:
+            return results
+
+        output = []
+        for chunk, chunk_results in zip(chunks, results):
+            if len(chunk_results) != len(chunk):
+                raise Exception(
+                    "Batched function returned %u results for %u inputs"
+                    % (len(chunk_results), len(chunk))
+                )
+            output.extend(chunk_results)
+        return output
 
     def _update_function_local_id(self, old_id: str, new_id: str) -> None:
         for func in self.functions:
@@ -287,6 +1201,8 @@ class Graph:
                     inputs=node_inputs,
                     outputs=node_outputs,
                     local_id=_node.local_id,
+                    mapped=_node.mapped,
+                    batch_size=_node.batch_size,
                 )
             )
 
@@ -301,11 +1217,144 @@ class Graph:
 
         return remade_graph
 
-    def save(self, save_path):
-        with open(save_path, "wb") as save_file:
-            save_file.write(dumps(self))
+    def save(self, save_path, file_format: str = "pickle") -> int:
+        """
+        Serialise the graph to a file, streaming it so that large buffers (e.g.
+        model weights) are written directly instead of being gathered in memory.
+
+            Parameters:
+                    save_path: path of the file to write
+                    file_format (str): "pickle" for a single pickle of the
+                        graph, which earlier versions of the library can load,
+                        or "container" (see pipeline.objects.container), whose
+                        models are loaded lazily and whose manifest can be read
+                        with Graph.read_manifest, but which earlier versions
+                        can't load.
+
+            Returns:
+                    size (int): size of the saved graph in bytes.
+        """
+        if file_format not in ("container", "pickle"):
+            raise Exception("Unknown graph file format '%s'" % file_format)
+
+        self._load_lazy_models()
+        # Written next to the destination and moved over it, since the graph may
+        # have been loaded from (and still memory-map) the file being replaced
+        temporary_path = "%s.tmp" % save_path
+        try:
+            with open(temporary_path, "wb", buffering=FILE_BUFFER_SIZE) as save_file:
+                if file_format == "container":
+                    size = save_container(self, save_file)
+                else:
+                    # CPU torch tensors are pickled as numpy arrays, the default
+                    # reducer copies them through an in-memory torch.save first
+                    BufferPickler(save_file, protocol=5).dump(self)
+                    size = save_file.tell()
+            os.replace(temporary_path, save_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return size
 
     @classmethod
-    def load(cls, load_path):
+    def load(cls, load_path, lazy_models: bool = True, mmap_buffers: bool = True):
+        """
+        Load a graph saved with Graph.save.
+
+            Parameters:
+                    load_path: path of the saved graph
+                    lazy_models (bool): only load the models of a container
+                        when one of their nodes first runs
+                    mmap_buffers (bool): memory-map the large arrays of a
+                        container instead of reading them into memory
+
+            Returns:
+                    graph (Graph): the loaded graph.
+        """
+        if is_container(load_path):
+            return GraphContainer(load_path, mmap_buffers=mmap_buffers).load_graph(
+                lazy_models=lazy_models
+            )
+        with open(load_path, "rb", buffering=FILE_BUFFER_SIZE) as load_file:
+            return dill.load(load_file)
+
+    @staticmethod
+    def read_manifest(load_path) -> dict:
+        """Manifest of a graph saved as a container (name, variables, functions,
+        models and nodes), read without loading the graph."""
         with open(load_path, "rb") as load_file:
-            return loads(load_file.read())
+            return read_manifest(load_file)
+
+    def size_report(self, min_duplicate_size: int = DEFAULT_DUPLICATE_SIZE) -> dict:
+        """
+        Serialised size of every function, model, variable type and
+        PipelineFile of the graph, as pickled when uploading it.
+
+            Parameters:
+                    min_duplicate_size (int): smallest object, in bytes, reported
+                        when it is pickled in more than one part
+
+            Returns:
+                    report (dict): sizes per part with the largest captured
+                        globals of each function, and the duplicated objects.
+        """
+        self._load_lazy_models()
+        return size_report(self, min_duplicate_size=min_duplicate_size)
+
+    def fingerprint(self) -> str:
+        """
+        Deterministic content fingerprint of the graph, computed as a Merkle
+        tree over the fingerprints of its functions and models, the types and
+        PipelineFile contents of its variables, and its nodes and outputs.
+
+        Local IDs are regenerated whenever a pipeline is built, so variables,
+        functions and nodes are identified by position. The graph name is
+        left out; the fingerprint only changes when the behaviour might. It is
+        computed on every call, as file contents and model attributes can
+        change between calls.
+        """
+        self._load_lazy_models()
+        variable_indices = {
+            var.local_id: index for index, var in enumerate(self.variables)
+        }
+        function_indices = {
+            function.local_id: index for index, function in enumerate(self.functions)
+        }
+
+        variables = []
+        for var in self.variables:
+            if isinstance(var, PipelineFile):
+                if var.path is not None:
+                    contents = file_fingerprint(var.path)
+                else:
+                    contents = fingerprint(var.remote_id)
+            else:
+                contents = fingerprint(None)
+            variables.append(
+                combine_fingerprints(
+                    value_fingerprint(var.type_class),
+                    fingerprint([var.is_input, var.is_output]),
+                    contents,
+                )
+            )
+        nodes = [
+            fingerprint(
+                [
+                    function_indices.get(node.function.local_id),
+                    [variable_indices.get(var.local_id) for var in node.inputs],
+                    [variable_indices.get(var.local_id) for var in node.outputs],
+                    node.mapped,
+                    node.batch_size,
+                ]
+            )
+            for node in self.nodes
+        ]
+        return combine_fingerprints(
+            combine_fingerprints(
+                *(function.fingerprint() for function in self.functions)
+            ),
+            combine_fingerprints(*(model.fingerprint() for model in self.models)),
+            combine_fingerprints(*variables),
+            combine_fingerprints(*nodes),
+            fingerprint([variable_indices.get(var.local_id) for var in self.outputs]),
+        )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pipeline.objects.function import Function
 from pipeline.objects.variable import Variable
@@ -11,11 +11,25 @@ class GraphNode:
     function: Function
     inputs: List[Variable] = []
     outputs: List[Variable] = []
+    # Mapped nodes apply their function to each element of the first input
+    mapped: bool = False
+    batch_size: Optional[int] = None
 
-    def __init__(self, function, inputs, outputs, *, local_id=None):
+    def __init__(
+        self,
+        function,
+        inputs,
+        outputs,
+        *,
+        local_id=None,
+        mapped=False,
+        batch_size=None,
+    ):
         self.function = function
         self.inputs = inputs
         self.outputs = outputs
+        self.mapped = mapped
+        self.batch_size = batch_size
 
         self.local_id = generate_id(10) if local_id is None else local_id
 
@@ -25,4 +39,6 @@ class GraphNode:
             function=self.function.local_id,
             inputs=[_var.local_id for _var in self.inputs],
             outputs=[_var.local_id for _var in self.outputs],
+            mapped=self.mapped,
+            batch_size=self.batch_size,
         )
@@ -5,6 +5,7 @@ from typing import Any
 
 from pipeline.schemas.model import ModelGet
 from pipeline.util import generate_id, load_object
+from pipeline.util.fingerprint import object_fingerprint
 
 
 class Model:
@@ -31,6 +32,16 @@ class Model:
         if not hasattr(self.model, "local_id"):
             setattr(self.model, "local_id", self.local_id)
 
+    def fingerprint(self) -> str:
+        """
+        Deterministic content fingerprint of the model: a Merkle tree over its
+        class (methods by bytecode and referenced globals) and its attributes,
+        e.g. weights. The `local_id` attribute and the bound pipeline
+        functions are left out. It is computed on every call, as the
+        attributes can change between runs.
+        """
+        return object_fingerprint(self.model, exclude=("local_id",))
+
     @classmethod
     def from_schema(cls, schema: ModelGet):
         pickled_data = load_object(schema.hex_file.data)
@@ -0,0 +1,523 @@
+"""Pipeline-parallel execution of a Graph across several processes.
+
+A graph is partitioned into stages of consecutive nodes, each hosted by its own
+process. Runs flow through the stages like an assembly line: while one stage
+works on a run the previous stage is already working on the next one. Stages
+exchange the intermediate values still needed downstream over pipes (using
+shared memory for large buffers) or over TCP connections.
+"""
+import itertools
+import multiprocessing
+import queue
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+from pipeline.objects.graph import Graph
+from pipeline.objects.graph_node import GraphNode
+from pipeline.objects.variable import PipelineFile
+from pipeline.util import dump_object, load_object
+from pipeline.util.shared_memory import SharedMemoryTransport
+
+
+def _node_blocks(graph: Graph) -> List[List[GraphNode]]:
+    """Group consecutive nodes that must share a stage: every node between the
+    first and last use of a model stays with that model."""
+    last_use: Dict[int, int] = {}
+    node_models = []
+    for index, node in enumerate(graph.nodes):
+        class_instance = getattr(graph._get_node_function(node), "class_instance", None)
+        node_models.append(id(class_instance) if class_instance is not None else None)
+        if class_instance is not None:
+            last_use[id(class_instance)] = index
+
+    blocks = []
+    block: List[GraphNode] = []
+    block_end = -1
+    for index, node in enumerate(graph.nodes):
+        block.append(node)
+        block_end = max(block_end, last_use.get(node_models[index], index))
+        if index >= block_end:
+            blocks.append(block)
+            block = []
+    return blocks
+
+
+def _block_costs(graph: Graph, blocks: List[List[GraphNode]]) -> List[float]:
+    """Relative cost of each block from the recorded node timings and the
+    serialised size of the models it holds."""
+    model_sizes = {
+        id(model.model): len(dump_object(model.model)) for model in graph.models
+    }
+
+    times, sizes = [], []
+    for block in blocks:
+        times.append(sum(graph.node_timings.get(node.local_id, 0.0) for node in block))
+        block_models = {
+            id(getattr(graph._get_node_function(node), "class_instance", None))
+            for node in block
+        }
+        sizes.append(sum(model_sizes.get(model_id, 0) for model_id in block_models))
+
+    if not any(times):
+        # Without recorded timings assume every node takes as long
+        times = [float(len(block)) for block in blocks]
+
+    total_time, total_size = sum(times), sum(sizes)
+    return [
+        block_time / total_time + (block_size / total_size if total_size else 0.0)
+        for block_time, block_size in zip(times, sizes)
+    ]
+
+
+def partition_graph(graph: Graph, stages: int = None) -> List[List[GraphNode]]:
+    """
+    Split the nodes of a graph into consecutive stages.
+
+    Functions annotated with `pipeline_function(stage=...)` define the stages
+    explicitly. Otherwise nodes are split into `stages` groups of similar cost,
+    based on the timings recorded by previous runs of the graph and the size of
+    the models each group holds. Nodes using the same model are never split.
+
+        Parameters:
+                graph (Graph): graph to partition
+                stages (int): number of stages for automatic partitioning
+
+        Returns:
+                stages (List[List[GraphNode]]): nodes of each stage, in order.
+    """
+    annotations = [
+        getattr(graph._get_node_function(node).function, "__stage__", None)
+        for node in graph.nodes
+    ]
+    if any(annotation is not None for annotation in annotations):
+        partition: Dict[int, List[GraphNode]] = {}
+        current_stage = 0
+        for node, annotation in zip(graph.nodes, annotations):
+            if annotation is not None:
+                if annotation < current_stage:
+                    raise Exception(
+                        "Stage annotations must not decrease along the pipeline, "
+                        "got stage %s after stage %s" % (annotation, current_stage)
+                    )
+                current_stage = annotation
+            partition.setdefault(current_stage, []).append(node)
+        return [partition[stage] for stage in sorted(partition)]
+
+    if stages is None or stages < 1:
+        raise Exception("Must pass the number of stages for automatic partitioning")
+
+    blocks = _node_blocks(graph)
+    costs = _block_costs(graph, blocks)
+    stages = min(stages, len(blocks))
+
+    partition = []
+    current: List[GraphNode] = []
+    current_cost = 0.0
+    remaining_cost = sum(costs)
+    for index, (block, cost) in enumerate(zip(blocks, costs)):
+        remaining_stages = stages - len(partition)
+        remaining_blocks = len(blocks) - index
+        if (
+            current
+            and remaining_stages > 1
+            and (
+                # Every remaining stage needs at least one block
+                remaining_blocks < remaining_stages
+                or current_cost + cost / 2 > remaining_cost / remaining_stages
+            )
+        ):
+            partition.append(current)
+            remaining_cost -= current_cost
+            current, current_cost = [], 0.0
+        current.extend(block)
+        current_cost += cost
+    partition.append(current)
+    return partition
+
+
+def _stage_graph(graph: Graph, nodes: List[GraphNode], index: int) -> Graph:
+    functions = []
+    for node in nodes:
+        node_function = graph._get_node_function(node)
+        if all(node_function is not function for function in functions):
+            functions.append(node_function)
+
+    models = [
+        model
+        for model in graph.models
+        if any(
+            getattr(function, "class_instance", None) is model.model
+            for function in functions
+        )
+    ]
+    return Graph(
+        name="%s-stage-%u" % (graph.name, index),
+        variables=list(graph.variables),
+        functions=functions,
+        nodes=list(nodes),
+        models=models,
+        compute_type=graph.compute_type,
+        min_gpu_vram_mb=graph.min_gpu_vram_mb,
+        max_workers=graph.max_workers,
+        pools=graph.pools,
+        thread_budget=graph.thread_budget,
+    )
+
+
+class _Channel:
+    """Connection carrying (sequence number, values) messages between stages."""
+
+    def __init__(self, connection, shared_memory: bool):
+        self.connection = connection
+        self.transport = SharedMemoryTransport() if shared_memory else None
+
+    def send(self, message: Any) -> None:
+        if self.transport is None:
+            self.connection.send_bytes(dump_object(message))
+            return
+        self.connection.send_bytes(self.transport.dumps(message))
+        # Messages are never acknowledged, the receiver frees the segments
+        self.transport.detach()
+
+    def recv(self) -> Any:
+        payload = self.connection.recv_bytes()
+        if self.transport is None:
+            return load_object(payload)
+        message = self.transport.loads(payload)
+        # Forget previously received segments that are no longer used
+        self.transport.collect()
+        return message
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+        self.connection.close()
+
+
+def _run_stage(
+    stage: Graph, values: Dict[str, Any], forward: Set[str]
+) -> Dict[str, Any]:
+    stage._startup()
+    running_variables = stage._pipeline_file_variables()
+    running_variables.update(values)
+    stage._run_nodes(running_variables)
+    return {
+        local_id: value
+        for local_id, value in running_variables.items()
+        if local_id in forward
+    }
+
+
+def serve_stage(
+    stage_payload: bytes,
+    upstream,
+    downstream,
+    forward: Set[str],
+    shared_memory: bool = True,
+    ready=None,
+    authkey: bytes = None,
+) -> None:
+    """
+    Run one stage: receive values from `upstream`, execute the stage nodes and
+    send the values still needed by later stages to `downstream`.
+
+    `upstream` and `downstream` are either connections, or for TCP transport the
+    address to listen on for the previous stage and the address of the next
+    stage. The listening address is reported through `ready` once bound, which
+    allows stages to be started on other hosts and chained together.
+    """
+    stage = load_object(stage_payload)
+
+    listener = None
+    if isinstance(upstream, tuple):
+        listener = Listener(upstream, authkey=authkey)
+        if ready is not None:
+            ready.send(listener.address)
+        downstream = Client(downstream, authkey=authkey)
+        upstream = listener.accept()
+
+    upstream = _Channel(upstream, shared_memory)
+    downstream = _Channel(downstream, shared_memory)
+    try:
+        while True:
+            message = upstream.recv()
+            if message is None:
+                downstream.send(None)
+                return
+
+            sequence, values = message
+            if not isinstance(values, BaseException):
+                try:
+                    values = _run_stage(stage, values, forward)
+                except Exception as exception:
+                    values = exception
+            downstream.send((sequence, values))
+    finally:
+        upstream.close()
+        downstream.close()
+        if listener is not None:
+            listener.close()
+
+
+class PipelineParallel:
+    """
+    Execute a graph as a pipeline of stage processes on this host.
+
+    Stages communicate over pipes using shared memory for large values
+    (`transport="pipe"`), or over TCP connections (`transport="tcp"`) which is
+    the same protocol used to chain `serve_stage` processes across hosts.
+
+        Parameters:
+                graph (Graph): graph to execute
+                stages (int): number of stages for automatic partitioning, see
+                    `partition_graph`
+                transport (str): "pipe" or "tcp"
+                host (str): interface the stages listen on with TCP transport
+                max_in_flight (int): runs sent ahead of the collected results,
+                    defaults to twice the number of stages
+    """
+
+    def __init__(
+        self,
+        graph: Graph,
+        stages: int = None,
+        *,
+        transport: str = "pipe",
+        host: str = "127.0.0.1",
+        max_in_flight: int = None,
+    ):
+        if transport not in ("pipe", "tcp"):
+            raise Exception("Unknown transport '%s'" % transport)
+
+        self.graph = graph
+        self.transport = transport
+        self.host = host
+        self.partition = partition_graph(graph, stages)
+        self.max_in_flight = max_in_flight or 2 * len(self.partition)
+
+        self._processes: List[multiprocessing.Process] = []
+        self._input: Optional[_Channel] = None
+        self._results: "queue.Queue" = queue.Queue()
+        self._reader: Optional[threading.Thread] = None
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _forwarded_variables(self) -> List[Set[str]]:
+        """Variables each stage must pass on: those used by later stages and the
+        graph outputs."""
+        forward = []
+        needed = {output.local_id for output in self.graph.outputs}
+        for nodes in reversed(self.partition):
+            forward.append(set(needed))
+            for node in nodes:
+                needed.update(_input.local_id for _input in node.inputs)
+        forward.reverse()
+        return forward
+
+    def start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        shared_memory = self.transport == "pipe"
+        forward = self._forwarded_variables()
+        stage_payloads = [
+            dump_object(_stage_graph(self.graph, nodes, index))
+            for index, nodes in enumerate(self.partition)
+        ]
+
+        if self.transport == "pipe":
+            connections = [
+                context.Pipe(duplex=False) for _ in range(len(stage_payloads) + 1)
+            ]
+            for index, payload in enumerate(stage_payloads):
+                process = context.Process(
+                    target=serve_stage,
+                    args=(
+                        payload,
+                        connections[index][0],
+                        connections[index + 1][1],
+                        forward[index],
+                        shared_memory,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+                # The stage process holds its own ends of these pipes now
+                connections[index][0].close()
+                connections[index + 1][1].close()
+            self._input = _Channel(connections[0][1], shared_memory)
+            output = connections[-1][0]
+        else:
+            authkey = multiprocessing.current_process().authkey
+            result_listener = Listener((self.host, 0), authkey=authkey)
+            accepted = []
+            acceptor = threading.Thread(
+                target=lambda: accepted.append(result_listener.accept())
+            )
+            acceptor.start()
+
+            # Start from the last stage, each one connects to the next
+            downstream_address = result_listener.address
+            for index in reversed(range(len(stage_payloads))):
+                ready, ready_child = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=serve_stage,
+                    args=(
+                        stage_payloads[index],
+                        (self.host, 0),
+                        downstream_address,
+                        forward[index],
+                        shared_memory,
+                        ready_child,
+                        authkey,
+                    ),
+                    daemon=True,
+                )
+                process.start()
+                self._processes.insert(0, process)
+                downstream_address = ready.recv()
+
+            self._input = _Channel(Client(downstream_address, authkey=authkey), False)
+            acceptor.join()
+            result_listener.close()
+            output = accepted[0]
+
+        self._reader = threading.Thread(
+            target=self._read_results,
+            args=(_Channel(output, shared_memory),),
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _read_results(self, output: _Channel) -> None:
+        try:
+            while True:
+                message = output.recv()
+                self._results.put(message)
+                if message is None:
+                    return
+        except (EOFError, OSError) as exception:
+            self._results.put((None, exception))
+        finally:
+            output.close()
+
+    def stop(self) -> None:
+        if self._input is None:
+            return
+        try:
+            self._input.send(None)
+        except OSError:
+            pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+        self._input.close()
+        self._input = None
+        self._processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    def _send(self, inputs: Sequence[Any]) -> int:
+        input_variables = [var for var in self.graph.variables if var.is_input]
+        if len(inputs) != len(input_variables):
+            raise Exception(
+                "Mismatch of number of inputs, expecting %u got %s"
+                % (len(input_variables), len(inputs))
+            )
+        self.graph._validate_inputs([tuple(inputs)])
+        values = {
+            local_id: value
+            for local_id, value in self.graph._running_variables(tuple(inputs)).items()
+            if not isinstance(value, PipelineFile)
+        }
+        sequence = next(self._sequence)
+        try:
+            self._input.send((sequence, values))
+        except OSError as exception:
+            raise self._stopped() from exception
+        return sequence
+
+    def _stopped(self) -> Exception:
+        exited = [
+            "%u (exit code %s)" % (index, process.exitcode)
+            for index, process in enumerate(self._processes)
+            if not process.is_alive()
+        ]
+        if exited:
+            return Exception("Pipeline stage processes exited: %s" % ", ".join(exited))
+        return Exception("Pipeline stages stopped")
+
+    def _next_message(self) -> Any:
+        """Next message from the last stage, raising once none can arrive because
+        the result reader or a stage process has exited."""
+        while True:
+            try:
+                return self._results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            if self._reader is None or not self._reader.is_alive():
+                # The reader may have posted its last message before exiting
+                try:
+                    return self._results.get_nowait()
+                except queue.Empty:
+                    raise self._stopped()
+            if any(not process.is_alive() for process in self._processes):
+                raise self._stopped()
+
+    def _receive(self, sequence: int) -> list:
+        message = self._next_message()
+        if message is None:
+            raise self._stopped()
+        received_sequence, values = message
+        if received_sequence is None:
+            # The connection to the last stage was lost
+            raise self._stopped() from values
+        if isinstance(values, BaseException):
+            raise values
+        if received_sequence != sequence:
+            raise Exception(
+                "Out of order result %s, expected %s" % (received_sequence, sequence)
+            )
+        return [values[output.local_id] for output in self.graph.outputs]
+
+    def run(self, *inputs) -> list:
+        """Run a single set of inputs through the stages, waiting for any
+        `run_many` iterator holding the stages."""
+        if self._input is None:
+            raise Exception("PipelineParallel must be started before running")
+
+        with self._lock:
+            return self._receive(self._send(inputs))
+
+    def run_many(self, inputs: Iterable[Sequence[Any]]) -> Iterator[list]:
+        """Stream runs through the stages, yielding outputs in input order.
+
+        The iterator holds the stages until it is exhausted or closed, and other
+        runs wait for it until then."""
+        if self._input is None:
+            raise Exception("PipelineParallel must be started before running")
+
+        with self._lock:
+            in_flight = []
+            try:
+                for run_inputs in inputs:
+                    in_flight.append(self._send(run_inputs))
+                    if len(in_flight) >= self.max_in_flight:
+                        yield self._receive(in_flight.pop(0))
+                while in_flight:
+                    yield self._receive(in_flight.pop(0))
+            finally:
+                # Drop results of runs the caller stopped waiting for, so later
+                # runs receive their own results
+                for _ in in_flight:
+                    try:
+                        self._next_message()
+                    except Exception:
+                        # No more results will arrive
+                        break
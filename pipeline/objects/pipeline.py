@@ -1,6 +1,9 @@
+from typing import Any, Callable, Dict, Union
+
 from pipeline.objects.function import Function
 from pipeline.objects.graph import Graph
 from pipeline.objects.graph_node import GraphNode
+from pipeline.objects.result_cache import ResultCache
 from pipeline.objects.variable import Variable
 
 
@@ -12,16 +15,31 @@ class Pipeline:
     _pipeline_context_name: str = None
     _compute_type: str = "gpu"
     _min_gpu_vram_mb: int = None
+    _max_workers: int = None
+    _pools: Dict[str, int] = None
+    _thread_budget: int = None
+    _result_cache: ResultCache = None
+    _validation: str = "shallow"
 
     def __init__(
         self,
         new_pipeline_name: str,
         compute_type: str = "gpu",
         min_gpu_vram_mb: int = None,
+        max_workers: int = None,
+        pools: Dict[str, int] = None,
+        thread_budget: int = None,
+        result_cache: ResultCache = None,
+        validation: str = "shallow",
     ):
         self._pipeline_context_name = new_pipeline_name
         self._compute_type = compute_type
         self._min_gpu_vram_mb = min_gpu_vram_mb
+        self._max_workers = max_workers
+        self._pools = pools
+        self._thread_budget = thread_budget
+        self._result_cache = result_cache
+        self._validation = validation
 
     def __enter__(self):
         Pipeline._pipeline_context_active = True
@@ -30,6 +48,11 @@ class Pipeline:
             name=self._pipeline_context_name,
             compute_type=self._compute_type,
             min_gpu_vram_mb=self._min_gpu_vram_mb,
+            max_workers=self._max_workers,
+            pools=self._pools,
+            thread_budget=self._thread_budget,
+            result_cache=self._result_cache,
+            validation=self._validation,
         )
 
         return self
@@ -55,6 +78,52 @@ class Pipeline:
                         variable.is_output = True
                         break
 
+    @staticmethod
+    def map(
+        function: Union[Callable, Graph],
+        items: Variable,
+        *args: Variable,
+        batch_size: int = None,
+    ) -> Variable:
+        """
+        Apply a pipeline_function (or a whole Graph) to each element of a list.
+
+        The elements are run concurrently on the graph executor, or in chunks of
+        `batch_size` for functions decorated with `pipeline_function(batched=True)`,
+        and the results are gathered back in order into a list Variable.
+
+            Parameters:
+                    function (Union[Callable, Graph]): pipeline_function, model
+                        method or Graph applied to each element
+                    items (Variable): list Variable to map over
+                    *args (Variable): extra Variables passed unchanged to every call
+                    batch_size (int): chunk size for batched functions, defaults to
+                        the whole list
+
+            Returns:
+                    output (Variable): list Variable holding the results.
+        """
+        if not Pipeline._pipeline_context_active:
+            raise Exception("Cant map a function when not defining a pipeline!")
+
+        if isinstance(function, Graph):
+            function = _subgraph_function(function)
+        if not hasattr(function, "__function__"):
+            raise Exception("Can only map a pipeline_function or a Graph")
+
+        function_output = function.__function__.__annotations__.get("return")
+        if getattr(function_output, "__origin__", None) == tuple:
+            raise Exception("Can't map a function with Tuple outputs")
+
+        output: Variable = function(items, *args)
+
+        map_node = Pipeline._current_pipeline.nodes[-1]
+        map_node.mapped = True
+        map_node.batch_size = batch_size
+        output.type_class = list
+
+        return output
+
     @staticmethod
     def get_pipeline(graph_name: str) -> Graph:
         """
@@ -98,3 +167,15 @@ class Pipeline:
             Pipeline._current_pipeline.nodes.append(graph_node)
         else:
             raise Exception("Cant add a node when not defining a pipeline!")
+
+
+def _subgraph_function(graph: Graph) -> Callable:
+    # Imported here to avoid a circular import with the decorators module
+    from pipeline.objects.decorators import pipeline_function
+
+    def run_subgraph(*inputs) -> Any:
+        outputs = graph.run(*inputs)
+        return outputs[0] if len(outputs) == 1 else outputs
+
+    run_subgraph.__name__ = graph.name or run_subgraph.__name__
+    return pipeline_function(run_subgraph)
@@ -0,0 +1,30 @@
+import copy
+import queue
+from contextlib import contextmanager
+from typing import Any, List
+
+
+class ReplicaPool:
+    """Pool of independently usable instances of a `pipeline_model`.
+
+    Replicas are shallow copies of the original instance made before any
+    on_startup function runs, so attributes created in `__init__` (e.g. shared
+    weights) are shared while everything loaded on startup is per replica. Each
+    call checks out an instance so no two threads use the same one at once.
+    """
+
+    instances: List[Any]
+
+    def __init__(self, model: Any, replicas: int):
+        self.instances = [model] + [copy.copy(model) for _ in range(replicas - 1)]
+        self._available = queue.Queue()
+        for instance in self.instances:
+            self._available.put(instance)
+
+    @contextmanager
+    def checkout(self):
+        instance = self._available.get()
+        try:
+            yield instance
+        finally:
+            self._available.put(instance)
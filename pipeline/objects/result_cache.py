@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+from typing import Any, Callable, Dict, Tuple
+
+from pipeline.exceptions.ResultCacheTimeout import ResultCacheTimeout
+
+
+class ResultCache:
+    """Cache of whole graph run results keyed by an input fingerprint.
+
+    At most `max_entries` results are kept, evicting the least recently used,
+    and each expires `ttl` seconds after being computed (never if None).
+    Concurrent lookups of a key that is being computed are coalesced: they wait
+    for the single computation in flight and share its result, or its
+    exception, which is never cached.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = None):
+        if max_entries < 1:
+            raise Exception("ResultCache max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Only the configuration is saved with a graph
+        return dict(max_entries=self.max_entries, ttl=self.ttl)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            coalesced=self.coalesced,
+            hit_rate=(self.hits + self.coalesced) / lookups if lookups else 0.0,
+            entries=len(self._entries),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def compute_uncached(self, compute: Callable[[], Any]) -> Any:
+        """Compute a result that can't be looked up, e.g. as its key couldn't be
+        computed, counting it as a miss."""
+        with self._lock:
+            self.misses += 1
+        return compute()
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], Any], timeout: float = None
+    ) -> Any:
+        """Return the cached result for `key`, computing it if needed.
+
+        `timeout` bounds how long a coalesced lookup waits for the computation
+        in flight, raising ResultCacheTimeout once exceeded. Exceptions raised
+        by the computation are passed on unchanged.
+        """
+        computing = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                future = self._in_flight[key] = Future()
+                computing = True
+
+        if not computing:
+            if not wait([future], timeout=timeout).done:
+                raise ResultCacheTimeout(
+                    key=key, message="Timed out waiting for the run in flight"
+                )
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exception:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(exception)
+            raise
+
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+            self._entries[key] = (expires_at, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
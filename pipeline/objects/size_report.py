@@ -0,0 +1,205 @@
+"""Serialised sizes of the parts of a graph, as they are pickled on upload.
+
+Every function, model and variable type is pickled on its own by
+`PipelineCloud.upload_pipeline`, so an object referenced from several of them
+(e.g. a model from each of its functions, or a global array captured by two
+functions) is uploaded once per reference. The report lists the size of each
+part, the captured globals and closure variables of functions pickled by value
+and the large objects pickled in more than one part.
+"""
+import inspect
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from cloudpickle import CloudPickler
+
+from pipeline.objects.variable import PipelineFile
+
+DEFAULT_DUPLICATE_SIZE = 1024  # 1 KiB
+
+
+class _SizeCounter:
+    """Write-only file counting the bytes written to it."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        length = memoryview(data).nbytes
+        self.size += length
+        return length
+
+
+def _nbytes(obj: Any) -> Optional[int]:
+    """Size of the raw data of arrays, tensors, bytes and strings."""
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(obj, numpy.ndarray):
+        return obj.nbytes
+    torch = sys.modules.get("torch")
+    if torch is not None and isinstance(obj, torch.Tensor):
+        return obj.element_size() * obj.nelement()
+    return None
+
+
+class _RecordingPickler(CloudPickler):
+    """Records the models, functions and large buffers it pickles."""
+
+    def __init__(self, file, parts: Dict[int, str], min_size: int):
+        super().__init__(file)
+        self._parts = parts
+        self._min_size = min_size
+        self.recorded: Dict[int, Tuple[Any, str, int]] = {}
+
+    def persistent_id(self, obj):
+        if id(obj) in self._parts:
+            self.recorded[id(obj)] = (obj, self._parts[id(obj)], None)
+        else:
+            size = _nbytes(obj)
+            if size is not None and size >= self._min_size:
+                self.recorded[id(obj)] = (obj, _describe(obj), size)
+        return None
+
+
+def _describe(obj: Any) -> str:
+    shape = getattr(obj, "shape", None)
+    if shape is not None:
+        return "%s %s %s" % (type(obj).__name__, obj.dtype, tuple(shape))
+    return type(obj).__name__
+
+
+def _pickled_size(obj: Any, parts: Dict[int, str], min_size: int):
+    counter = _SizeCounter()
+    pickler = _RecordingPickler(counter, parts, min_size)
+    pickler.dump(obj)
+    return counter.size, pickler.recorded
+
+
+def _pickled_by_value(function: Any) -> bool:
+    """Whether cloudpickle pickles `function` by value, i.e. with its code and
+    captured globals, rather than as a reference to an importable name."""
+    module = sys.modules.get(getattr(function, "__module__", None))
+    if module is None or module.__name__ == "__main__":
+        return True
+    obj = module
+    for name in function.__qualname__.split("."):
+        obj = getattr(obj, name, None)
+    return obj is not function
+
+
+def _captured_variables(function: Any) -> List[dict]:
+    """Globals and closure variables captured by `function`, largest first."""
+    function = getattr(function, "__func__", function)
+    if not inspect.isfunction(function) or not _pickled_by_value(function):
+        return []
+    closure_vars = inspect.getclosurevars(function)
+    captured = []
+    for kind, variables in (
+        ("global", closure_vars.globals),
+        ("closure", closure_vars.nonlocals),
+    ):
+        for name, value in variables.items():
+            if inspect.ismodule(value):
+                continue
+            try:
+                size, _ = _pickled_size(value, {}, sys.maxsize)
+            except Exception:
+                size = None
+            captured.append(dict(name=name, kind=kind, size=size))
+    return sorted(captured, key=lambda variable: -(variable["size"] or 0))
+
+
+def size_report(graph: Any, min_duplicate_size: int = DEFAULT_DUPLICATE_SIZE) -> dict:
+    """Serialised sizes of the functions, models, variable types and
+    PipelineFiles of `graph`, see `Graph.size_report`."""
+    parts: Dict[int, str] = {}
+    for function in graph.functions:
+        parts[id(function)] = "function %s" % function.name
+    for model in graph.models:
+        parts[id(model.model)] = "model %s" % (model.name or type(model.model).__name__)
+
+    # id -> (object, description, size, parts it was pickled in)
+    pickled: Dict[int, list] = {}
+
+    def measure(obj: Any, part: str) -> int:
+        size, recorded = _pickled_size(obj, parts, min_duplicate_size)
+        for obj_id, (recorded_obj, description, obj_size) in recorded.items():
+            entry = pickled.setdefault(
+                obj_id, [recorded_obj, description, obj_size, []]
+            )
+            entry[3].append(part)
+        return size
+
+    functions = []
+    for function in graph.functions:
+        size = measure(function, parts[id(function)])
+        pickled[id(function)][2] = size
+        functions.append(
+            dict(
+                name=function.name,
+                local_id=function.local_id,
+                size=size,
+                captured=_captured_variables(function.function),
+            )
+        )
+    models = []
+    for model in graph.models:
+        size = measure(model, parts[id(model.model)])
+        pickled[id(model.model)][2] = size
+        models.append(
+            dict(
+                name=model.name,
+                local_id=model.local_id,
+                type=type(model.model).__name__,
+                size=size,
+            )
+        )
+    variables = [
+        dict(
+            name=var.name,
+            local_id=var.local_id,
+            type=getattr(var.type_class, "__name__", repr(var.type_class)),
+            size=measure(var.type_class, "variable %s" % var.local_id),
+        )
+        for var in graph.variables
+    ]
+    files = [
+        dict(
+            name=var.name,
+            local_id=var.local_id,
+            path=str(var.path),
+            size=os.path.getsize(var.path)
+            if var.path is not None and os.path.exists(var.path)
+            else None,
+        )
+        for var in graph.variables
+        if isinstance(var, PipelineFile)
+    ]
+
+    duplicates = []
+    covered = set()
+    entries = sorted(pickled.items(), key=lambda item: -(item[1][2] or 0))
+    for obj_id, (_, description, size, entry_parts) in entries:
+        entry_parts = tuple(sorted(set(entry_parts)))
+        if len(entry_parts) < 2 or (size or 0) < min_duplicate_size:
+            continue
+        # Objects within a larger duplicated model or function (e.g. its
+        # weights) are pickled along with it
+        if entry_parts in covered:
+            continue
+        if obj_id in parts:
+            covered.add(entry_parts)
+        duplicates.append(dict(object=description, size=size, parts=list(entry_parts)))
+
+    total = sum(part["size"] or 0 for part in functions + models + variables + files)
+    return dict(
+        name=graph.name,
+        total=total,
+        functions=functions,
+        models=models,
+        variables=variables,
+        files=files,
+        duplicates=duplicates,
+    )
@@ -0,0 +1,119 @@
+import shutil
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, List, Optional
+
+from pipeline import configuration
+from pipeline.objects.graph_node import GraphNode
+from pipeline.objects.variable import Variable
+from pipeline.util import generate_id
+
+DEFAULT_SPILL_THRESHOLD = 16 * 1024 * 1024  # 16 MiB
+
+
+def _array_nbytes(value: Any) -> Optional[int]:
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.nbytes
+    return None
+
+
+class SpillingVariables(dict):
+    """Running variables of a single run kept within a memory budget.
+
+    numpy intermediates at least `threshold` bytes large are written to a
+    memory-mapped file under `PIPELINE_CACHE/spill` whenever keeping them in
+    memory would exceed `memory_budget`, and are handed to later nodes as
+    memmaps. Intermediates are dropped (and their files removed) once every
+    node using them has run, except for the graph outputs, which are loaded
+    back into memory when the run is closed.
+    """
+
+    def __init__(
+        self,
+        nodes: List[GraphNode],
+        outputs: List[Variable],
+        memory_budget: int,
+        threshold: int = DEFAULT_SPILL_THRESHOLD,
+    ):
+        super().__init__()
+        self.memory_budget = memory_budget
+        self.threshold = threshold
+        self.directory = configuration.PIPELINE_CACHE / "spill" / generate_id(10)
+        self.live_bytes = 0
+        self.spilled_bytes = 0
+
+        self._uses = Counter(
+            _input.local_id for node in nodes for _input in node.inputs
+        )
+        self._keep = {output.local_id for output in outputs}
+        self._sizes = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def __setitem__(self, local_id: str, value: Any) -> None:
+        with self._lock:
+            self._forget(local_id)
+            size = _array_nbytes(value)
+            if size is not None:
+                if (
+                    size >= self.threshold
+                    and self.live_bytes + size > self.memory_budget
+                ):
+                    value = self._spill(local_id, value)
+                else:
+                    self._sizes[local_id] = size
+                    self.live_bytes += size
+            super().__setitem__(local_id, value)
+
+    def _spill(self, local_id: str, value: Any) -> Any:
+        import numpy as np
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / ("%s.npy" % local_id)
+        np.save(path, value)
+        self._paths[local_id] = path
+        self.spilled_bytes += value.nbytes
+        return np.load(path, mmap_mode="r+")
+
+    def _forget(self, local_id: str) -> None:
+        self.live_bytes -= self._sizes.pop(local_id, 0)
+        path: Path = self._paths.pop(local_id, None)
+        if path is not None:
+            # Existing memmaps stay valid on POSIX, elsewhere the file is
+            # removed with the spill directory at the end of the run
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def release_inputs(self, node: GraphNode) -> None:
+        """Drop the inputs of `node` that no later node uses."""
+        with self._lock:
+            for _input in node.inputs:
+                self._uses[_input.local_id] -= 1
+                if (
+                    self._uses[_input.local_id] <= 0
+                    and _input.local_id not in self._keep
+                    and _input.local_id in self
+                ):
+                    self._forget(_input.local_id)
+                    super().__delitem__(_input.local_id)
+
+    def close(self) -> None:
+        """Remove the spill files, loading the spilled outputs into memory
+        first. Other spilled intermediates are dropped, as the files can't be
+        removed while mapped on every platform."""
+        with self._lock:
+            if self._paths:
+                import numpy as np
+
+                for local_id in list(self._paths):
+                    if local_id in self._keep and local_id in self:
+                        super().__setitem__(local_id, np.array(self[local_id]))
+                    elif local_id in self:
+                        super().__delitem__(local_id)
+                self._paths.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
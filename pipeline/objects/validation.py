@@ -0,0 +1,77 @@
+import collections.abc
+import typing
+from typing import Any, Callable, TypeVar, Union
+
+# Input validation strictness levels, from cheapest to most thorough
+VALIDATION_LEVELS = ("none", "shallow", "deep")
+
+Validator = Callable[[Any], bool]
+
+
+def _accept(value: Any) -> bool:
+    return True
+
+
+def compile_validator(type_class: Any, strictness: str = "shallow") -> Validator:
+    """Build a function checking values against a Variable type_class.
+
+    Parameters:
+            type_class: class or typing annotation (e.g. List[float])
+            strictness (str): "none" accepts everything, "shallow" only
+                checks the outer type (list for List[float]) and "deep"
+                also checks the elements of typed containers.
+
+    Returns:
+            validator (Callable): returns True when a value is valid.
+    """
+    if strictness not in VALIDATION_LEVELS:
+        raise Exception(
+            "Unknown validation strictness '%s', expected one of %s"
+            % (strictness, ", ".join(VALIDATION_LEVELS))
+        )
+    if strictness == "none":
+        return _accept
+    return _compile(type_class, strictness == "deep")
+
+
+def _compile(type_class: Any, deep: bool) -> Validator:
+    if type_class is Any or type_class is object or isinstance(type_class, TypeVar):
+        return _accept
+
+    origin = typing.get_origin(type_class)
+    if origin is None:
+        return lambda value: isinstance(value, type_class)
+
+    args = typing.get_args(type_class)
+    if origin is Union:
+        validators = [_compile(arg, deep) for arg in args]
+        return lambda value: any(validator(value) for validator in validators)
+    if origin is typing.Literal:
+        return lambda value: value in args
+    if not deep or not args or not isinstance(origin, type):
+        return lambda value: isinstance(value, origin)
+
+    if issubclass(origin, collections.abc.Mapping):
+        key_validator = _compile(args[0], deep)
+        value_validator = _compile(args[1], deep)
+        return lambda value: isinstance(value, origin) and all(
+            key_validator(key) and value_validator(item) for key, item in value.items()
+        )
+
+    if issubclass(origin, tuple) and not (len(args) == 2 and args[1] is Ellipsis):
+        validators = [_compile(arg, deep) for arg in args]
+        return (
+            lambda value: isinstance(value, origin)
+            and len(value) == len(validators)
+            and all(validator(item) for validator, item in zip(validators, value))
+        )
+
+    # Only check the elements of collections, iterating an Iterable or
+    # Iterator would consume it
+    if issubclass(origin, collections.abc.Collection):
+        item_validator = _compile(args[0], deep)
+        return lambda value: isinstance(value, origin) and all(
+            item_validator(item) for item in value
+        )
+
+    return lambda value: isinstance(value, origin)
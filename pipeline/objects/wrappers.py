@@ -6,14 +6,19 @@ from pipeline.objects import (
     pipeline_function,
     pipeline_model,
 )
+from pipeline.util.threads import intra_op_threads
 
 
-def onnx_to_pipeline(path: str, name: str = "onnx_model") -> Graph:
+def onnx_to_pipeline(
+    path: str, name: str = "onnx_model", thread_budget: int = None
+) -> Graph:
     """
     Create a pipeline from an onnx model file
         Parameters:
                 path (str): local path to onnx model file
                 name (str): Desired name to be given to this pipeline
+                thread_budget (int): CPU threads shared by concurrent runs, the
+                    onnxruntime session uses its share for intra-op threads
 
         Returns:
                 pipeline (Graph): Executable Pipeline Graph object
@@ -35,15 +40,22 @@ def onnx_to_pipeline(path: str, name: str = "onnx_model") -> Graph:
         def load(self, onnx_file: PipelineFile) -> bool:
             import onnxruntime
 
+            session_options = onnxruntime.SessionOptions()
+            threads = intra_op_threads()
+            if threads is not None:
+                session_options.intra_op_num_threads = threads
+                session_options.inter_op_num_threads = 1
+
             self.session = onnxruntime.InferenceSession(
                 onnx_file.path,
+                sess_options=session_options,
                 providers=[
                     "CUDAExecutionProvider",
                 ],
             )
             return True
 
-    with Pipeline(name) as pipeline:
+    with Pipeline(name, thread_budget=thread_budget) as pipeline:
         onnx_file = PipelineFile(path=path)
         onnx_output = Variable(list, is_input=True)
         onnx_input = Variable(dict, is_input=True)
@@ -19,6 +19,8 @@ class PipelineGraphNode(BaseModel):
     function: str
     inputs: List[str]
     outputs: List[str]
+    mapped: bool = False
+    batch_size: Optional[int]
 
 
 class PipelineFileVariableGet(BaseModel):
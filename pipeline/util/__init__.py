@@ -28,17 +28,38 @@ def hex_to_python_object(hex: str) -> Any:
     return loads(h)
 
 
-def dump_object(obj: Any) -> bytes:
-    """Serialize `obj` as bytes."""
+def dump_object(obj: Any, out_of_band: bool = False) -> bytes:
+    """Serialize `obj` as bytes.
+
+    With `out_of_band` large buffers (numpy arrays, CPU torch tensors) are
+    written after the pickle stream instead of inside it, see
+    `pipeline.util.buffers`.
+    """
+    if out_of_band:
+        from pipeline.util.buffers import dumps_buffers
+
+        return dumps_buffers(obj)
     return dumps(obj)
 
 
 def load_object(pickled: Union[bytes, str]) -> Any:
-    """Deserialize an object from the payload."""
+    """Deserialize an object from the payload, which is either bytes or their
+    hex encoding, and may be compressed."""
     if isinstance(pickled, str):
-        return hex_to_python_object(pickled)
-    else:
-        return loads(pickled)
+        pickled = bytearray.fromhex(pickled)
+
+    from pipeline.util.buffers import is_buffers_payload, loads_buffers
+    from pipeline.util.codecs import decode_object, is_codec_payload
+    from pipeline.util.compression import decompress, is_compressed
+
+    if is_compressed(pickled):
+        pickled = decompress(pickled)
+
+    if is_buffers_payload(pickled):
+        return loads_buffers(pickled)
+    if is_codec_payload(pickled):
+        return decode_object(pickled)
+    return loads(pickled)
 
 
 def python_object_to_name(obj: Any) -> Optional[str]:
@@ -0,0 +1,186 @@
+"""Serialisation keeping large buffers (numpy arrays, CPU torch tensors,
+bytearrays) out of the pickle stream, using pickle protocol 5 out-of-band
+buffers.
+
+The payload is a small header, the pickle stream, then every buffer at a
+64-byte aligned offset. Buffers are written straight from the objects' memory
+and, on load, are either sliced from the payload without copying or
+memory-mapped from a file.
+"""
+import io
+import mmap
+import pickle
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, List, Tuple, Union
+
+from pipeline.util.shared_memory import BufferPickler
+
+BUFFERS_MAGIC = b"PLBUF01\n"
+DEFAULT_BUFFER_THRESHOLD = 64 * 1024  # 64 KiB
+
+_ALIGNMENT = 64
+# Magic, pickle stream length, number of buffers
+_HEADER = struct.Struct("<8sQQ")
+_LENGTH = struct.Struct("<Q")
+
+
+def _padding(offset: int) -> int:
+    return -offset % _ALIGNMENT
+
+
+def _pickle(
+    obj: Any, threshold: int, pickler_class: Callable = None
+) -> Tuple[bytes, List[memoryview]]:
+    buffers: List[memoryview] = []
+
+    def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+        raw = buffer.raw()
+        if raw.nbytes < threshold:
+            # Serialise in-band
+            return True
+        buffers.append(raw)
+        return False
+
+    file = io.BytesIO()
+    pickler_class = pickler_class or BufferPickler
+    pickler_class(file, protocol=5, buffer_callback=buffer_callback).dump(obj)
+    return file.getvalue(), buffers
+
+
+def _layout(data_length: int, lengths: List[int]) -> Tuple[int, List[int], int]:
+    """Offsets of the pickle stream and of each buffer, and the total size."""
+    offset = _HEADER.size + _LENGTH.size * len(lengths)
+    offset += _padding(offset)
+    data_offset = offset
+    offset += data_length
+
+    buffer_offsets = []
+    for length in lengths:
+        offset += _padding(offset)
+        buffer_offsets.append(offset)
+        offset += length
+    return data_offset, buffer_offsets, offset
+
+
+def _header(data: bytes, buffers: List[memoryview]) -> bytes:
+    return _HEADER.pack(BUFFERS_MAGIC, len(data), len(buffers)) + b"".join(
+        _LENGTH.pack(buffer.nbytes) for buffer in buffers
+    )
+
+
+def is_buffers_payload(data: Union[bytes, bytearray, memoryview]) -> bool:
+    return bytes(data[: len(BUFFERS_MAGIC)]) == BUFFERS_MAGIC
+
+
+def dump_buffers(
+    obj: Any,
+    file: BinaryIO,
+    threshold: int = DEFAULT_BUFFER_THRESHOLD,
+    pickler_class: Callable = None,
+) -> int:
+    """Write `obj` to a binary file object, returning the number of bytes
+    written. Buffers of at least `threshold` bytes are written out-of-band,
+    directly from the memory of the objects holding them. `pickler_class`
+    replaces BufferPickler, e.g. to add persistent ids."""
+    data, buffers = _pickle(obj, threshold, pickler_class)
+    data_offset, buffer_offsets, size = _layout(
+        len(data), [buffer.nbytes for buffer in buffers]
+    )
+
+    header = _header(data, buffers)
+    file.write(header)
+    file.write(bytes(data_offset - len(header)))
+    file.write(data)
+    position = data_offset + len(data)
+    for buffer, offset in zip(buffers, buffer_offsets):
+        file.write(bytes(offset - position))
+        file.write(buffer)
+        position = offset + buffer.nbytes
+    return size
+
+
+def dumps_buffers(obj: Any, threshold: int = DEFAULT_BUFFER_THRESHOLD) -> bytearray:
+    """Serialise `obj` into a single preallocated payload, copying each
+    out-of-band buffer exactly once."""
+    data, buffers = _pickle(obj, threshold)
+    data_offset, buffer_offsets, size = _layout(
+        len(data), [buffer.nbytes for buffer in buffers]
+    )
+
+    payload = bytearray(size)
+    view = memoryview(payload)
+    header = _header(data, buffers)
+    view[: len(header)] = header
+    view[data_offset : data_offset + len(data)] = data
+    for buffer, offset in zip(buffers, buffer_offsets):
+        view[offset : offset + buffer.nbytes] = buffer.cast("B")
+    return payload
+
+
+def _read_header(header: memoryview) -> Tuple[int, int]:
+    magic, data_length, buffer_count = _HEADER.unpack_from(header)
+    if magic != BUFFERS_MAGIC:
+        raise Exception("Not an out-of-band buffers payload")
+    return data_length, buffer_count
+
+
+def loads_buffers(
+    payload: Union[bytes, bytearray, memoryview, mmap.mmap],
+    persistent_load: Callable[[Any], Any] = None,
+) -> Any:
+    """Load an object written by `dumps_buffers`/`dump_buffers`. Buffers are
+    sliced from `payload` without copying, so loaded arrays share its memory."""
+    view = memoryview(payload)
+    data_length, buffer_count = _read_header(view)
+    lengths = [
+        _LENGTH.unpack_from(view, _HEADER.size + _LENGTH.size * index)[0]
+        for index in range(buffer_count)
+    ]
+    data_offset, buffer_offsets, _ = _layout(data_length, lengths)
+
+    buffers = [
+        view[offset : offset + length]
+        for offset, length in zip(buffer_offsets, lengths)
+    ]
+    data = view[data_offset : data_offset + data_length]
+    if persistent_load is None:
+        return pickle.loads(data, buffers=buffers)
+    unpickler = pickle.Unpickler(io.BytesIO(data), buffers=buffers)
+    unpickler.persistent_load = persistent_load
+    return unpickler.load()
+
+
+def load_buffers(file: Union[str, Path, BinaryIO], mmap_buffers: bool = False) -> Any:
+    """Load an object written by `dump_buffers` from a path or binary file.
+
+    With `mmap_buffers` the file is memory-mapped copy-on-write and buffers are
+    backed by the mapping, so arrays are only paged in when accessed. Otherwise
+    each buffer is read into its own allocation, without intermediate copies.
+    """
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as opened_file:
+            return load_buffers(opened_file, mmap_buffers=mmap_buffers)
+
+    if mmap_buffers:
+        start = file.tell()
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        return loads_buffers(memoryview(mapped)[start:])
+
+    header = file.read(_HEADER.size)
+    data_length, buffer_count = _read_header(memoryview(header))
+    lengths = [_LENGTH.unpack(file.read(_LENGTH.size))[0] for _ in range(buffer_count)]
+    data_offset, buffer_offsets, _ = _layout(data_length, lengths)
+
+    file.read(data_offset - _HEADER.size - _LENGTH.size * buffer_count)
+    data = file.read(data_length)
+    position = data_offset + data_length
+    buffers = []
+    for offset, length in zip(buffer_offsets, lengths):
+        file.read(offset - position)
+        buffer = bytearray(length)
+        if file.readinto(buffer) != length:
+            raise Exception("Truncated out-of-band buffers payload")
+        buffers.append(buffer)
+        position = offset + length
+    return pickle.loads(data, buffers=buffers)
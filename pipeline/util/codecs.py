@@ -0,0 +1,174 @@
+"""Compact encodings for run inputs and results.
+
+Small plain values (None, bools, ints, floats, strings and lists or
+string-keyed dicts of them), which is what variables usually declare and what
+cloudpickle adds most overhead to, are encoded as JSON,
+and numpy arrays as their dtype, shape and raw bytes. Anything else falls back
+to cloudpickle. JSON and array payloads start with their own magic, so
+`decode_object` (and `pipeline.util.load_object`) detect the encoding from the
+payload itself.
+"""
+import json
+import struct
+import sys
+import typing
+from typing import Any, Sequence, Union
+
+from cloudpickle import dumps
+from dill import loads
+
+JSON_MAGIC = b"PLJSON1\n"
+ARRAY_MAGIC = b"PLARR01\n"
+# Values and containers in a JSON payload, at most
+JSON_MAX_ITEMS = 64
+
+_ALIGNMENT = 16
+# Magic, array header length
+_ARRAY_HEADER = struct.Struct("<8sI")
+
+_JSON_SCALARS = (type(None), bool, int, float, str)
+
+
+def _is_json(obj: Any) -> bool:
+    """Whether `obj` is a small value that round-trips through JSON unchanged.
+    Exact types only, so tuples, subclasses (e.g. numpy scalars) and non-string
+    keys are pickled. Larger containers are pickled too, as pickle memoizes
+    repeated keys and strings and is both smaller and faster for them."""
+    pending = [obj]
+    items = 0
+    while pending:
+        value = pending.pop()
+        items += 1
+        if items > JSON_MAX_ITEMS:
+            return False
+        value_type = type(value)
+        if value_type is list:
+            pending.extend(value)
+        elif value_type is dict:
+            if not all(type(key) is str for key in value):
+                return False
+            pending.extend(value.values())
+        elif value_type not in _JSON_SCALARS:
+            return False
+    return True
+
+
+def _is_array(obj: Any) -> bool:
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and type(obj) is numpy.ndarray and not obj.dtype.hasobject
+
+
+def _declared_codec(type_class: Any) -> str:
+    """The encoding a value of the declared type can use, or None if only the
+    value itself can tell (e.g. `Any` or an undeclared type)."""
+    if type_class is None or type_class is Any:
+        return None
+    origin = typing.get_origin(type_class) or type_class
+    if origin is Union:
+        codecs = {_declared_codec(arg) for arg in typing.get_args(type_class)}
+        return codecs.pop() if len(codecs) == 1 else None
+    if origin in (list, dict):
+        # Containers of values that can only be pickled are pickled whole
+        for element in typing.get_args(type_class)[-1:]:
+            if typing.get_origin(element) is Union:
+                members = typing.get_args(element)
+            else:
+                members = (element,)
+            if any(
+                _declared_codec(member) in ("pickle", "array") for member in members
+            ):
+                return "pickle"
+        return "json"
+    if origin in _JSON_SCALARS:
+        return "json"
+    if getattr(origin, "__module__", None) == "numpy" and origin.__name__ in (
+        "ndarray",
+        "NDArray",
+    ):
+        return "array"
+    return "pickle"
+
+
+def inputs_type(type_classes: Sequence[Any]) -> Any:
+    """Declared type of the list of inputs of a run, from the `type_class` of
+    each input Variable, to pass to `encode_object`."""
+    if not type_classes:
+        return None
+    return typing.List[Union[tuple(type_classes)]]
+
+
+def _encode_json(obj: Any) -> bytes:
+    return JSON_MAGIC + json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _encode_array(array: Any) -> bytearray:
+    import numpy as np
+
+    header = json.dumps(
+        dict(descr=np.lib.format.dtype_to_descr(array.dtype), shape=array.shape)
+    ).encode()
+    data_offset = _ARRAY_HEADER.size + len(header)
+    data_offset += -data_offset % _ALIGNMENT
+
+    # Copy the array straight into the payload
+    payload = bytearray(data_offset + array.nbytes)
+    payload[: _ARRAY_HEADER.size] = _ARRAY_HEADER.pack(ARRAY_MAGIC, len(header))
+    payload[_ARRAY_HEADER.size : _ARRAY_HEADER.size + len(header)] = header
+    data = np.frombuffer(payload, array.dtype, array.size, data_offset)
+    data.reshape(array.shape)[...] = array
+    return payload
+
+
+def _decode_array(payload: Union[bytes, bytearray, memoryview]) -> Any:
+    import numpy as np
+
+    _, header_length = _ARRAY_HEADER.unpack_from(payload)
+    header = json.loads(
+        bytes(payload[_ARRAY_HEADER.size : _ARRAY_HEADER.size + header_length])
+    )
+    dtype = np.lib.format.descr_to_dtype(header["descr"])
+    shape = tuple(header["shape"])
+    data_offset = _ARRAY_HEADER.size + header_length
+    data_offset += -data_offset % _ALIGNMENT
+
+    count = 1
+    for dimension in shape:
+        count *= dimension
+    return np.frombuffer(payload, dtype, count, data_offset).reshape(shape)
+
+
+def encode_object(obj: Any, type_class: Any = None) -> Union[bytes, bytearray]:
+    """Encode `obj` compactly, choosing the encoding from its declared type.
+
+    Parameters:
+            obj (Any):
+                The value to encode
+            type_class (Any):
+                The declared type of `obj` (e.g. `Variable.type_class`).
+                Types that can never be JSON or arrays skip straight to
+                pickling; without it the encoding is picked from the value.
+
+    Returns:
+            payload (Union[bytes, bytearray]): JSON, array or pickle payload.
+    """
+    codec = _declared_codec(type_class)
+    if codec in (None, "json") and _is_json(obj):
+        return _encode_json(obj)
+    if codec in (None, "array") and _is_array(obj):
+        return _encode_array(obj)
+    return dumps(obj)
+
+
+def is_codec_payload(payload: Union[bytes, bytearray, memoryview]) -> bool:
+    return bytes(payload[: len(JSON_MAGIC)]) in (JSON_MAGIC, ARRAY_MAGIC)
+
+
+def decode_object(payload: Union[bytes, bytearray, memoryview]) -> Any:
+    """Decode a payload written by `encode_object`. Arrays share the payload's
+    memory, so they are read-only when it is `bytes`."""
+    magic = bytes(payload[: len(JSON_MAGIC)])
+    if magic == JSON_MAGIC:
+        return json.loads(bytes(payload[len(JSON_MAGIC) :]))
+    if magic == ARRAY_MAGIC:
+        return _decode_array(payload)
+    return loads(payload)
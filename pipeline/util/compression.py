@@ -0,0 +1,82 @@
+"""Optional compression of serialised payloads with stdlib codecs.
+
+Compressed payloads are framed with a magic, the algorithm and the
+uncompressed length, so readers (e.g. `pipeline.util.load_object`) detect and
+decompress them automatically, and uncompressed payloads load unchanged.
+"""
+import lzma
+import struct
+import zlib
+from typing import Optional, Union
+
+COMPRESSED_MAGIC = b"PLCMP01\n"
+COMPRESSION_ALGORITHMS = ("zlib", "lzma")
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024  # 64 KiB
+
+# Magic, algorithm index, uncompressed length
+_HEADER = struct.Struct("<8sBQ")
+
+
+def _check_algorithm(algorithm: str) -> None:
+    if algorithm not in COMPRESSION_ALGORITHMS:
+        raise Exception(
+            "Unknown compression '%s', expected one of %s"
+            % (algorithm, ", ".join(COMPRESSION_ALGORITHMS))
+        )
+
+
+def compress(
+    data: Union[bytes, bytearray, memoryview],
+    algorithm: Optional[str],
+    threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+    level: Optional[int] = None,
+) -> Union[bytes, bytearray, memoryview]:
+    """Compress `data` with `algorithm` ("zlib" or "lzma").
+
+    `data` is returned unchanged when `algorithm` is None or "none", when it
+    is smaller than `threshold` bytes, or when compressing doesn't make it
+    smaller. `level` is the zlib level or lzma preset, defaulting to each
+    codec's own default.
+    """
+    if algorithm is None or algorithm == "none":
+        return data
+    _check_algorithm(algorithm)
+    length = memoryview(data).nbytes
+    if length < threshold:
+        return data
+
+    if algorithm == "zlib":
+        compressed = zlib.compress(data, -1 if level is None else level)
+    else:
+        compressed = lzma.compress(data, preset=level)
+    if len(compressed) + _HEADER.size >= length:
+        return data
+    header = _HEADER.pack(
+        COMPRESSED_MAGIC, COMPRESSION_ALGORITHMS.index(algorithm), length
+    )
+    return header + compressed
+
+
+def is_compressed(data: Union[bytes, bytearray, memoryview]) -> bool:
+    return bytes(data[: len(COMPRESSED_MAGIC)]) == COMPRESSED_MAGIC
+
+
+def decompress(data: Union[bytes, bytearray, memoryview]) -> bytes:
+    """Decompress a payload written by `compress`."""
+    magic, algorithm_index, length = _HEADER.unpack_from(data)
+    if magic != COMPRESSED_MAGIC:
+        raise Exception("Not a compressed payload")
+    if algorithm_index >= len(COMPRESSION_ALGORITHMS):
+        raise Exception(
+            "Unknown compression algorithm %u, upgrade pipeline-ai to load it"
+            % algorithm_index
+        )
+
+    compressed = memoryview(data)[_HEADER.size :]
+    if COMPRESSION_ALGORITHMS[algorithm_index] == "zlib":
+        decompressed = zlib.decompress(compressed, bufsize=length)
+    else:
+        decompressed = lzma.decompress(compressed)
+    if len(decompressed) != length:
+        raise Exception("Corrupt compressed payload")
+    return decompressed
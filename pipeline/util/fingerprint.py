@@ -0,0 +1,295 @@
+import hashlib
+import inspect
+import sys
+import sysconfig
+import types
+from typing import Any, FrozenSet, Iterable, Iterator
+
+from cloudpickle import dumps
+
+
+def fingerprint(obj: Any) -> str:
+    """Return a hex digest identifying the value of `obj`.
+
+    Equal primitives, containers, numpy arrays and torch tensors always get the
+    same fingerprint. Other objects are fingerprinted through their pickled
+    bytes, which is only stable for objects that pickle deterministically.
+    """
+    hasher = hashlib.sha256()
+    _update(hasher, obj)
+    return hasher.hexdigest()
+
+
+def _update(hasher, obj: Any) -> None:
+    hasher.update(type(obj).__qualname__.encode())
+
+    if obj is None or isinstance(obj, (bool, int, float, complex)):
+        hasher.update(repr(obj).encode())
+        return
+    if isinstance(obj, str):
+        hasher.update(obj.encode("utf-8", "surrogatepass"))
+        return
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        hasher.update(obj)
+        return
+    if isinstance(obj, (list, tuple)):
+        hasher.update(b"%d" % len(obj))
+        for item in obj:
+            _update(hasher, item)
+        return
+    if isinstance(obj, (set, frozenset)):
+        hasher.update(b"%d" % len(obj))
+        for item_fingerprint in sorted(fingerprint(item) for item in obj):
+            hasher.update(item_fingerprint.encode())
+        return
+    if isinstance(obj, dict):
+        hasher.update(b"%d" % len(obj))
+        items = sorted((fingerprint(key), value) for key, value in obj.items())
+        for key_fingerprint, value in items:
+            hasher.update(key_fingerprint.encode())
+            _update(hasher, value)
+        return
+
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(obj, numpy.ndarray):
+        if obj.dtype.hasobject:
+            _update(hasher, obj.tolist())
+            return
+        hasher.update(obj.dtype.str.encode())
+        hasher.update(repr(obj.shape).encode())
+        hasher.update(numpy.ascontiguousarray(obj).data.cast("B"))
+        return
+
+    torch = sys.modules.get("torch")
+    if torch is not None and isinstance(obj, torch.Tensor):
+        hasher.update(str(obj.dtype).encode())
+        hasher.update(repr(tuple(obj.shape)).encode())
+        tensor = obj.detach().cpu()
+        try:
+            _update(hasher, tensor.numpy())
+        except (TypeError, RuntimeError):
+            # dtypes without a numpy equivalent (e.g. bfloat16)
+            hasher.update(dumps(tensor.contiguous()))
+        return
+
+    hasher.update(dumps(obj))
+
+
+def file_fingerprint(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return a hex digest of the contents of the file at `path`, read in
+    chunks."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def combine_fingerprints(*fingerprints: str) -> str:
+    """Return the fingerprint of a Merkle tree node from those of its children,
+    in order."""
+    hasher = hashlib.sha256()
+    hasher.update(b"%d" % len(fingerprints))
+    for child in fingerprints:
+        hasher.update(child.encode())
+    return hasher.hexdigest()
+
+
+_INSTALLED_PATHS = tuple(
+    {
+        sysconfig.get_path(name)
+        for name in ("stdlib", "platstdlib", "purelib", "platlib")
+    }
+)
+
+
+def _is_installed(obj: Any) -> bool:
+    """Whether `obj` is defined by the standard library, an installed package
+    or this library, and can be identified by its name rather than its
+    content. The latter also covers source checkouts, whose classes (e.g.
+    `Pipeline`) hold the state of the graphs being built."""
+    module = sys.modules.get(getattr(obj, "__module__", None))
+    if module is None or module.__name__ == "__main__":
+        return False
+    if module.__name__.partition(".")[0] == __name__.partition(".")[0]:
+        return True
+    path = getattr(module, "__file__", None)
+    return path is None or path.startswith(_INSTALLED_PATHS)
+
+
+def _qualified_name(obj: Any) -> str:
+    return "%s.%s" % (
+        getattr(obj, "__module__", None),
+        getattr(obj, "__qualname__", type(obj).__qualname__),
+    )
+
+
+def _code_names(code: types.CodeType) -> Iterator[str]:
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_names(const)
+
+
+def _code_fingerprint(code: types.CodeType) -> str:
+    """Bytecode and constants of `code`, without its file name or line numbers."""
+    children = [
+        fingerprint(
+            [
+                code.co_code,
+                code.co_names,
+                code.co_varnames,
+                code.co_freevars,
+                code.co_cellvars,
+                code.co_argcount,
+                code.co_posonlyargcount,
+                code.co_kwonlyargcount,
+                code.co_flags,
+            ]
+        )
+    ]
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            children.append(_code_fingerprint(const))
+        else:
+            children.append(fingerprint(const))
+    return combine_fingerprints(*children)
+
+
+def value_fingerprint(value: Any, _seen: FrozenSet[int] = frozenset()) -> str:
+    """Return a fingerprint of a value referenced by code. Functions and
+    classes are fingerprinted by content, except those of the standard library
+    and installed packages which, like modules, are identified by name."""
+    if inspect.ismodule(value):
+        return fingerprint("module %s" % value.__name__)
+    if isinstance(value, (types.FunctionType, types.MethodType, type)):
+        if _is_installed(value):
+            return fingerprint("installed %s" % _qualified_name(value))
+        if isinstance(value, type):
+            return class_fingerprint(value, _seen=_seen)
+        return function_fingerprint(value, _seen=_seen)
+    if callable(value) and not hasattr(value, "__dict__"):
+        # Builtins and other native callables
+        return fingerprint("callable %s" % _qualified_name(value))
+    try:
+        return fingerprint(value)
+    except Exception:
+        # Not picklable, identify it by type only
+        return fingerprint("object %s" % _qualified_name(type(value)))
+
+
+def function_fingerprint(function: Any, _seen: FrozenSet[int] = frozenset()) -> str:
+    """Return a deterministic content fingerprint of a function.
+
+    The fingerprint is a Merkle tree over the source, the bytecode, and the
+    globals, closure variables and defaults the function references, with
+    functions and classes they reference fingerprinted recursively by content
+    (those of installed packages by name). It changes whenever any of them
+    change, unlike a hash of the source alone.
+    """
+    function = getattr(function, "__func__", function)
+    if not isinstance(function, types.FunctionType):
+        return fingerprint("callable %s" % _qualified_name(function))
+    if id(function) in _seen:
+        # Recursive reference, its content is already being fingerprinted
+        return fingerprint("recursive %s" % _qualified_name(function))
+    seen = _seen | {id(function)}
+
+    try:
+        source = inspect.getsource(function)
+    except (OSError, TypeError):
+        source = ""
+    code = function.__code__
+
+    global_names = sorted(
+        name for name in set(_code_names(code)) if name in function.__globals__
+    )
+    referenced_globals = [
+        combine_fingerprints(
+            fingerprint(name), value_fingerprint(function.__globals__[name], seen)
+        )
+        for name in global_names
+    ]
+
+    closure_variables = []
+    for name, cell in zip(code.co_freevars, function.__closure__ or ()):
+        try:
+            child = value_fingerprint(cell.cell_contents, seen)
+        except ValueError:
+            # Empty cell
+            child = fingerprint(None)
+        closure_variables.append(combine_fingerprints(fingerprint(name), child))
+
+    defaults = [value_fingerprint(value, seen) for value in function.__defaults__ or ()]
+    for name, value in sorted((function.__kwdefaults__ or {}).items()):
+        defaults.append(
+            combine_fingerprints(fingerprint(name), value_fingerprint(value, seen))
+        )
+
+    return combine_fingerprints(
+        fingerprint(source),
+        _code_fingerprint(code),
+        combine_fingerprints(*referenced_globals),
+        combine_fingerprints(*closure_variables),
+        combine_fingerprints(*defaults),
+    )
+
+
+def class_fingerprint(cls: type, _seen: FrozenSet[int] = frozenset()) -> str:
+    """Return a deterministic content fingerprint of a class: a Merkle tree over
+    its name, bases and the attributes it defines, with methods fingerprinted
+    by `function_fingerprint`."""
+    if id(cls) in _seen:
+        return fingerprint("recursive %s" % _qualified_name(cls))
+    seen = _seen | {id(cls)}
+
+    attributes = []
+    for name, value in sorted(vars(cls).items()):
+        if name in (
+            "__dict__",
+            "__weakref__",
+            "__module__",
+            "__doc__",
+            # Cached by copyreg when an instance is first pickled
+            "__slotnames__",
+        ):
+            continue
+        if isinstance(value, property):
+            child = combine_fingerprints(
+                *(
+                    value_fingerprint(accessor, seen)
+                    for accessor in (value.fget, value.fset, value.fdel)
+                )
+            )
+        else:
+            if isinstance(value, (staticmethod, classmethod)):
+                value = value.__func__
+            child = value_fingerprint(value, seen)
+        attributes.append(combine_fingerprints(fingerprint(name), child))
+
+    return combine_fingerprints(
+        fingerprint(cls.__qualname__),
+        combine_fingerprints(
+            *(value_fingerprint(base, seen) for base in cls.__bases__)
+        ),
+        combine_fingerprints(*attributes),
+    )
+
+
+def object_fingerprint(obj: Any, exclude: Iterable[str] = ()) -> str:
+    """Return a deterministic content fingerprint of an object such as a model
+    instance: a Merkle tree over its class fingerprint and its attributes,
+    except those named in `exclude` and methods bound to it."""
+    excluded = set(exclude)
+    attributes = []
+    for name, value in sorted(getattr(obj, "__dict__", {}).items()):
+        if name in excluded or (
+            isinstance(value, types.MethodType) and value.__self__ is obj
+        ):
+            continue
+        attributes.append(
+            combine_fingerprints(fingerprint(name), value_fingerprint(value))
+        )
+    return combine_fingerprints(
+        value_fingerprint(type(obj)), combine_fingerprints(*attributes)
+    )
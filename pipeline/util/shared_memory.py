@@ -0,0 +1,177 @@
+import io
+import os
+import pickle
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List
+
+from cloudpickle import CloudPickler
+
+DEFAULT_THRESHOLD = 1024 * 1024  # 1 MiB
+
+
+class BufferPickler(CloudPickler):
+    """CloudPickler that also exposes CPU torch tensors as pickle protocol 5
+    buffers (through numpy), so their memory can be passed out-of-band."""
+
+    def reducer_override(self, obj):
+        torch = sys.modules.get("torch")
+        if (
+            torch is not None
+            and isinstance(obj, torch.Tensor)
+            and obj.device.type == "cpu"
+            and not obj.requires_grad
+        ):
+            try:
+                return torch.from_numpy, (obj.numpy(),)
+            except (TypeError, RuntimeError):
+                # dtypes without a numpy equivalent (e.g. bfloat16)
+                pass
+        return super().reducer_override(obj)
+
+
+def dumps_with_buffers(obj: Any, buffer_callback) -> bytes:
+    file = io.BytesIO()
+    BufferPickler(file, protocol=5, buffer_callback=buffer_callback).dump(obj)
+    return file.getvalue()
+
+
+class _SharedMemory(SharedMemory):
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            # Still exported to loaded objects, which keep the mapping alive
+            # and unmap it once they are garbage collected
+            pass
+
+
+def _untrack(shm: SharedMemory) -> None:
+    # Segment ownership is handed over explicitly between processes, so stop the
+    # resource tracker from unlinking (and warning about) it when we exit
+    if os.name == "posix":
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+
+def _unlink(shm: SharedMemory) -> None:
+    # SharedMemory.unlink() would unregister the segment from the resource
+    # tracker a second time, so remove the name directly. On Windows segments
+    # are freed once their last handle is closed instead.
+    try:
+        from _posixshmem import shm_unlink
+    except ImportError:
+        return
+    try:
+        shm_unlink(shm._name)
+    except FileNotFoundError:
+        # Already unlinked by the other side
+        pass
+
+
+class SharedMemoryTransport:
+    """Serialises objects for another process, placing large buffer-backed
+    values (numpy arrays, CPU torch tensors, bytearrays) in shared memory.
+
+    Only the segment names travel in the pickled payload. Buffers smaller than
+    `threshold`, and objects without buffers, are pickled inline as usual.
+
+    Segments are created by `dumps` and kept mapped by the sender until
+    `cleanup` is called, which must happen after the receiver has run `loads`.
+    The receiver unlinks the segment names on `loads` and maps the memory
+    without copying, so the memory is freed once both sides have unmapped it.
+    Received segments are unmapped by `collect` once no loaded object
+    references them any more.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.stats: Dict[str, int] = dict(
+            bytes_avoided=0, bytes_pickled=0, segments_sent=0, segments_received=0
+        )
+        self._sent: List[SharedMemory] = []
+        self._received: List[SharedMemory] = []
+
+    @property
+    def bytes_avoided(self) -> int:
+        """Bytes passed through shared memory instead of being pickled."""
+        return self.stats["bytes_avoided"]
+
+    def dumps(self, obj: Any) -> bytes:
+        buffers: List[pickle.PickleBuffer] = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            if buffer.raw().nbytes < self.threshold:
+                # Serialise in-band
+                return True
+            buffers.append(buffer)
+            return False
+
+        data = dumps_with_buffers(obj, buffer_callback)
+
+        segments = []
+        for buffer in buffers:
+            raw = buffer.raw()
+            shm = _SharedMemory(create=True, size=max(raw.nbytes, 1))
+            _untrack(shm)
+            shm.buf[: raw.nbytes] = raw
+            self._sent.append(shm)
+            segments.append((shm.name, raw.nbytes))
+            self.stats["bytes_avoided"] += raw.nbytes
+            self.stats["segments_sent"] += 1
+
+        self.stats["bytes_pickled"] += len(data)
+        return pickle.dumps((data, segments), protocol=5)
+
+    def loads(self, payload: bytes) -> Any:
+        data, segments = pickle.loads(payload)
+
+        buffers = []
+        for name, size in segments:
+            shm = _SharedMemory(name=name)
+            _untrack(shm)
+            # The mapping stays valid after unlinking, this only ensures the
+            # segment is freed once every process has unmapped it
+            _unlink(shm)
+            self._received.append(shm)
+            buffers.append(shm.buf[:size])
+            self.stats["segments_received"] += 1
+
+        obj = pickle.loads(data, buffers=buffers)
+        del buffers
+        return obj
+
+    def cleanup(self) -> None:
+        """Release the segments created by `dumps`."""
+        for shm in self._sent:
+            shm.close()
+            _unlink(shm)
+        self._sent = []
+
+    def detach(self) -> None:
+        """Unmap the segments created by `dumps` without removing them, leaving
+        them to be freed by the receiver. Used when the sender can't tell when
+        the receiver has loaded them. Segments are kept mapped until `cleanup`
+        on platforms where they don't outlive their last handle (Windows).
+        """
+        if os.name != "posix":
+            return
+        for shm in self._sent:
+            shm.close()
+        self._sent = []
+
+    def collect(self) -> int:
+        """Unmap received segments no longer referenced by any loaded object,
+        returning the number of segments still in use."""
+        in_use = []
+        for shm in self._received:
+            try:
+                shm.close()
+            except BufferError:
+                in_use.append(shm)
+        self._received = in_use
+        return len(in_use)
+
+    def close(self) -> None:
+        self.cleanup()
+        self.collect()
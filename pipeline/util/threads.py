@@ -0,0 +1,156 @@
+import itertools
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
+# Read by OpenMP/BLAS based libraries (numpy, torch, onnxruntime...) when their
+# thread pools are first created
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+class ThreadBudget:
+    """Process-wide budget of CPU threads shared by concurrent node executions.
+
+    Each running graph claims the number of nodes it may execute at once,
+    optionally with its own number of threads. A claim with its own threads
+    gets a share of them per node, independent of the other claims, while
+    claims without split the budget's threads between them. Native libraries
+    are limited to the sum of the concurrent shares, capped at the CPU count,
+    so they don't each start a thread per core and oversubscribe the CPU.
+    Their previous settings are restored once every claim has been released.
+    """
+
+    def __init__(self, threads: int = None):
+        self.threads = threads or os.cpu_count() or 1
+        # (concurrency, threads or None for the budget's) by claim id
+        self._claims: Dict[int, Tuple[int, Optional[int]]] = {}
+        self._claim_ids = itertools.count()
+        self._applied: Optional[int] = None
+        self._saved: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    @property
+    def intra_op_threads(self) -> int:
+        """Threads native libraries are limited to: the sum of the shares of
+        the current claims, capped at the CPU count."""
+        if not self._claims:
+            return self.threads
+        threads = sum(self._share(claim_id) for claim_id in self._claims)
+        return max(1, min(threads, os.cpu_count() or 1))
+
+    def _share(self, claim_id: int) -> int:
+        """Threads available to a single node execution of a claim."""
+        concurrency, threads = self._claims[claim_id]
+        if threads is None:
+            # Claims without their own threads split the budget's
+            threads = self.threads
+            concurrency = sum(
+                claim_concurrency
+                for claim_concurrency, claim_threads in self._claims.values()
+                if claim_threads is None
+            )
+        return max(1, threads // concurrency)
+
+    @contextmanager
+    def claim(self, concurrency: int = 1, threads: int = None):
+        with self._lock:
+            claim_id = next(self._claim_ids)
+            self._claims[claim_id] = (concurrency, threads)
+            self._apply()
+            share = self._share(claim_id)
+        try:
+            yield share
+        finally:
+            with self._lock:
+                del self._claims[claim_id]
+                self._apply()
+
+    def _apply(self) -> None:
+        if not self._claims:
+            if self._saved is not None:
+                _restore_settings(self._saved)
+                self._saved = None
+                self._applied = None
+            return
+
+        threads = self.intra_op_threads
+        if threads == self._applied:
+            return
+        if self._saved is None:
+            self._saved = _current_settings()
+        limiter = set_intra_op_threads(threads)
+        self._saved.setdefault("threadpoolctl", limiter)
+        self._applied = threads
+
+
+_budget: Optional[ThreadBudget] = None
+
+
+def get_thread_budget(threads: int = None) -> ThreadBudget:
+    """Return the process-wide ThreadBudget, created with `threads` threads
+    (defaulting to the CPU count) on first use. Graphs pass their own number
+    of threads to `ThreadBudget.claim` instead of resizing it."""
+    global _budget
+    if _budget is None:
+        _budget = ThreadBudget(threads)
+    return _budget
+
+
+def intra_op_threads() -> Optional[int]:
+    """Threads a newly created native session should use, or None if no thread
+    budget has been configured. While graphs with their own budgets run
+    concurrently this is the sum of their shares, as set for native
+    libraries."""
+    return _budget.intra_op_threads if _budget is not None else None
+
+
+def _current_settings() -> dict:
+    settings = dict(
+        env={env_var: os.environ.get(env_var) for env_var in THREAD_ENV_VARS}
+    )
+    if "torch" in sys.modules:
+        settings["torch"] = sys.modules["torch"].get_num_threads()
+    return settings
+
+
+def _restore_settings(settings: dict) -> None:
+    for env_var, value in settings["env"].items():
+        if value is None:
+            os.environ.pop(env_var, None)
+        else:
+            os.environ[env_var] = value
+    if "torch" in settings and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(settings["torch"])
+    if settings.get("threadpoolctl") is not None:
+        settings["threadpoolctl"].restore_original_limits()
+
+
+def set_intra_op_threads(threads: int) -> Any:
+    """Limit native libraries to `threads` threads, returning the threadpoolctl
+    limiter when it's installed."""
+    for env_var in THREAD_ENV_VARS:
+        os.environ[env_var] = str(threads)
+
+    # Only configure libraries that have already been imported by the pipeline
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set once, before any inter-op parallel work has started
+            pass
+
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return None
+    return threadpool_limits(limits=threads)
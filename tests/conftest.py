@@ -159,6 +159,12 @@ def top_api_server(
         headers={"Authorization": "Bearer " + token},
     ).respond_with_json(data_get_json)
 
+    httpserver.expect_request(
+        "/v2/data",
+        method="POST",
+        headers={"Authorization": "Bearer " + token},
+    ).respond_with_json(data_get_json)
+
     httpserver.expect_request(
         "/v2/pipeline-files/initiate-multipart-upload",
         method="POST",
@@ -615,6 +621,33 @@ def pipeline_graph() -> Graph:
     return Pipeline.get_pipeline("test")
 
 
+@pytest.fixture()
+def weights_graph():
+    """Builds a graph whose model holds `size` numpy weights set to `value` and
+    a bias of ones, predicting `weights[0] * f_1 + bias[0]`."""
+    import numpy as np
+
+    def build(size: int = 16, value: float = 1.0) -> Graph:
+        @pipeline_model
+        class Model:
+            def __init__(self):
+                self.weights = np.full(size, value, dtype=np.float64)
+                self.bias = np.ones(4)
+
+            @pipeline_function
+            def predict(self, f_1: float) -> float:
+                return float(self.weights[0] * f_1 + self.bias[0])
+
+        with Pipeline("test") as builder:
+            in_1 = Variable(float, is_input=True)
+            builder.add_variable(in_1)
+            builder.output(Model().predict(in_1))
+
+        return Pipeline.get_pipeline("test")
+
+    return build
+
+
 @pytest.fixture()
 def pickled_graph(pipeline_graph: Graph) -> dict:
     return {
@@ -0,0 +1,59 @@
+import io
+
+import numpy as np
+
+from pipeline.util import dump_object, load_object
+from pipeline.util.buffers import dump_buffers, dumps_buffers, load_buffers
+
+
+def _payload():
+    return {
+        "weights": np.arange(100_000, dtype=np.float32),
+        "matrix": np.ones((300, 300)),
+        "small": np.arange(3),
+        "name": "model",
+    }
+
+
+def _assert_payload(loaded):
+    expected = _payload()
+    assert loaded.keys() == expected.keys()
+    for key in ("weights", "matrix", "small"):
+        np.testing.assert_array_equal(loaded[key], expected[key])
+    assert loaded["name"] == "model"
+
+
+def test_out_of_band_dump_object():
+    payload = dump_object(_payload(), out_of_band=True)
+    loaded = load_object(payload)
+    _assert_payload(loaded)
+    # Arrays share the payload's memory
+    assert not loaded["weights"].flags.owndata
+
+    assert len(payload) < len(dump_object(_payload())) + 1024
+
+
+def test_dump_buffers_file(tmp_path):
+    path = tmp_path / "payload.bin"
+    with open(path, "wb") as file:
+        size = dump_buffers(_payload(), file)
+    assert path.stat().st_size == size
+    assert bytes(dumps_buffers(_payload())) == path.read_bytes()
+
+    _assert_payload(load_buffers(path))
+    with open(path, "rb") as file:
+        _assert_payload(load_buffers(file))
+
+    mapped = load_buffers(path, mmap_buffers=True)
+    _assert_payload(mapped)
+    # Copy-on-write mapping, writes don't reach the file
+    mapped["weights"][0] = -1
+    assert load_buffers(path)["weights"][0] == 0
+
+
+def test_file_object_with_offset():
+    file = io.BytesIO()
+    file.write(b"prefix")
+    dump_buffers(_payload(), file)
+    file.seek(len(b"prefix"))
+    _assert_payload(load_buffers(file))
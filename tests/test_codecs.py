@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pytest
+from cloudpickle import dumps
+
+from pipeline import PipelineCloud, configuration
+from pipeline.schemas.file import FileGet
+from pipeline.schemas.pipeline import PipelineGet, PipelineVariableGet
+from pipeline.util import dump_object, load_object, python_object_to_hex
+from pipeline.util.codecs import ARRAY_MAGIC, JSON_MAGIC, decode_object, encode_object
+
+
+@pytest.mark.parametrize(
+    "value",
+    [None, True, 3, 2.5, "text", [1.0, "a", None], {"a": [1, 2], "b": {"c": 1.5}}],
+)
+def test_json_codec(value):
+    payload = encode_object(value)
+    assert payload.startswith(JSON_MAGIC)
+    assert decode_object(payload) == value
+    assert load_object(payload) == value
+    assert load_object(payload.hex()) == value
+
+
+def test_json_codec_size():
+    value = {"label": "cat", "score": 0.5, "tags": ["a", "b"]}
+    assert len(encode_object(value)) < len(dumps(value))
+
+    # Large containers are pickled
+    value = [{"label": "cat", "score": index} for index in range(100)]
+    assert encode_object(value) == dumps(value)
+
+
+@pytest.mark.parametrize(
+    "value", [(1, 2), {1: "a"}, np.float64(1.5), [1, {2}], np.array([1, None])]
+)
+def test_pickle_fallback(value):
+    payload = encode_object(value)
+    assert payload == dumps(value)
+    loaded = decode_object(payload)
+    assert type(loaded) is type(value)
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.arange(12, dtype=np.float32).reshape(3, 4),
+        np.arange(12, dtype=np.int64).reshape(3, 4).T,
+        np.array(7, dtype=np.uint8),
+        np.zeros((0, 3)),
+        np.array(["2020-01-01"], dtype="datetime64[D]"),
+        np.zeros(2, dtype=[("x", np.int32), ("y", np.float64)]),
+    ],
+)
+def test_array_codec(array):
+    payload = encode_object(array)
+    assert payload.startswith(ARRAY_MAGIC)
+    loaded = load_object(payload)
+    assert loaded.dtype == array.dtype
+    assert loaded.shape == array.shape
+    assert np.array_equal(loaded, array)
+    # Decoded arrays share the payload's memory
+    assert not loaded.flags.owndata
+
+
+def test_declared_types():
+    # Declared JSON types still check the value
+    assert encode_object(np.float64(1.0), float) == dumps(np.float64(1.0))
+    assert encode_object([1.0], List[float]).startswith(JSON_MAGIC)
+    assert encode_object({"a": 1}, Dict[str, Any]).startswith(JSON_MAGIC)
+    assert encode_object(None, Optional[str]).startswith(JSON_MAGIC)
+    assert encode_object(np.ones(2), np.ndarray).startswith(ARRAY_MAGIC)
+    # Other declared types are pickled without inspecting the value
+    assert encode_object([1.0], tuple) == dumps([1.0])
+
+
+def test_cloud_data_encoding(monkeypatch):
+    monkeypatch.setattr(configuration, "CODECS", False)
+    api = PipelineCloud(url="http://localhost", token=None)
+
+    # Pickled unless codecs are enabled
+    assert api._data_encoder()([1.0]) == dump_object([1.0])
+    assert api._data_encoder(codecs=True)([1.0]).startswith(JSON_MAGIC)
+    api.codecs = True
+    assert api._data_encoder()([1.0]).startswith(JSON_MAGIC)
+
+    def variable(type_class, is_input=True):
+        return PipelineVariableGet.construct(
+            is_input=is_input,
+            type_file=FileGet.construct(data=python_object_to_hex(type_class)),
+        )
+
+    # The encoding follows the declared types of the pipeline inputs
+    pipeline_get = PipelineGet.construct(
+        variables=[variable(float), variable(str), variable(list, False)]
+    )
+    type_class = api._run_data_type(pipeline_get)
+    assert type_class == List[Union[float, str]]
+    assert api._data_encoder(type_class)([1.0, "a"]).startswith(JSON_MAGIC)
+
+    pipeline_get.variables.append(variable(np.ndarray))
+    type_class = api._run_data_type(pipeline_get)
+    assert api._data_encoder(type_class)([1.0]) == dumps([1.0])
+    assert api._run_data_type("pipeline_id") is None
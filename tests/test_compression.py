@@ -0,0 +1,58 @@
+import pytest
+
+from pipeline import PipelineCloud, configuration
+from pipeline.util import dump_object, load_object
+from pipeline.util.compression import (
+    COMPRESSED_MAGIC,
+    compress,
+    decompress,
+    is_compressed,
+)
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+def test_compress_round_trip(algorithm):
+    data = dump_object(["token"] * 10_000 + list(range(10_000)))
+    compressed = compress(data, algorithm, threshold=0)
+    assert is_compressed(compressed)
+    assert len(compressed) < len(data) / 2
+    assert decompress(compressed) == data
+    assert load_object(compressed) == load_object(data)
+    assert load_object(compressed.hex()) == load_object(data)
+
+
+def test_compress_skips():
+    data = b"a" * 1024
+    assert compress(data, None, threshold=0) is data
+    assert compress(data, "none", threshold=0) is data
+    # Below the threshold
+    assert compress(data, "zlib", threshold=2048) is data
+    # Doesn't get smaller
+    assert compress(bytes(range(16)), "zlib", threshold=0) == bytes(range(16))
+
+    with pytest.raises(Exception, match="Unknown compression 'gzip'"):
+        compress(data, "gzip", threshold=0)
+    with pytest.raises(Exception, match="Not a compressed payload"):
+        decompress(data)
+
+
+def test_cloud_upload_compression(monkeypatch):
+    monkeypatch.setattr(configuration, "COMPRESSION", None)
+    monkeypatch.setattr(configuration, "COMPRESSION_THRESHOLD", 0)
+    api = PipelineCloud(url="http://localhost", token=None)
+    value = list(range(10_000))
+
+    def payload(*args):
+        _, file, _ = api._upload_file(value, *args)
+        return file.getvalue()
+
+    assert not is_compressed(payload())
+    assert payload("lzma").startswith(COMPRESSED_MAGIC)
+
+    monkeypatch.setattr(configuration, "COMPRESSION", "zlib")
+    assert is_compressed(payload())
+    assert not is_compressed(payload("none"))
+    assert load_object(payload()) == value
+
+    api.compression_threshold = 1024 * 1024
+    assert not is_compressed(payload())
@@ -0,0 +1,52 @@
+import shutil
+
+import dill
+import numpy as np
+import pytest
+
+from pipeline import PipelineFile
+from pipeline.objects.external_arrays import ExternalArray, externalised_arrays
+from pipeline.util import dump_object, load_object
+
+
+def test_externalised_arrays(tmp_path, weights_graph):
+    graph = weights_graph(256 * 1024, 2.0)
+    model = graph.models[0].model
+    weights = model.weights
+
+    with externalised_arrays(graph, threshold=1024 * 1024) as files:
+        assert [pipeline_file.name for pipeline_file in files] == ["Model.weights"]
+        assert isinstance(model.weights, ExternalArray)
+        assert isinstance(model.bias, np.ndarray)
+        assert files[0] in graph.variables
+        payload = dump_object(graph)
+        # Stands in for the PipelineFile upload and download
+        downloaded_path = tmp_path / "weights"
+        shutil.copy(files[0].path, downloaded_path)
+
+    assert model.weights is weights
+    assert not any(isinstance(var, PipelineFile) for var in graph.variables)
+    assert len(payload) < weights.nbytes / 4
+
+    loaded_graph = load_object(payload)
+    weights_file = loaded_graph.variables[-1]
+    weights_file.path = str(downloaded_path)
+    assert loaded_graph.run(3.0) == [7.0]
+    np.testing.assert_array_equal(loaded_graph.models[0].model.weights, weights)
+
+
+def test_reattach_downloaded_remote(tmp_path, weights_graph):
+    graph = weights_graph(256 * 1024, 2.0)
+    with externalised_arrays(graph, threshold=1024 * 1024):
+        loaded_graph = load_object(dump_object(graph))
+
+    weights_file = loaded_graph.variables[-1]
+    weights_file.path = None
+    with pytest.raises(Exception, match="download_remotes"):
+        loaded_graph.run(3.0)
+
+    # PipelineCloud.download_remotes writes the downloaded object with dill
+    weights_file.path = str(tmp_path / "weights")
+    with open(weights_file.path, "wb") as file:
+        dill.dump(np.full(4, 3.0), file)
+    assert loaded_graph.run(3.0) == [10.0]
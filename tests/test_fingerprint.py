@@ -0,0 +1,91 @@
+import numpy as np
+
+from pipeline import Pipeline, PipelineFile, Variable, pipeline_function, pipeline_model
+from pipeline.objects import Function
+from pipeline.util.fingerprint import function_fingerprint
+
+OFFSET = 1.0
+
+
+def _offset() -> float:
+    return OFFSET
+
+
+def add_offset(value: float) -> float:
+    return value + _offset()
+
+
+def _closure(factor: float):
+    def scale(value: float) -> float:
+        return value * factor
+
+    return scale
+
+
+def _without_source(body: str):
+    namespace = {}
+    exec("def no_source(value):\n    return %s\n" % body, namespace)
+    return namespace["no_source"]
+
+
+def test_function_fingerprint(monkeypatch):
+    assert function_fingerprint(_closure(2.0)) == function_fingerprint(_closure(2.0))
+    assert function_fingerprint(_closure(2.0)) != function_fingerprint(_closure(3.0))
+
+    # Globals referenced through other functions are covered too
+    before = function_fingerprint(add_offset)
+    monkeypatch.setattr(__name__ + ".OFFSET", 2.0)
+    assert function_fingerprint(add_offset) != before
+
+    # Without source, functions are identified by their bytecode
+    assert Function(_without_source("value + 1")).fingerprint() == (
+        Function(_without_source("value + 1")).fingerprint()
+    )
+    assert Function(_without_source("value + 1")).fingerprint() != (
+        Function(_without_source("value - 1")).fingerprint()
+    )
+    # The uploaded hash is still unique for functions without source
+    assert Function(_without_source("value + 1")).hash != (
+        Function(_without_source("value + 1")).hash
+    )
+
+
+@pipeline_model
+class Scaler:
+    def __init__(self):
+        self.weights = np.ones(16)
+
+    @pipeline_function
+    def predict(self, value: float) -> float:
+        return value * self.weights[0]
+
+
+def _fingerprint_pipeline(name: str, weight: float, file_path):
+    with Pipeline(name) as builder:
+        value = Variable(float, is_input=True)
+        weights_file = PipelineFile(path=str(file_path))
+        builder.add_variables(value, weights_file)
+        scaler = Scaler()
+        scaler.weights *= weight
+        builder.output(scaler.predict(value))
+
+    return Pipeline.get_pipeline(name)
+
+
+def test_graph_fingerprint(tmp_path):
+    file_path = tmp_path / "weights.bin"
+    file_path.write_bytes(bytes(100))
+    graph = _fingerprint_pipeline("fingerprint", 1.0, file_path)
+
+    # Local ids and the name differ between builds, the fingerprint doesn't
+    rebuilt = _fingerprint_pipeline("fingerprint-rebuilt", 1.0, file_path)
+    assert rebuilt.fingerprint() == graph.fingerprint()
+    assert rebuilt.models[0].fingerprint() == graph.models[0].fingerprint()
+
+    reweighted = _fingerprint_pipeline("fingerprint", 2.0, file_path)
+    assert reweighted.models[0].fingerprint() != graph.models[0].fingerprint()
+    assert reweighted.fingerprint() != graph.fingerprint()
+
+    before = graph.fingerprint()
+    file_path.write_bytes(bytes(101))
+    assert graph.fingerprint() != before
@@ -0,0 +1,95 @@
+import tracemalloc
+
+import pytest
+
+from pipeline.objects import Graph
+from pipeline.objects.container import LazyModel
+
+
+def test_save_load_streams(tmp_path, weights_graph):
+    weights_size = 4 * 1024 * 1024  # 32 MiB of float64
+    test_pipeline = weights_graph(weights_size)
+    graph_path = tmp_path / "test.graph"
+
+    tracemalloc.start()
+    size = test_pipeline.save(graph_path)
+    _, save_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert size == graph_path.stat().st_size
+    assert size > weights_size * 8
+    # The weights are written from the model's memory, not copied first
+    assert save_peak < weights_size * 8 / 4
+
+    loaded_pipeline = Graph.load(graph_path)
+    assert loaded_pipeline.run(2.0) == [3.0]
+
+
+def test_container_lazy_models(tmp_path, weights_graph):
+    test_pipeline = weights_graph(1024 * 1024)
+    graph_path = tmp_path / "test.graph"
+    test_pipeline.save(graph_path, file_format="container")
+
+    manifest = Graph.read_manifest(graph_path)
+    assert manifest["version"] == 1
+    assert manifest["name"] == "test"
+    assert [function["name"] for function in manifest["functions"]] == ["predict"]
+    assert manifest["models"][0]["size"] > 1024 * 1024 * 8
+    assert [var["is_input"] for var in manifest["variables"]] == [True, False]
+
+    loaded_pipeline = Graph.load(graph_path)
+    lazy_model = loaded_pipeline.models[0].model
+    assert isinstance(lazy_model, LazyModel)
+    assert not lazy_model.is_loaded
+
+    assert loaded_pipeline.run(2.0) == [3.0]
+    model = loaded_pipeline.models[0].model
+    assert not isinstance(model, LazyModel)
+    assert loaded_pipeline.functions[0].class_instance is model
+    # The weights are backed by the memory-mapped file
+    assert not model.weights.flags.owndata
+
+    # Saving again round-trips
+    loaded_pipeline.save(graph_path, file_format="container")
+    assert Graph.load(graph_path, lazy_models=False).run(1.0) == [2.0]
+
+
+def test_load_pickle_format(tmp_path, weights_graph):
+    test_pipeline = weights_graph()
+    graph_path = tmp_path / "test.graph"
+    # The default format
+    test_pipeline.save(graph_path)
+
+    assert Graph.load(graph_path).run(1.0) == [2.0]
+    with pytest.raises(Exception, match="Not a graph container"):
+        Graph.read_manifest(graph_path)
+
+
+# Attributes added to Graph since the first release, which graphs pickled by it
+# lack
+ADDED_ATTRIBUTES = (
+    "max_workers",
+    "_executor",
+    "pools",
+    "_pool_executors",
+    "_replica_pools",
+    "_actors",
+    "node_timings",
+    "_previous_run",
+    "thread_budget",
+    "result_cache",
+    "validation",
+    "_validators",
+)
+
+
+def test_load_graph_pickled_by_earlier_version(weights_graph):
+    test_pipeline = weights_graph()
+    state = test_pipeline.__getstate__()
+    for name in ADDED_ATTRIBUTES:
+        del state[name]
+
+    loaded_pipeline = Graph.__new__(Graph)
+    loaded_pipeline.__setstate__(state)
+    assert loaded_pipeline.run(2.0) == [3.0]
+    assert loaded_pipeline.run_batch([(1.0,), (2.0,)]) == [[2.0], [3.0]]
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function, pipeline_model
+
+
+@pytest.fixture
+def actor_pipeline():
+    @pipeline_model(actor=True)
+    class ActorModel:
+        def __init__(self):
+            self.loaded_in = None
+
+        @pipeline_function(on_startup=True, run_once=True)
+        def load(self) -> bool:
+            self.loaded_in = os.getpid()
+            return True
+
+        @pipeline_function
+        def predict(self, in_1: str) -> tuple:
+            if in_1 == "crash":
+                os._exit(1)
+            return in_1, os.getpid(), self.loaded_in
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(str, is_input=True)
+        builder.add_variable(in_1)
+
+        model = ActorModel()
+        model.load()
+        builder.output(model.predict(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    yield test_pipeline
+    test_pipeline.shutdown()
+
+
+def test_model_runs_in_actor_process(actor_pipeline):
+    output, pid, loaded_in = actor_pipeline.run("hey")[0]
+    assert output == "hey"
+    assert pid != os.getpid()
+    assert loaded_in == pid
+    # The actor is long-lived
+    assert actor_pipeline.run("hey")[0][1] == pid
+
+
+def test_actor_restarts_after_crash(actor_pipeline):
+    first_pid = actor_pipeline.run("hey")[0][1]
+    with pytest.raises(Exception, match="has been restarted"):
+        actor_pipeline.run("crash")
+
+    output, pid, loaded_in = actor_pipeline.run("hey")[0]
+    assert pid != first_pid
+    # Startup is replayed in the restarted process
+    assert loaded_in == pid
+
+
+def test_actor_passes_arrays_through_shared_memory():
+    np = pytest.importorskip("numpy")
+
+    @pipeline_model(actor=True)
+    class ArrayModel:
+        @pipeline_function
+        def scale(self, array: np.ndarray) -> np.ndarray:
+            return array * 2
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(np.ndarray, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(ArrayModel().scale(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    try:
+        array = np.arange(1024 * 1024, dtype=np.float32)
+        output = test_pipeline.run(array)[0]
+        assert np.array_equal(output, array * 2)
+
+        stats = next(iter(test_pipeline._actors.values())).transport_stats
+        # Both the argument and the result bypassed pickling
+        assert stats["bytes_avoided"] == array.nbytes
+        assert stats["segments_received"] == 1
+    finally:
+        test_pipeline.shutdown()
@@ -0,0 +1,47 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline.objects import Pipeline, Variable, pipeline_function, pipeline_model
+
+
+def test_model_replicas():
+    @pipeline_model(replicas=3)
+    class NotThreadSafe:
+        def __init__(self):
+            self.weights = [1.0, 2.0]
+            self.in_use = threading.Lock()
+
+        @pipeline_function(on_startup=True, run_once=True)
+        def load(self) -> bool:
+            # Startup runs on each replica, creating per-replica state
+            self.in_use = threading.Lock()
+            return True
+
+        @pipeline_function
+        def predict(self, f_1: float) -> float:
+            assert self.in_use.acquire(blocking=False), "replica used concurrently"
+            try:
+                time.sleep(0.02)
+                return f_1 * self.weights[1]
+            finally:
+                self.in_use.release()
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+
+        model = NotThreadSafe()
+        model.load()
+        builder.output(model.predict(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        outputs = list(executor.map(test_pipeline.run, [1.0, 2.0, 3.0, 4.0, 5.0]))
+
+    assert outputs == [[2.0], [4.0], [6.0], [8.0], [10.0]]
+    replicas = test_pipeline._replica_pool(model).instances
+    assert len(replicas) == 3
+    assert len({id(replica.in_use) for replica in replicas}) == 3
+    # Attributes created in __init__ are shared between replicas
+    assert all(replica.weights is model.weights for replica in replicas)
@@ -0,0 +1,55 @@
+import pytest
+
+from pipeline import configuration
+from pipeline.objects import Pipeline, Variable, pipeline_function
+
+
+def _checkpoint_pipeline(calls: list, fail: list):
+    @pipeline_function
+    def heavy(f_1: float) -> float:
+        calls.append("heavy")
+        return f_1 * 2
+
+    @pipeline_function
+    def flaky(f_1: float) -> float:
+        calls.append("flaky")
+        if fail:
+            raise Exception(fail.pop())
+        return f_1 + 1
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(flaky(heavy(in_1)))
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_resume_checkpointed_run():
+    calls = []
+    test_pipeline = _checkpoint_pipeline(calls, ["Pre-empted"])
+    run_directory = configuration.PIPELINE_CACHE / "runs" / "resume-test"
+
+    with pytest.raises(Exception, match="Pre-empted"):
+        test_pipeline.run(1.0, run_id="resume-test")
+    assert calls == ["heavy", "flaky"]
+    assert run_directory.exists()
+
+    # A rebuilt pipeline resumes from the checkpoint
+    calls.clear()
+    test_pipeline = _checkpoint_pipeline(calls, [])
+    assert test_pipeline.run(1.0, run_id="resume-test") == [3.0]
+    assert calls == ["flaky"]
+    assert not run_directory.exists()
+
+
+def test_resume_with_different_inputs():
+    calls = []
+    test_pipeline = _checkpoint_pipeline(calls, ["Pre-empted"])
+
+    with pytest.raises(Exception, match="Pre-empted"):
+        test_pipeline.run(1.0, run_id="inputs-test")
+    with pytest.raises(Exception, match="different inputs"):
+        test_pipeline.run(2.0, run_id="inputs-test")
+
+    assert test_pipeline.run(1.0, run_id="inputs-test") == [3.0]
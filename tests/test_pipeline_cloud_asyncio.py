@@ -1,7 +1,11 @@
+import asyncio
+import io
+
 import pytest
 
 from pipeline.api.asyncio import PipelineCloud
 from pipeline.exceptions.MissingActiveToken import MissingActiveToken
+from pipeline.util.codecs import encode_object
 
 
 def test_cloud_init(url, top_api_server, token):
@@ -12,3 +16,25 @@ def test_cloud_init(url, top_api_server, token):
 def test_cloud_init_failure(url, top_api_server_bad_token, bad_token):
     with pytest.raises(MissingActiveToken):
         PipelineCloud(url=url, token=bad_token)
+
+
+def test_cloud_upload_file_binary(url, top_api_server, token, tmp_path):
+    api = PipelineCloud(url=url, token=token)
+    path = tmp_path / "file.bin"
+    path.write_bytes(bytes(range(256)) * 1024)
+
+    asyncio.run(api.upload_file(str(path)))
+    request, _ = top_api_server.log[-1]
+    body = request.get_data()
+    # The file is sent as is, not hex-encoded
+    assert bytes(range(256)) * 1024 in body
+    assert b'{"file_format": "binary"}' in body
+
+
+def test_cloud_upload_data(url, top_api_server, token, data_get_json):
+    api = PipelineCloud(url=url, token=token)
+
+    data_get = asyncio.run(api.upload_data(io.BytesIO(encode_object([1.0, "a"]))))
+    assert data_get.id == data_get_json["id"]
+    request, _ = top_api_server.log[-1]
+    assert encode_object([1.0, "a"]) in request.get_data()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function
+
+
+def _columns_pipeline(calls: list):
+    @pipeline_function(vectorize=True)
+    def affine(x: float, scale: float) -> float:
+        calls.append(type(x))
+        return x * scale + 1
+
+    with Pipeline("test") as builder:
+        x = Variable(float, is_input=True, name="x")
+        scale = Variable(float, is_input=True, name="scale")
+        builder.add_variables(x, scale)
+        builder.output(affine(x, scale))
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_run_columns_from_arrays():
+    calls = []
+    test_pipeline = _columns_pipeline(calls)
+
+    outputs = test_pipeline.run_columns(
+        {"x": np.arange(5, dtype=np.float64), "scale": np.full(5, 2.0)},
+        chunk_size=2,
+    )
+    assert outputs == {"output_0": [1.0, 3.0, 5.0, 7.0, 9.0]}
+    # Two vectorized chunks and a single row chunk
+    assert calls == [np.ndarray, np.ndarray, float]
+
+
+def test_run_columns_from_csv(tmp_path):
+    calls = []
+    test_pipeline = _columns_pipeline(calls)
+    csv_path = tmp_path / "inputs.csv"
+    csv_path.write_text("x,scale,unused\n1,2,a\n2,3,b\n")
+
+    assert test_pipeline.run_columns(csv_path) == {"output_0": [3.0, 7.0]}
+
+
+def test_run_columns_from_parquet(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    calls = []
+    test_pipeline = _columns_pipeline(calls)
+    parquet_path = tmp_path / "inputs.parquet"
+    pq.write_table(pa.table({"x": [1.0, 2.0], "scale": [2.0, 3.0]}), parquet_path)
+
+    assert test_pipeline.run_columns(parquet_path) == {"output_0": [3.0, 7.0]}
+
+
+def test_run_columns_missing_column():
+    test_pipeline = _columns_pipeline([])
+    with pytest.raises(Exception, match="Missing input columns: scale"):
+        test_pipeline.run_columns({"x": [1.0]})
@@ -0,0 +1,51 @@
+from pipeline.objects import Pipeline, Variable, pipeline_function
+
+
+def _incremental_pipeline(calls: list):
+    @pipeline_function
+    def preprocess(data: list) -> list:
+        calls.append("preprocess")
+        return [value * 2 for value in data]
+
+    @pipeline_function
+    def scale(data: list, factor: float) -> float:
+        calls.append("scale")
+        return sum(data) * factor
+
+    with Pipeline("test") as builder:
+        data = Variable(list, is_input=True)
+        factor = Variable(float, is_input=True)
+        builder.add_variables(data, factor)
+        builder.output(scale(preprocess(data), factor))
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_incremental_run():
+    calls = []
+    test_pipeline = _incremental_pipeline(calls)
+
+    assert test_pipeline.run([1, 2], 1.0, incremental=True) == [6.0]
+    assert calls == ["preprocess", "scale"]
+
+    calls.clear()
+    assert test_pipeline.run([1, 2], 2.0, incremental=True) == [12.0]
+    assert calls == ["scale"]
+
+    calls.clear()
+    assert test_pipeline.run([1, 2], 2.0, incremental=True) == [12.0]
+    assert calls == []
+
+    calls.clear()
+    assert test_pipeline.run([1, 3], 2.0, incremental=True) == [16.0]
+    assert calls == ["preprocess", "scale"]
+
+
+def test_non_incremental_run_recomputes():
+    calls = []
+    test_pipeline = _incremental_pipeline(calls)
+
+    test_pipeline.run([1, 2], 1.0, incremental=True)
+    calls.clear()
+    assert test_pipeline.run([1, 2], 1.0) == [6.0]
+    assert calls == ["preprocess", "scale"]
@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Tuple
+
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function, pipeline_model
+
+
+def test_map_function():
+    @pipeline_function
+    def square(f_1: float) -> float:
+        return f_1**2
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(list, is_input=True)
+        builder.add_variable(in_1)
+
+        squares = builder.map(square, in_1)
+
+        builder.output(squares)
+
+    output = Pipeline.get_pipeline("test").run([1.0, 2.0, 3.0])
+    assert output == [[1.0, 4.0, 9.0]]
+    assert squares.type_class == list
+
+
+def test_map_is_concurrent_and_ordered():
+    barrier = threading.Barrier(3, timeout=5)
+
+    @pipeline_function
+    def wait(f_1: float) -> float:
+        # Only passes if all three elements are running at the same time
+        barrier.wait()
+        time.sleep(0.01 * f_1)
+        return f_1
+
+    with Pipeline("test", max_workers=3) as builder:
+        in_1 = Variable(list, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(builder.map(wait, in_1))
+
+    output = Pipeline.get_pipeline("test").run([3.0, 2.0, 1.0])
+    assert output == [[3.0, 2.0, 1.0]]
+
+
+def test_map_batched_model_method():
+    @pipeline_model
+    class BatchModel:
+        def __init__(self):
+            self.calls = []
+
+        @pipeline_function(batched=True)
+        def predict(self, batch: list, offset: float) -> list:
+            self.calls.append(len(batch))
+            return [item + offset for item in batch]
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(list, is_input=True)
+        in_2 = Variable(float, is_input=True)
+        builder.add_variables(in_1, in_2)
+
+        model = BatchModel()
+        output = builder.map(model.predict, in_1, in_2, batch_size=2)
+        builder.output(output)
+
+    output = Pipeline.get_pipeline("test").run([1.0, 2.0, 3.0], 1.0)
+    assert output == [[2.0, 3.0, 4.0]]
+    assert sorted(model.calls) == [1, 2]
+
+
+def test_map_subgraph():
+    @pipeline_function
+    def double(f_1: float) -> float:
+        return f_1 * 2
+
+    with Pipeline("sub") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(double(in_1))
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(list, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(builder.map(Pipeline.get_pipeline("sub"), in_1))
+
+    assert Pipeline.get_pipeline("test").run([1.0, 2.0]) == [[2.0, 4.0]]
+
+
+def test_map_tuple_output():
+    @pipeline_function
+    def split(f_1: float) -> Tuple[float, float]:
+        return f_1, f_1
+
+    with pytest.raises(Exception, match="Tuple outputs"):
+        with Pipeline("test") as builder:
+            in_1 = Variable(list, is_input=True)
+            builder.add_variable(in_1)
+            builder.map(split, in_1)
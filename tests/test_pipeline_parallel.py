@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function, pipeline_model
+from pipeline.objects.parallel import PipelineParallel, partition_graph
+
+
+@pipeline_function
+def add_one(f_1: float) -> float:
+    return f_1 + 1
+
+
+@pipeline_function
+def stage_pid(f_1: float) -> int:
+    return os.getpid()
+
+
+@pytest.fixture
+def parallel_graph():
+    @pipeline_model
+    class Scaler:
+        def __init__(self):
+            self.factor = None
+
+        @pipeline_function(on_startup=True)
+        def load(self) -> bool:
+            self.factor = 10.0
+            return True
+
+        @pipeline_function
+        def scale(self, f_1: float) -> float:
+            return f_1 * self.factor
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+
+        first = add_one(in_1)
+        first_pid = stage_pid(first)
+        scaler = Scaler()
+        scaler.load()
+        second = scaler.scale(first)
+        second_pid = stage_pid(second)
+
+        builder.output(second, first_pid, second_pid)
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_partition_keeps_model_nodes_together(parallel_graph):
+    stages = partition_graph(parallel_graph, 2)
+    assert [len(nodes) for nodes in stages] == [2, 3]
+
+    stages = partition_graph(parallel_graph, 5)
+    # The model's load and scale calls (and nodes between them) share a stage
+    assert [len(nodes) for nodes in stages] == [1, 1, 2, 1]
+
+
+def test_partition_by_annotation():
+    @pipeline_function(stage=1)
+    def second_stage(f_1: float) -> float:
+        return f_1
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(add_one(second_stage(add_one(add_one(in_1)))))
+
+    stages = partition_graph(Pipeline.get_pipeline("test"))
+    assert [len(nodes) for nodes in stages] == [2, 2]
+
+
+@pytest.mark.parametrize("transport", ["pipe", "tcp"])
+def test_pipeline_parallel(parallel_graph, transport):
+    with PipelineParallel(parallel_graph, 2, transport=transport) as parallel:
+        outputs = list(parallel.run_many([(float(i),) for i in range(5)]))
+        assert parallel.run(1.0)[0] == 20.0
+
+    assert [output[0] for output in outputs] == [10.0, 20.0, 30.0, 40.0, 50.0]
+    first_pid, second_pid = outputs[0][1:]
+    assert len({first_pid, second_pid, os.getpid()}) == 3
+
+
+def test_pipeline_parallel_error(parallel_graph):
+    with PipelineParallel(parallel_graph, 2) as parallel:
+        with pytest.raises(Exception, match="Input type mismatch"):
+            parallel.run("not a float")
+        assert parallel.run(0.0)[0] == 10.0
+
+
+def test_pipeline_parallel_run_after_closed_iterator(parallel_graph):
+    with PipelineParallel(parallel_graph, 2, max_in_flight=2) as parallel:
+        runs = parallel.run_many([(float(i),) for i in range(10)])
+        assert next(runs)[0] == 10.0
+        runs.close()
+        # Results of the abandoned runs don't reach later runs
+        assert parallel.run(4.0)[0] == 50.0
+        assert parallel.run(5.0)[0] == 60.0
+
+
+def test_pipeline_parallel_stage_exit(parallel_graph):
+    with PipelineParallel(parallel_graph, 2, max_in_flight=2) as parallel:
+        runs = parallel.run_many([(float(i),) for i in range(100)])
+        assert next(runs)[0] == 10.0
+
+        parallel._processes[0].kill()
+        parallel._processes[0].join()
+        with pytest.raises(Exception, match="stage"):
+            for _ in runs:
+                pass
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from pipeline.objects import Pipeline, Variable, pipeline_function, pipeline_model
+
+
+def test_nodes_run_on_resource_pools():
+    threads = {}
+    gpu_started = threading.Event()
+
+    @pipeline_function(resources="gpu")
+    def heavy(f_1: float) -> float:
+        threads["heavy"] = threading.current_thread().name
+        gpu_started.set()
+        time.sleep(0.1)
+        return f_1 * 10
+
+    @pipeline_function
+    def glue(f_1: float) -> float:
+        # Independent CPU work runs while the GPU node is busy
+        assert gpu_started.wait(timeout=5)
+        threads["glue"] = threading.current_thread().name
+        return f_1 + 1
+
+    @pipeline_function
+    def add(f_1: float, f_2: float) -> float:
+        return f_1 + f_2
+
+    with Pipeline("test", pools={"cpu": 2, "gpu": 1}) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(add(heavy(in_1), glue(in_1)))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    assert test_pipeline.run(1.0) == [12.0]
+    assert threads["heavy"].startswith("pipeline-gpu")
+    assert threads["glue"].startswith("pipeline-cpu")
+
+
+def test_scheduled_model_calls_keep_order():
+    @pipeline_model
+    class Counter:
+        def __init__(self):
+            self.count = 0
+
+        @pipeline_function
+        def increment(self) -> int:
+            time.sleep(0.01)
+            self.count += 1
+            return self.count
+
+        @pipeline_function
+        def get_count(self) -> int:
+            return self.count
+
+    with Pipeline("test", pools={"cpu": 4}) as builder:
+        counter = Counter()
+        counter.increment()
+        counter.increment()
+        builder.output(counter.get_count())
+
+    assert Pipeline.get_pipeline("test").run() == [2]
+
+
+def test_required_compute_type():
+    @pipeline_function(resources="cpu")
+    def tokenize(in_1: str) -> str:
+        return in_1
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(str, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(tokenize(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    assert test_pipeline.compute_type == "gpu"
+    assert test_pipeline.required_compute_type() == "cpu"
+
+    @pipeline_function
+    def classify(in_1: str) -> str:
+        return in_1
+
+    # Unannotated nodes still need the graph compute_type
+    with Pipeline("test") as builder:
+        in_1 = Variable(str, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(classify(tokenize(in_1)))
+
+    assert Pipeline.get_pipeline("test").required_compute_type() == "gpu"
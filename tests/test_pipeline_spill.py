@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from pipeline import configuration
+from pipeline.objects import Pipeline, Variable, pipeline_function
+
+
+def _spill_pipeline(seen: dict):
+    @pipeline_function
+    def expand(size: int) -> np.ndarray:
+        return np.ones(size, dtype=np.float64)
+
+    @pipeline_function
+    def double(array: np.ndarray) -> np.ndarray:
+        seen["double"] = type(array)
+        return array * 2
+
+    @pipeline_function
+    def total(array: np.ndarray) -> float:
+        seen["total"] = type(array)
+        seen["spill_files"] = list(
+            (configuration.PIPELINE_CACHE / "spill").rglob("*.npy")
+        )
+        return float(array.sum())
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(int, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(total(double(expand(in_1))))
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_spill_large_intermediates():
+    seen = {}
+    test_pipeline = _spill_pipeline(seen)
+
+    assert test_pipeline.run(1000, memory_budget=1024, spill_threshold=1024) == [2000.0]
+    assert seen["double"] is np.memmap
+    assert seen["total"] is np.memmap
+    # The first spilled array is removed once double has used it
+    assert len(seen["spill_files"]) == 1
+    assert not list((configuration.PIPELINE_CACHE / "spill").rglob("*.npy"))
+
+
+def test_no_spill_within_budget():
+    seen = {}
+    test_pipeline = _spill_pipeline(seen)
+
+    assert test_pipeline.run(10, memory_budget=1024, spill_threshold=1024) == [20.0]
+    assert seen["double"] is np.ndarray
+    assert seen["total"] is np.ndarray
+
+    assert test_pipeline.run(1000) == [2000.0]
+    assert seen["total"] is np.ndarray
+
+
+def test_spilled_outputs_are_loaded_into_memory():
+    @pipeline_function
+    def expand(size: int) -> np.ndarray:
+        return np.ones(size, dtype=np.float64)
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(int, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(expand(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    (output,) = test_pipeline.run(1000, memory_budget=1024, spill_threshold=1024)
+    assert type(output) is np.ndarray
+    assert output.sum() == 1000.0
+    assert not list((configuration.PIPELINE_CACHE / "spill").rglob("*.npy"))
+
+
+def test_resumed_run_releases_finished_inputs():
+    seen = {}
+    test_pipeline = _spill_pipeline(seen)
+    total_function = test_pipeline.nodes[-1].function.function
+
+    def flaky_total(array: np.ndarray) -> float:
+        if "failed" not in seen:
+            seen["failed"] = True
+            raise Exception("Pre-empted")
+        return total_function(array)
+
+    test_pipeline.nodes[-1].function.function = flaky_total
+    with pytest.raises(Exception, match="Pre-empted"):
+        test_pipeline.run(
+            1000, memory_budget=1024, spill_threshold=1024, run_id="spill-test"
+        )
+
+    assert test_pipeline.run(
+        1000, memory_budget=1024, spill_threshold=1024, run_id="spill-test"
+    ) == [2000.0]
+    # expand's output is not kept for the already finished double node
+    assert len(seen["spill_files"]) == 1
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from pipeline.exceptions.NodeTimeout import NodeTimeout
+from pipeline.objects import Pipeline, ResultCache, Variable, pipeline_function
+
+
+def test_function_timeout():
+    @pipeline_function(timeout=0.05)
+    def slow(f_1: float) -> float:
+        time.sleep(f_1)
+        return f_1
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(slow(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    assert test_pipeline.run(0.0) == [0.0]
+    with pytest.raises(NodeTimeout, match="slow"):
+        test_pipeline.run(0.5)
+
+
+def test_run_deadline_stops_scheduling():
+    calls = []
+
+    @pipeline_function
+    def slow(f_1: float) -> float:
+        calls.append("slow")
+        time.sleep(0.1)
+        return f_1
+
+    @pipeline_function
+    def after(f_1: float) -> float:
+        calls.append("after")
+        return f_1
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(after(slow(in_1)))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    with pytest.raises(NodeTimeout):
+        test_pipeline.run(1.0, deadline=0.02)
+    assert "after" not in calls
+    assert test_pipeline.run(1.0, deadline=5) == [1.0]
+
+
+def test_deadline_cancels_pending_map_elements():
+    calls = []
+
+    @pipeline_function
+    def slow(f_1: float) -> float:
+        calls.append(f_1)
+        time.sleep(0.1)
+        return f_1
+
+    with Pipeline("test", max_workers=1) as builder:
+        in_1 = Variable(list, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(builder.map(slow, in_1))
+
+    with pytest.raises(NodeTimeout):
+        Pipeline.get_pipeline("test").run([1.0, 2.0, 3.0, 4.0], deadline=0.05)
+    time.sleep(0.15)
+    assert len(calls) < 4
+
+
+@pytest.mark.parametrize("timeout", [None, 5.0])
+def test_node_timeout_error_propagates(timeout):
+    @pipeline_function(timeout=timeout)
+    def request(f_1: float) -> float:
+        raise TimeoutError("socket timed out")
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(request(in_1))
+
+    with pytest.raises(TimeoutError, match="socket timed out") as error:
+        Pipeline.get_pipeline("test").run(1.0)
+    assert not isinstance(error.value, NodeTimeout)
+
+
+def test_cached_node_timeout_error_propagates():
+    @pipeline_function
+    def request(f_1: float) -> float:
+        raise TimeoutError("socket timed out")
+
+    with Pipeline("test", result_cache=ResultCache()) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(request(in_1))
+
+    with pytest.raises(TimeoutError, match="socket timed out") as error:
+        Pipeline.get_pipeline("test").run(1.0)
+    assert not isinstance(error.value, NodeTimeout)
+
+
+def test_cached_run_deadline_while_coalesced():
+    started = threading.Event()
+
+    @pipeline_function
+    def slow(f_1: float) -> float:
+        started.set()
+        time.sleep(0.2)
+        return f_1
+
+    with Pipeline("test", result_cache=ResultCache()) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(slow(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    thread = threading.Thread(target=test_pipeline.run, args=(1.0,))
+    thread.start()
+    started.wait()
+    with pytest.raises(NodeTimeout, match="identical run"):
+        test_pipeline.run(1.0, deadline=0.05)
+    thread.join()
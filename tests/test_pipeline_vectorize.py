@@ -0,0 +1,72 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function
+
+
+def test_vectorized_run_batch():
+    calls = []
+
+    @pipeline_function(vectorize=True)
+    def scale(values: list, factor: float) -> list:
+        calls.append(np.shape(values))
+        return np.asarray(values) * np.asarray(factor)[..., None]
+
+    @pipeline_function(vectorize=True)
+    def threshold(values: list) -> bool:
+        return np.asarray(values).sum(axis=-1) > 5
+
+    with Pipeline("test") as builder:
+        values = Variable(List[float], is_input=True)
+        factor = Variable(float, is_input=True)
+        builder.add_variables(values, factor)
+        scaled = scale(values, factor)
+        builder.output(scaled, threshold(scaled))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    outputs = test_pipeline.run_batch([([1.0, 2.0], 1.0), ([1.0, 2.0], 2.0)])
+    assert outputs == [[[1.0, 2.0], False], [[2.0, 4.0], True]]
+    assert type(outputs[0][0]) is list
+    assert type(outputs[0][1]) is bool
+    assert calls == [(2, 2)]
+
+    # Single runs call the function with unstacked inputs, and return the same
+    # types as batches
+    assert test_pipeline.run([1.0, 2.0], 3.0) == [[3.0, 6.0], True]
+    scaled, over_threshold = test_pipeline.run([1.0, 2.0], 3.0)
+    assert type(scaled) is list
+    assert type(over_threshold) is bool
+
+
+def test_vectorized_timeout_error_propagates():
+    @pipeline_function(vectorize=True)
+    def request(values: list) -> float:
+        raise TimeoutError("socket timed out")
+
+    with Pipeline("test") as builder:
+        values = Variable(list, is_input=True)
+        builder.add_variable(values)
+        builder.output(request(values))
+
+    with pytest.raises(TimeoutError, match="socket timed out"):
+        Pipeline.get_pipeline("test").run_batch([([1.0],), ([2.0],)])
+
+
+def test_vectorized_falls_back_for_ragged_inputs():
+    calls = []
+
+    @pipeline_function(vectorize=True)
+    def total(values: list) -> float:
+        calls.append(len(values))
+        return np.asarray(values).sum(axis=-1)
+
+    with Pipeline("test") as builder:
+        values = Variable(list, is_input=True)
+        builder.add_variable(values)
+        builder.output(total(values))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    assert test_pipeline.run_batch([([1.0],), ([1.0, 2.0],)]) == [[1.0], [3.0]]
+    assert calls == [1, 2]
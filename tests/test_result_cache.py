@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from pipeline.objects import Pipeline, ResultCache, Variable, pipeline_function
+
+
+def _cached_pipeline(calls: list, result_cache: ResultCache):
+    @pipeline_function
+    def slow_square(f_1: float) -> float:
+        calls.append(f_1)
+        time.sleep(0.1)
+        return f_1 * f_1
+
+    with Pipeline("test", result_cache=result_cache) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(slow_square(in_1))
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_result_cache_hits():
+    calls = []
+    test_pipeline = _cached_pipeline(calls, ResultCache(max_entries=1))
+
+    assert test_pipeline.run(2.0) == [4.0]
+    assert test_pipeline.run(2.0) == [4.0]
+    assert calls == [2.0]
+
+    test_pipeline.run(3.0)
+    # 2.0 has been evicted
+    test_pipeline.run(2.0)
+    assert calls == [2.0, 3.0, 2.0]
+    assert test_pipeline.result_cache.stats["hits"] == 1
+    assert test_pipeline.result_cache.stats["misses"] == 3
+
+
+def test_result_cache_ttl():
+    calls = []
+    test_pipeline = _cached_pipeline(calls, ResultCache(ttl=0.05))
+
+    test_pipeline.run(2.0)
+    time.sleep(0.1)
+    test_pipeline.run(2.0)
+    assert calls == [2.0, 2.0]
+
+
+def test_result_cache_coalesces_concurrent_runs():
+    calls = []
+    test_pipeline = _cached_pipeline(calls, ResultCache())
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(test_pipeline.run(5.0)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[25.0]] * 4
+    assert calls == [5.0]
+    stats = test_pipeline.result_cache.stats
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 3
+    assert stats["hit_rate"] == 0.75
+
+
+def test_result_cache_does_not_cache_errors():
+    cache = ResultCache()
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("key", fail)
+    assert cache.get_or_compute("key", lambda: 1) == 1
+    assert len(cache) == 1
+
+
+def test_result_cache_shared_between_graphs():
+    cache = ResultCache()
+
+    @pipeline_function
+    def double(f_1: float) -> float:
+        return f_1 * 2
+
+    with Pipeline("test", result_cache=cache) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(double(in_1))
+
+    double_pipeline = Pipeline.get_pipeline("test")
+    square_pipeline = _cached_pipeline([], cache)
+    assert square_pipeline.run(3.0) == [9.0]
+    assert double_pipeline.run(3.0) == [6.0]
+
+
+def test_result_cache_outputs_are_copies():
+    @pipeline_function
+    def make_list(f_1: float) -> list:
+        return [f_1]
+
+    with Pipeline("test", result_cache=ResultCache()) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(make_list(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    test_pipeline.run(1.0)[0].append(2.0)
+    assert test_pipeline.run(1.0) == [[1.0]]
+
+
+def test_result_cache_skips_unfingerprintable_inputs():
+    @pipeline_function
+    def locked(lock: Any) -> bool:
+        with lock:
+            return True
+
+    with Pipeline("test", result_cache=ResultCache()) as builder:
+        in_1 = Variable(Any, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(locked(in_1))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    assert test_pipeline.run(threading.Lock()) == [True]
+    assert test_pipeline.run(threading.Lock()) == [True]
+    assert test_pipeline.result_cache.stats["misses"] == 2
+    assert len(test_pipeline.result_cache) == 0
@@ -0,0 +1,38 @@
+import gc
+
+import pytest
+
+from pipeline.util.shared_memory import SharedMemoryTransport
+
+np = pytest.importorskip("numpy")
+
+
+def test_shared_memory_round_trip():
+    sender = SharedMemoryTransport(threshold=1024)
+    receiver = SharedMemoryTransport(threshold=1024)
+
+    data = dict(big=np.arange(10_000, dtype=np.float64), small=np.arange(4), text="a")
+    payload = receiver.loads(sender.dumps(data))
+    sender.cleanup()
+
+    assert np.array_equal(payload["big"], data["big"])
+    assert np.array_equal(payload["small"], data["small"])
+    assert payload["text"] == "a"
+    assert sender.bytes_avoided == data["big"].nbytes
+    assert sender.stats["segments_sent"] == 1
+
+    # The received array still uses the segment
+    assert receiver.collect() == 1
+    del payload
+    gc.collect()
+    assert receiver.collect() == 0
+
+
+def test_small_objects_are_pickled():
+    sender = SharedMemoryTransport()
+    assert SharedMemoryTransport().loads(sender.dumps([1, "two", 3.0])) == [
+        1,
+        "two",
+        3.0,
+    ]
+    assert sender.bytes_avoided == 0
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+
+from pipeline import Pipeline, PipelineFile, Variable, pipeline_function, pipeline_model
+from pipeline.console import main as cli_main
+
+LOOKUP_TABLE = np.arange(64 * 1024, dtype=np.float64)
+
+
+@pipeline_function
+def scale(value: float) -> float:
+    return value * LOOKUP_TABLE[1]
+
+
+@pipeline_function
+def shift(value: float) -> float:
+    return value + LOOKUP_TABLE[2]
+
+
+@pipeline_model
+class Model:
+    def __init__(self):
+        self.weights = np.ones(32 * 1024)
+
+    @pipeline_function
+    def predict(self, value: float) -> float:
+        return value * self.weights[0]
+
+    @pipeline_function
+    def explain(self, value: float) -> float:
+        return value
+
+
+def _size_pipeline(tmp_path):
+    weights_path = tmp_path / "weights.bin"
+    weights_path.write_bytes(bytes(1000))
+
+    with Pipeline("size-report") as builder:
+        value = Variable(float, is_input=True)
+        builder.add_variable(value)
+        weights_file = PipelineFile(path=str(weights_path), name="weights")
+        builder.add_variable(weights_file)
+        model = Model()
+        scaled = scale(value)
+        builder.output(model.predict(shift(scaled)), model.explain(value))
+
+    return Pipeline.get_pipeline("size-report")
+
+
+def test_size_report(tmp_path):
+    report = _size_pipeline(tmp_path).size_report()
+    functions = {function["name"]: function for function in report["functions"]}
+    assert set(functions) == {"scale", "shift", "predict", "explain"}
+
+    # The captured global dominates the pickles of the plain functions
+    assert functions["scale"]["size"] > LOOKUP_TABLE.nbytes
+    assert functions["scale"]["captured"][0]["name"] == "LOOKUP_TABLE"
+    assert functions["scale"]["captured"][0]["size"] > LOOKUP_TABLE.nbytes
+    # Model methods pickle the whole model
+    assert functions["explain"]["size"] > 32 * 1024 * 8
+
+    assert report["models"][0]["size"] > 32 * 1024 * 8
+    assert report["files"][0]["size"] == 1000
+    assert report["total"] >= sum(
+        part["size"] for part in report["functions"] + report["models"]
+    )
+
+    duplicates = {duplicate["object"]: duplicate for duplicate in report["duplicates"]}
+    assert duplicates["ndarray float64 (65536,)"]["parts"] == [
+        "function scale",
+        "function shift",
+    ]
+    assert duplicates["model Model"]["parts"] == [
+        "function explain",
+        "function predict",
+        "model Model",
+    ]
+
+
+def test_inspect_command(tmp_path, capsys):
+    graph_path = tmp_path / "graph"
+    _size_pipeline(tmp_path).save(graph_path)
+
+    assert cli_main(["inspect", str(graph_path)]) == 0
+    output = capsys.readouterr().out
+    assert "Graph 'size-report'" in output
+    assert "LOOKUP_TABLE" in output
+    assert "Objects pickled more than once" in output
+
+    assert cli_main(["inspect", str(graph_path), "--json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["name"] == "size-report"
@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function
+from pipeline.util import threads
+from pipeline.util.threads import ThreadBudget
+
+
+@pytest.fixture(autouse=True)
+def reset_budget(monkeypatch):
+    for env_var in threads.THREAD_ENV_VARS:
+        monkeypatch.setenv(env_var, "")
+    monkeypatch.setattr(threads, "_budget", None)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+
+
+def test_budget_is_split_between_claims():
+    budget = ThreadBudget(8)
+    with budget.claim(2) as first_share:
+        assert first_share == 4
+        with budget.claim(2) as second_share:
+            # Claims without their own threads split the budget's
+            assert second_share == 2
+            assert budget.intra_op_threads == 4
+            assert os.environ["OMP_NUM_THREADS"] == "4"
+        # Released shares are given back
+        assert budget.intra_op_threads == 4
+        assert os.environ["OMP_NUM_THREADS"] == "4"
+    assert budget.intra_op_threads == 8
+    # The settings from before the first claim are restored
+    assert os.environ["OMP_NUM_THREADS"] == ""
+
+
+def test_claims_with_own_threads():
+    budget = ThreadBudget(8)
+    with budget.claim(1, threads=2) as share:
+        assert share == 2
+        assert budget.threads == 8
+        with budget.claim(2) as share:
+            # Not limited by the other claim's threads
+            assert share == 4
+            assert budget.intra_op_threads == 6
+        assert budget.intra_op_threads == 2
+
+
+def test_claims_with_different_budgets():
+    budget = ThreadBudget()
+    with budget.claim(1, threads=16) as large_share:
+        assert large_share == 16
+        # Capped at the CPU count
+        assert os.environ["OMP_NUM_THREADS"] == "8"
+        with budget.claim(1, threads=2) as small_share:
+            assert small_share == 2
+            assert os.environ["OMP_NUM_THREADS"] == "8"
+        with budget.claim(4, threads=4) as small_share:
+            assert small_share == 1
+    assert os.environ["OMP_NUM_THREADS"] == ""
+
+
+def test_graphs_with_different_budgets():
+    seen = {}
+
+    @pipeline_function
+    def read_small(f_1: float) -> float:
+        seen["small"] = threads.intra_op_threads()
+        return f_1
+
+    @pipeline_function
+    def run_large(f_1: float) -> float:
+        seen["large"] = threads.intra_op_threads()
+        Pipeline.get_pipeline("small").run(f_1)
+        seen["large_after"] = threads.intra_op_threads()
+        return f_1
+
+    with Pipeline("small", thread_budget=2) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(read_small(in_1))
+
+    with Pipeline("large", thread_budget=6) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(run_large(in_1))
+
+    Pipeline.get_pipeline("large").run(1.0)
+    # The small graph adds its share instead of cutting the large one's
+    assert seen == dict(large=6, small=8, large_after=6)
+    assert os.environ["OMP_NUM_THREADS"] == ""
+
+
+def test_graph_thread_budget():
+    seen = []
+
+    @pipeline_function
+    def read_threads(f_1: float) -> float:
+        seen.append((threads.intra_op_threads(), os.environ["OMP_NUM_THREADS"]))
+        return f_1
+
+    with Pipeline("test", thread_budget=4, pools={"cpu": 2}) as builder:
+        in_1 = Variable(float, is_input=True)
+        builder.add_variable(in_1)
+        builder.output(read_threads(in_1))
+
+    Pipeline.get_pipeline("test").run(1.0)
+    assert seen == [(2, "2")]
+    assert os.environ["OMP_NUM_THREADS"] == ""
+    # The graph's threads don't resize the process-wide budget
+    assert threads.get_thread_budget().threads == (os.cpu_count() or 1)
@@ -8,3 +8,18 @@ def test_package_version():
     # We don't care about the particular version, but
     # it should match a particular form.
     assert re.match(r"[0-9]{1,}\.[0-9]{1,}\.[0-9]{1,}", version)
+
+
+def test_fingerprint():
+    import numpy as np
+
+    from pipeline.util.fingerprint import fingerprint
+
+    assert fingerprint({"a": [1, 2.0], "b": "c"}) == fingerprint(
+        {"b": "c", "a": [1, 2.0]}
+    )
+    assert fingerprint(1) != fingerprint(1.0)
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+    assert fingerprint(np.arange(4)) == fingerprint(np.arange(4))
+    assert fingerprint(np.arange(4)) != fingerprint(np.arange(4).reshape(2, 2))
+    assert fingerprint(np.arange(8)[::2]) == fingerprint(np.array([0, 2, 4, 6]))
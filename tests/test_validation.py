@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from pipeline.objects import Pipeline, Variable, pipeline_function
+from pipeline.objects.validation import compile_validator
+
+
+def test_shallow_validator():
+    validator = compile_validator(List[float], "shallow")
+    assert validator([1.0, 2.0])
+    assert validator(["not", "floats"])
+    assert not validator((1.0, 2.0))
+
+    assert compile_validator(float)(1.0)
+    assert not compile_validator(float)("1.0")
+    assert compile_validator(Any)(object())
+
+
+def test_deep_validator():
+    assert compile_validator(List[float], "deep")([1.0, 2.0])
+    assert not compile_validator(List[float], "deep")([1.0, "2.0"])
+    assert compile_validator(Dict[str, List[int]], "deep")({"a": [1, 2]})
+    assert not compile_validator(Dict[str, List[int]], "deep")({"a": [1.0]})
+    assert compile_validator(Tuple[int, str], "deep")((1, "a"))
+    assert not compile_validator(Tuple[int, str], "deep")((1, 2))
+    assert compile_validator(Tuple[int, ...], "deep")((1, 2, 3))
+    assert compile_validator(Optional[List[int]], "deep")(None)
+    assert not compile_validator(Optional[List[int]], "deep")(["a"])
+
+
+def test_unknown_strictness():
+    with pytest.raises(Exception, match="Unknown validation strictness"):
+        compile_validator(float, "strict")
+
+
+def _sum_pipeline(validation: str):
+    @pipeline_function
+    def total(values: list) -> float:
+        return float(sum(values))
+
+    with Pipeline("test", validation=validation) as builder:
+        in_1 = Variable(List[float], is_input=True)
+        builder.add_variable(in_1)
+        builder.output(total(in_1))
+
+    return Pipeline.get_pipeline("test")
+
+
+def test_run_validation_levels():
+    test_pipeline = _sum_pipeline("deep")
+    assert test_pipeline.run([1.0, 2.0]) == [3.0]
+    with pytest.raises(Exception, match="Input type mismatch"):
+        test_pipeline.run([1.0, None])
+    with pytest.raises(Exception, match="Input type mismatch"):
+        test_pipeline.run_batch([([1.0],), ([1.0, None],)])
+
+    with pytest.raises(TypeError):
+        test_pipeline.run([1.0, None], validate="none")
+    assert _sum_pipeline("shallow").run([1, 2]) == [3.0]
+
+
+def test_run_batch():
+    calls = []
+
+    @pipeline_function
+    def double(f_1: float) -> float:
+        calls.append(("double", f_1))
+        return f_1 * 2
+
+    @pipeline_function
+    def add(f_1: float, f_2: float) -> float:
+        calls.append(("add", f_1))
+        return f_1 + f_2
+
+    with Pipeline("test") as builder:
+        in_1 = Variable(float, is_input=True)
+        in_2 = Variable(float, is_input=True)
+        builder.add_variables(in_1, in_2)
+        builder.output(add(double(in_1), in_2))
+
+    test_pipeline = Pipeline.get_pipeline("test")
+    assert test_pipeline.run_batch([(1.0, 1.0), (2.0, 0.5)]) == [[3.0], [4.5]]
+    # Node-major execution
+    assert calls == [("double", 1.0), ("double", 2.0), ("add", 2.0), ("add", 4.0)]